@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Бенчмарки работают только с локальными заглушками, поэтому обязательные
+# переменные окружения из api_parser.data.config получают безопасные значения.
+os.environ.setdefault("BASE_DIR", tempfile.gettempdir())
+os.environ.setdefault("FSK_API_URL", "http://127.0.0.1/")
+os.environ.setdefault("CIAN_API_URL", "http://127.0.0.1/")
+os.environ.setdefault("ACCESS_TOKEN", "benchmark")
@@ -0,0 +1,155 @@
+"""
+Инкрементальные сводки utils.aggregates против полного пересчёта в pandas.
+
+Три выгрузки пишутся в хранилище запусками (begin_run/finish_run) пачками
+записей квартир, как у flats.run: первая - весь каталог, вторая меняет цены
+10% квартир, убирает жилую площадь у части из них, снимает с продажи 5%
+квартир и добавляет новые, третья снова меняет цены и снимает другие 5%.
+После этого сводки (средние и std по ЖК, комнатности и региону,
+корреляционная матрица) сверяются с пересчётом в pandas по последней
+выгрузке, как в ноутбуке, и с пересчётом по квартирам хранилища; при
+расхождении код возврата 1. Заодно сравниваются время записи со сводками и
+без и время чтения сводок против пересчёта.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.aggregates --flats 100000
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import orjson
+import pandas as pd
+
+from api_parser.benchmarks import fixtures
+from api_parser.developers.fsk.flats.flats import flat_records
+from api_parser.utils import aggregates, store
+
+
+def crawl(flats, projects, version, page_size=1000):
+    """Страницы записей квартир выгрузки номер version (0 - исходный каталог)."""
+    per_project = math.ceil(flats / projects)
+    total = flats + flats // 10 * version
+    page = []
+    for idx in range(total):
+        # в каждой следующей выгрузке снята с продажи другая двадцатая часть квартир
+        if version and idx % 20 == version:
+            continue
+        flat = fixtures.make_flat(idx, f'project-{idx // per_project % projects}')
+        flat['complex']['city'] = idx // per_project % 3 + 1
+        if version and idx % 10 == version:
+            flat['price'] = int(flat['price'] * (1 + version / 20))
+            flat['areaLiving'] = None
+        page.append(flat)
+        if len(page) >= page_size:
+            yield flat_records(page)
+            page = []
+    if page:
+        yield flat_records(page)
+
+
+def write(path, args, summaries=True):
+    """Три выгрузки в хранилище path; возвращает время записи (upsert и удаление снятых квартир)."""
+    with store.Store(path) as db:
+        if summaries:
+            aggregates.attach(db)
+        started = time.perf_counter()
+        for version in range(3):
+            db.begin_run('flats')
+            for page in crawl(args.flats, args.projects, version):
+                db.upsert('flats', page)
+            db.finish_run('flats')
+        elapsed = time.perf_counter() - started
+    return elapsed
+
+
+def recompute(path):
+    """Полный пересчёт: все квартиры из хранилища в DataFrame."""
+    with store.Store(path) as db:
+        return pd.DataFrame([orjson.loads(data) for data, in db.connection.execute('SELECT data FROM flats')])
+
+
+def latest(args):
+    """Последняя выгрузка целиком в DataFrame - то, что считает ноутбук."""
+    return pd.DataFrame([record for page in crawl(args.flats, args.projects, 2) for record in page])
+
+
+def expected_summaries(df):
+    """Сводки pandas: {разрез: groupby}, корреляционная матрица."""
+    groups = {
+        dimension: full_groups(df, column, aggregates.VALUES)
+        for dimension, column in aggregates.DIMENSIONS.items()
+    }
+    return groups, df[list(aggregates.FEATURES)].corr()
+
+
+def full_groups(df, column, values):
+    grouped = df.groupby(column)
+    result = pd.DataFrame({'count': grouped.size()})
+    for value in values:
+        stats = grouped[value].agg(['count', 'mean', 'std'])
+        result[f'{value}_count'] = stats['count']
+        result[f'{value}_mean'] = stats['mean']
+        result[f'{value}_std'] = stats['std']
+    return result
+
+
+def close(expected, actual, rel_tol=1e-6):
+    expected = expected.astype(float)
+    actual = actual.astype(float).reindex(index=expected.index, columns=expected.columns)
+    both_nan = expected.isna() & actual.isna()
+    diff = ((expected - actual).abs() <= rel_tol * expected.abs().clip(lower=1.0)) | both_nan
+    return bool(diff.all().all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк инкрементальных сводок по квартирам")
+    parser.add_argument("--flats", type=int, default=100_000)
+    parser.add_argument("--projects", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, 'plain.sqlite3')
+        path = os.path.join(tmp, 'store.sqlite3')
+        plain_time = write(plain_path, args, summaries=False)
+        summaries_time = write(path, args)
+
+        started = time.perf_counter()
+        df = recompute(path)
+        expected, expected_corr = expected_summaries(df)
+        full_time = time.perf_counter() - started
+        notebook, notebook_corr = expected_summaries(latest(args))
+
+        with store.Store(path) as db:
+            view = aggregates.FlatsSummaries(db.connection)
+            started = time.perf_counter()
+            actual = {dimension: view.groups(dimension) for dimension in aggregates.DIMENSIONS}
+            actual_corr = view.corr()
+            read_time = time.perf_counter() - started
+
+            ok = all(close(expected[dimension], actual[dimension]) for dimension in expected)
+            ok = ok and close(expected_corr, actual_corr)
+            matches_notebook = all(close(notebook[dimension], actual[dimension]) for dimension in notebook)
+            matches_notebook = matches_notebook and close(notebook_corr, actual_corr)
+            ok = ok and matches_notebook
+
+            view.rebuild()
+            rebuilt = {dimension: view.groups(dimension) for dimension in aggregates.DIMENSIONS}
+            ok = ok and all(close(rebuilt[dimension], actual[dimension]) for dimension in actual)
+
+    print(f"квартир после трёх выгрузок: {len(df)}, групп: "
+          + ", ".join(f"{dimension} {len(frame)}" for dimension, frame in actual.items()))
+    print(f"запись трёх выгрузок: без сводок {plain_time:.1f} с, со сводками {summaries_time:.1f} с")
+    print(f"полный пересчёт (чтение квартир + groupby + corr): {full_time * 1000:.0f} мс")
+    print(f"чтение сводок: {read_time * 1000:.1f} мс")
+    print(f"сводки совпадают с pandas по последней выгрузке: {matches_notebook}, "
+          f"с полным пересчётом по хранилищу и с rebuild(): {ok}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
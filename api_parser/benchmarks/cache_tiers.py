@@ -0,0 +1,49 @@
+"""
+Время чтения ответа из уровней кэша utils.cache: LRU в памяти против Redis
+(fakeredis, без сервера) - ResponseCache(RedisTier(fakeredis.FakeRedis())).
+Поведение уровней (TTL, подъём из Redis в память, вытеснение) проверяют
+тесты api_parser/tests/test_cache.py. Нужен fakeredis (dev-зависимость).
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.cache_tiers
+"""
+import argparse
+import time
+
+import fakeredis
+
+from api_parser.utils.cache import LruTier, RedisTier, ResponseCache
+
+
+def measure(requests):
+    """Время чтения одного ответа (мкс) из памяти и из Redis."""
+    cache = ResponseCache(RedisTier(fakeredis.FakeRedis()), local=LruTier(maxsize=requests))
+    urls = [f'https://api/v3/flats/?page={idx}' for idx in range(requests)]
+    body = b'x' * 2048
+    for url in urls:
+        cache.set(url, body)
+
+    started = time.perf_counter()
+    for url in urls:
+        cache.get(url)
+    local_time = time.perf_counter() - started
+
+    cache.local = LruTier(maxsize=0)
+    started = time.perf_counter()
+    for url in urls:
+        cache.get(url)
+    remote_time = time.perf_counter() - started
+    return local_time / requests * 1e6, remote_time / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк уровней кэша ответов поверх fakeredis")
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    local_us, remote_us = measure(args.requests)
+    print(f"чтение ответа: из памяти {local_us:.1f} мкс, из Redis (fakeredis) {remote_us:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Холодный и тёплый прогон flats.main через дисковый кэш ответов: время
+и число запросов, дошедших до сервера. Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.cache_warm
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from api_parser.benchmarks.stub_server import StubFskServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк кэша ответов")
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubFskServer(
+        projects=args.projects, pages=args.pages, latency=args.latency,
+    ) as server:
+        os.environ["FSK_API_URL"] = server.url
+        os.environ["USE_CACHE"] = "true"
+        os.environ["CACHE_DIR"] = os.path.join(tmp, "cache")
+        os.chdir(tmp)
+
+        from api_parser.developers.fsk.flats import flats
+
+        logging.disable(logging.INFO)
+        for run in ("холодный", "тёплый"):
+            served_before = server.requests_served
+            started = time.perf_counter()
+            flats.main()
+            elapsed = time.perf_counter() - started
+            print(f"{run} прогон: {elapsed:.2f} с, запросов к серверу: {server.requests_served - served_before}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Выгрузка изменений (CDC) между двумя прогонами flats.main: часть квартир
+подорожала, часть снята с продажи, у проектов добавилась страница.
+Результат сверяется с ручным сравнением двух полных выгрузок в pandas.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.changes
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from api_parser.benchmarks.stub_server import StubFskServer
+
+
+def mutate(flat):
+    number = int(flat['_id'].rsplit('f', 1)[1])
+    if number % 97 == 0:
+        return None
+    if number % 50 == 0:
+        flat['price'] += 100_000
+    elif number % 45 == 0:
+        flat['discount'] += 1
+    return flat
+
+
+def expected_changes(before, after):
+    """Ручное сравнение двух полных выгрузок по _id (как делалось раньше)."""
+    before = before.drop_duplicates('_id').set_index('_id')
+    after = after.drop_duplicates('_id').set_index('_id')
+    common = before.index.intersection(after.index)
+    return {
+        'insert': len(after.index.difference(before.index)),
+        'delete': len(before.index.difference(after.index)),
+        'repriced': int((before.loc[common, 'price'] != after.loc[common, 'price']).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк выгрузки изменений")
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubFskServer(
+        projects=args.projects, pages=args.pages, per_page=args.per_page, latency=0.0,
+    ) as server:
+        os.environ["FSK_API_URL"] = server.url
+        os.environ["CDC"] = "true"
+        os.environ["SNAPSHOTS_PATH"] = os.path.join(tmp, "snapshots.sqlite3")
+        os.environ["FETCH_RATE_LIMIT"] = "0"
+        os.chdir(tmp)
+
+        from api_parser.developers.fsk.flats import flats
+
+        logging.disable(logging.CRITICAL)
+        flats.main()
+        before = pd.read_csv("flats_expanded.csv")
+
+        server.mutate = mutate
+        server.pages += 1
+        started = time.perf_counter()
+        flats.main()
+        elapsed = time.perf_counter() - started
+        after = pd.read_csv("flats_expanded.csv")
+
+        changes = pd.read_csv("flats_changes.csv")
+        counts = changes['op'].value_counts().to_dict()
+        repriced = int((changes['price_delta'].fillna(0) != 0).sum())
+        print(f"второй прогон с CDC: {elapsed:.2f} с, строк выгрузки: {len(after)}, записей изменений: {len(changes)}")
+        print(f"изменения: {counts}, с изменением цены: {repriced}")
+        expected = expected_changes(before, after)
+        print(f"ручное сравнение в pandas: {expected}")
+        print("Совпадает: {}".format(
+            counts.get('insert', 0) == expected['insert']
+            and counts.get('delete', 0) == expected['delete']
+            and repriced == expected['repriced']
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Кодированный режим перечислений: region/subRegion/classType/flatType как строки
+против кодов по общему словарю (pandas Categorical, словарные колонки Parquet).
+Снимаются память DataFrame, размеры файлов и память таблицы, прочитанной
+обратно из файла; декодированные значения сверяются со строковыми.
+Выгрузки конвейеров эти колонки не пишут - режим вызывается только явно (см. models/codes.py).
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.coded --items 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from api_parser.benchmarks.validation import make_price_items
+from api_parser.models import PriceListItem, codes, validate_batch
+from api_parser.utils import export
+
+ENUM_COLUMNS = list(codes.coded_fields(PriceListItem))
+
+
+def frame_mb(df, columns=None):
+    df = df if columns is None else df[columns]
+    return df.memory_usage(index=False, deep=True).sum() / 2 ** 20
+
+
+def file_mb(path):
+    return os.path.getsize(path) / 2 ** 20
+
+
+def write(exporter, rows):
+    with exporter:
+        exporter.write_rows(rows)
+    return exporter.path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк кодированных перечислений")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    items = validate_batch(PriceListItem, make_price_items(args.items)).items
+    print(f"строк: {len(items)}, подготовка {time.perf_counter() - started:.1f} с")
+
+    plain = codes.to_frame(PriceListItem, items, coded=False)
+    coded = codes.to_frame(PriceListItem, items)
+    print("DataFrame, колонки перечислений (memory_usage deep):")
+    print(f"  строки:      {frame_mb(plain, ENUM_COLUMNS):8.1f} МБ, вся таблица {frame_mb(plain):8.1f} МБ")
+    print(f"  Categorical: {frame_mb(coded, ENUM_COLUMNS):8.1f} МБ, вся таблица {frame_mb(coded):8.1f} МБ")
+
+    rows = [item.model_dump() for item in items]
+    del items
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write(export.CsvExporter(os.path.join(tmp, 'prices.csv')), rows)
+        plain_path = write(export.ParquetExporter(os.path.join(tmp, 'plain.parquet')), rows)
+        coded_path = write(export.ParquetExporter(
+            os.path.join(tmp, 'coded.parquet'), categories=codes.column_categories(PriceListItem),
+        ), rows)
+
+        print("Файлы:")
+        print(f"  CSV:                {file_mb(csv_path):8.1f} МБ")
+        print(f"  Parquet, строки:    {file_mb(plain_path):8.1f} МБ")
+        print(f"  Parquet, коды:      {file_mb(coded_path):8.1f} МБ")
+
+        from_csv = pd.read_csv(csv_path, encoding='utf-8-sig')
+        from_plain = pd.read_parquet(plain_path)
+        from_coded = pd.read_parquet(coded_path)
+        print("Прочитанная обратно таблица (memory_usage deep):")
+        print(f"  из CSV:             {frame_mb(from_csv):8.1f} МБ")
+        print(f"  из Parquet, строки: {frame_mb(from_plain):8.1f} МБ")
+        print(f"  из Parquet, коды:   {frame_mb(from_coded):8.1f} МБ")
+
+    same = all(
+        plain[column].equals(coded[column].astype(str))
+        and from_plain[column].equals(from_coded[column].astype(str))
+        and from_plain[column].equals(plain[column])
+        for column in ENUM_COLUMNS
+    )
+    print(f"Декодированные значения совпадают: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Сравнение форматов выгрузки квартир: размер файла, время записи через
+экспортёр и время чтения в pandas (read_csv(low_memory=False), как в ноутбуке
+аналитики, против read_parquet). Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.export_formats --flats 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from api_parser.benchmarks import fixtures
+from api_parser.developers.fsk.flats import flats
+from api_parser.utils import export
+
+
+READERS = {
+    'csv': lambda path: pd.read_csv(path, low_memory=False),
+    'parquet': pd.read_parquet,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк форматов выгрузки")
+    parser.add_argument("--flats", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"Квартир: {args.flats}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for output_format, read in READERS.items():
+            synthetic = (fixtures.make_flat(idx, f'project-{idx % 50}') for idx in range(args.flats))
+
+            started = time.perf_counter()
+            with export.make_exporter(
+                'flats_expanded', output_format=output_format, output_dir=tmp,
+                dictionary_columns=flats.DICTIONARY_COLUMNS,
+            ) as exporter:
+                exporter.write_rows(flats.flatten_flats(synthetic))
+            write_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            df = read(exporter.path)
+            read_time = time.perf_counter() - started
+
+            size_mb = os.path.getsize(exporter.path) / 2 ** 20
+            memory_mb = df.memory_usage(deep=True).sum() / 2 ** 20
+            print(f"{output_format:>8}: файл {size_mb:.1f} МБ, запись {write_time:.1f} с, "
+                  f"чтение {read_time:.2f} с, DataFrame {memory_mb:.0f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Синтетические ответы, повторяющие структуру реальных: FSK API (v3/projects/all,
+v3/flats, complex/{slug}/progress), Cian API (v2/get-newbuildings, v2/get-prices),
+карточек объявлений m2.ru и выдачи realty.yandex.ru (archive/scraping_v0).
+"""
+import html
+import json
+import random
+
+from api_parser.models.additionals import ClassTypeEnum, FlatTypeEnum, RegionEnum, SubRegionEnum
+
+
+def make_project(idx):
+    slug = f'project-{idx}'
+    return {
+        '_id': f'p{idx:06d}',
+        'title': f'ЖК Проект {idx}',
+        'slug': slug,
+        'city': 1,
+    }
+
+
+def make_flat(idx, slug='project-0'):
+    """Квартира с вложенными словарями и списками, как в ответе v3/flats."""
+    price = 10_000_000 + (idx * 7919) % 40_000_000
+    return {
+        'price': price,
+        'discount': idx % 30,
+        'preDiscountPrice': 0,
+        'priceWoDiscount': price + price // 4,
+        'prePrice': False,
+        'mortgagePayment': price // 80,
+        '_id': f'{slug}-f{idx:08d}',
+        'externalId': 100000 + idx,
+        'areaTotal': 20.0 + (idx % 900) / 10,
+        'kind': 'flat',
+        'rooms': idx % 5,
+        'floorNumber': idx % 30 + 1,
+        'furniture': idx % 3 == 0,
+        'plan': f'https://fsk.ru/upload/plans/{idx}.svg',
+        'mortgageRate': 5.9,
+        'areaLiving': 10.0 + (idx % 500) / 10,
+        'areaKitchen': 8.5,
+        'project': {
+            '_id': f'p-{slug}',
+            'title': slug.replace('-', ' ').title(),
+            'slug': slug,
+            'city': 1,
+        },
+        'complex': {
+            '_id': f'c-{slug}',
+            'title': f'ЖК {slug}',
+            'slug': slug,
+            'city': 1,
+        },
+        'corpus': {'_id': f'k{idx % 7}', 'dateDelivery': '2026-12-31', 'number': idx % 7 + 1, 'kind': 'corpus'},
+        'section': {'_id': f's{idx % 4}', 'number': idx % 4 + 1},
+        'floor': {'_id': f'fl{idx % 30}', 'number': idx % 30 + 1},
+        'labels': [
+            {'title': 'Скидка', 'description': 'Итоговая скидка с учетом акции', 'accent': True},
+        ] if idx % 3 == 0 else [],
+        'traits': [{'title': 'Линейная'}] if idx % 2 else [],
+        'features': [],
+        'photo': None,
+    }
+
+
+def make_flats_page(slug, page, total_pages, per_page):
+    start = (page - 1) * per_page
+    return {
+        'page': page,
+        'totalPages': total_pages,
+        'items': [make_flat(start + i, slug) for i in range(per_page)],
+    }
+
+
+def make_progress(slug, count=12):
+    """Ответ complex/{slug}/progress: фотоотчёты о ходе строительства по месяцам."""
+    return {
+        'items': [
+            {
+                '_id': f'{slug}-progress-{idx}',
+                'date': f'{2024 + idx // 12}-{idx % 12 + 1:02d}-01',
+                'title': f'Ход строительства, месяц {idx + 1}',
+                'photos': [f'https://fsk.ru/upload/progress/{slug}/{idx}/{photo}.jpg' for photo in range(3)],
+            }
+            for idx in range(count)
+        ],
+    }
+
+
+def make_price_items(count, broken_share=0.0, seed=0):
+    """Синтетический priceList в формате v2/get-prices; broken_share строк с ошибками."""
+    rng = random.Random(seed)
+    regions, sub_regions = list(RegionEnum.__members__), list(SubRegionEnum.__members__)
+    classes, flat_types = list(ClassTypeEnum.__members__), list(FlatTypeEnum.__members__)
+    items = []
+    for idx in range(count):
+        finished = rng.random() < 0.3
+        item = {
+            'region': rng.choice(regions),
+            'subRegion': rng.choice(sub_regions),
+            'classType': rng.choice(classes),
+            'flatType': rng.choice(flat_types),
+            'minPrice': rng.randint(3_000_000, 90_000_000),
+            'hasDecoration': rng.choice((True, False, None)),
+            'isApartments': rng.random() < 0.1,
+            'isFinished': finished,
+            'finishYear': None if finished else rng.randint(2025, 2030),
+        }
+        if rng.random() < broken_share:
+            broken = rng.choice(('region', 'minPrice', 'isApartments', 'finishYear'))
+            item[broken] = {'region': 'mars', 'minPrice': 0, 'isApartments': 'yes', 'finishYear': None}[broken]
+            item['isFinished'] = False
+        items.append(item)
+    return items
+
+
+def write_price_list(path, megabytes):
+    """
+    Файл ответа v2/get-prices размером около megabytes МБ (элементы проходят
+    валидацию PriceListItem); возвращает число элементов.
+    """
+    target = megabytes * 2 ** 20
+    count = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('{"priceList": [')
+        seed = 0
+        while file.tell() < target:
+            items = make_price_items(10_000, seed=seed)
+            for item in items:
+                item['isFinished'] = False
+                item['finishYear'] = item['finishYear'] or 2030
+            file.write((',' if count else '') + ','.join(json.dumps(item, ensure_ascii=False) for item in items))
+            count += len(items)
+            seed += 1
+        file.write('], "total": %d}' % count)
+    return count
+
+
+def make_buildings(count, seed=0):
+    """Синтетический newbuildingList в формате v2/get-newbuildings."""
+    rng = random.Random(seed)
+    regions, sub_regions = list(RegionEnum.__members__), list(SubRegionEnum.__members__)
+    return [
+        {'id': idx, 'name': f'ЖК Новостройка {idx}', 'region': rng.choice(regions), 'subRegion': rng.choice(sub_regions)}
+        for idx in range(count)
+    ]
+
+
+def m2_card_path(idx):
+    """Путь карточки m2.ru (без ведущего /), как в ссылках scraping/links.csv."""
+    return f'moskva/nedvizhimost/prodazha-{idx % 4 + 1}-komnatnoi-kvartiri-{idx:08d}/'
+
+
+def make_m2_card(idx, filler=50, info=None, price=None):
+    """
+    HTML карточки m2.ru: цена и блоки infoItem, которые разбирает scraping/parser_1.parse_m2_card,
+    среди посторонней разметки (скрипт, стили, комментарии, сущности, пробелы вокруг значений).
+    info ({заголовок: значение}) и price задают параметры карточки, без них - синтетические по idx.
+    """
+    if info is None:
+        rooms = idx % 4 + 1
+        info = {
+            'Тип жилья': 'квартира' if idx % 5 else 'апартаменты',
+            'Комнатность': f'{rooms}-комнатная',
+            'Площадь квартиры': f'{20 + rooms * 15 + idx % 10} м²',
+            'Площадь кухни': f'{6 + idx % 8} м²',
+            'Этаж': f'{idx % 17 + 1} из 17',
+            'Санузел': 'раздельный' if idx % 2 else 'совмещённый',
+            'Ремонт': ('Евро', 'Косметический', 'Дизайнерский', 'Без ремонта')[idx % 4],
+            'Материал стен': ('кирпич', 'монолит', 'панель')[idx % 3],
+        }
+    if price is None:
+        price = 5_000_000 + (idx * 7919) % 30_000_000
+    noise = ''.join(
+        f'<div class="similar"><a href="/offer/{i}">Похожее&nbsp;объявление {i}</a>'
+        f'<span>{i * 1000}&#8381;</span><!-- реклама --><img src="/img/{i}.jpg"><br></div>'
+        for i in range(filler)
+    )
+    items = ''.join(
+        f'<li data-test="infoItem"><div data-test="infoItemTitle">\n  {html.escape(title)}\n</div>'
+        f'<div data-test="infoItemValue"><!-- значение -->{html.escape(value)} </div></li>'
+        for title, value in info.items()
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Продажа квартиры</title>'
+        '<script>window.__state = {"price": 0};</script><style>.price { color: red }</style></head><body>'
+        f'{noise}<span itemprop="price" data-test="offer-price" content="{price}">{price}&nbsp;₽</span>'
+        f'<ul class="info">{items}</ul>{noise}</body></html>'
+    )
+
+
+# Выдача и карточки realty.yandex.ru для архивного скрапера archive/scraping_v0:
+# путь выдачи - page_parser.LIST_PATH, данные карточки ее скрипт запрашивает у map-nearby-suggestions
+REALTY_LIST_PATH = 'moskva_i_moskovskaya_oblast/kupit/kvartira/novostroyki/'
+REALTY_SUGGESTIONS_PATH = 'gate/map-nearby-suggestions/'
+REALTY_CARD = """<!DOCTYPE html><html><head><title>Квартира {offer_id}</title></head><body>
+<h1>Квартира {offer_id}</h1>
+<script>
+  setTimeout(function () {{ fetch("/{suggestions_path}?offerId={offer_id}"); }}, {script_delay});
+</script>
+</body></html>"""
+
+
+def realty_offer_id(idx):
+    return str(7_000_000_000_000_000 + idx)
+
+
+def make_realty_list(offer_ids):
+    """Страница выдачи: элементы [data-test="OffersSerpItem"] со ссылками на карточки."""
+    items = ''.join(
+        f'<div data-test="OffersSerpItem"><a href="/offer/{offer_id}/">Квартира {offer_id}</a></div>'
+        for offer_id in offer_ids
+    )
+    return f'<!DOCTYPE html><html><body>{items}</body></html>'
+
+
+def make_realty_card(offer_id, script_delay=50):
+    """Страница карточки: ее скрипт через script_delay мс запрашивает map-nearby-suggestions."""
+    return REALTY_CARD.format(offer_id=offer_id, suggestions_path=REALTY_SUGGESTIONS_PATH, script_delay=script_delay)
+
+
+def make_realty_item(offer_id, n):
+    """Элемент response.points[].item в формате map-nearby-suggestions."""
+    return {
+        'offerId': offer_id,
+        'salesDepartments': [{'name': f'Застройщик {n % 7}'}],
+        'area': {'value': 30 + n % 70},
+        'livingSpace': {'value': 15 + n % 40},
+        'roomsTotal': 1 + n % 4,
+        'floorsOffered': [1 + n % 25],
+        'floorsTotal': 25,
+        'price': {'value': 9_000_000 + n * 1000, 'valuePerPart': 250_000 + n, 'hasPriceHistory': n % 2 == 0,
+                  'previous': 9_100_000 + n * 1000},
+        'building': {'builtYear': 2025 + n % 3, 'builtQuarter': 1 + n % 4, 'buildingType': 'MONOLIT',
+                     'improvements': {'PARKING': True, 'LIFT': True, 'SECURITY': n % 3 == 0}},
+        'location': {
+            'geocoderAddress': f'Москва, улица Тестовая, {n}',
+            'point': {'latitude': 55.7 + n / 10_000, 'longitude': 37.6 + n / 10_000},
+            'metro': {'name': 'Тестовская', 'timeToMetro': 5 + n % 20, 'metroTransport': 'ON_FOOT'},
+            'parks': [{}] * (n % 3), 'ponds': [{}] * (n % 2), 'metroList': [{}] * (1 + n % 4),
+            'allHeatmaps': [{'name': 'profitability', 'description': 'средняя', 'level': 1 + n % 9}],
+        },
+    }
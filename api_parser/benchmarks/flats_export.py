@@ -0,0 +1,87 @@
+"""
+Пиковая память экспорта квартир: накопление списков + pd.DataFrame.to_csv
+против потокового CsvExporter. Каждый режим запускается в отдельном процессе,
+пик памяти берётся из ru_maxrss. Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.flats_export --flats 500000
+"""
+import argparse
+import filecmp
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from api_parser.benchmarks import fixtures
+
+
+def iter_synthetic_flats(count, projects=50):
+    for idx in range(count):
+        yield fixtures.make_flat(idx, f'project-{idx % projects}')
+
+
+def run_baseline(count, path):
+    import pandas as pd
+
+    from api_parser.utils import parsing
+
+    all_flats_raw = list(iter_synthetic_flats(count))
+    all_flats_flat = []
+    for idx, flat in enumerate(all_flats_raw):
+        flat['original_flat_id'] = idx
+        all_flats_flat.extend(parsing.flatten_json(flat))
+    pd.DataFrame(all_flats_flat).to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def run_streaming(count, path):
+    from api_parser.developers.fsk.flats import flats
+    from api_parser.utils import export
+
+    with export.CsvExporter(path, encoding="utf-8-sig") as exporter:
+        exporter.write_rows(flats.flatten_flats(iter_synthetic_flats(count)))
+
+
+MODES = {'baseline': run_baseline, 'streaming': run_streaming}
+
+
+def measure(mode, count, path):
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-m', 'api_parser.benchmarks.flats_export', '--mode', mode, '--flats', str(count), '--out', path],
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+    # ru_maxrss в Linux - в килобайтах, это максимум среди уже завершённых дочерних процессов
+    peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return elapsed, peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти экспорта квартир")
+    parser.add_argument("--flats", type=int, default=500_000)
+    parser.add_argument("--mode", choices=MODES)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    if args.mode:
+        MODES[args.mode](args.flats, args.out)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        streaming_path = os.path.join(tmp, 'streaming.csv')
+        baseline_path = os.path.join(tmp, 'baseline.csv')
+        # потоковый режим запускаем первым: RUSAGE_CHILDREN хранит максимум по всем детям
+        streaming_time, streaming_peak = measure('streaming', args.flats, streaming_path)
+        baseline_time, baseline_peak = measure('baseline', args.flats, baseline_path)
+        identical = filecmp.cmp(streaming_path, baseline_path, shallow=False)
+
+    print(f"Квартир: {args.flats}")
+    print(f"DataFrame.to_csv: {baseline_time:.1f} с, пик памяти {baseline_peak:.0f} МБ")
+    print(f"CsvExporter:      {streaming_time:.1f} с, пик памяти {streaming_peak:.0f} МБ")
+    print(f"Файлы побайтно совпадают: {identical}")
+
+
+if __name__ == "__main__":
+    main()
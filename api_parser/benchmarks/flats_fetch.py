@@ -0,0 +1,76 @@
+"""
+Сравнение времени обхода v3/flats: последовательный цикл через parsing.safe_request
+против конкурентного AsyncFetcher - без ограничения частоты и с ограничением
+--rate-limit запросов в секунду на хост (по умолчанию config.FETCH_RATE_LIMIT, как
+в выгрузке). При ограничении время обхода не меньше числа запросов / --rate-limit,
+поэтому в работе ускорение определяет оно, а не число соединений.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.flats_fetch
+    python -m api_parser.benchmarks.flats_fetch --rate-limit 20
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from api_parser.benchmarks.stub_server import StubFskServer
+from api_parser.data import config
+from api_parser.utils import fetching, parsing
+
+logger = logging.getLogger(__name__)
+
+
+def sequential_crawl(base_url, slugs):
+    items = []
+    for slug in slugs:
+        first_page = parsing.safe_request(f'{base_url}v3/flats/?order=asc&page=1&project_slug={slug}', logger=logger)
+        items.extend(first_page['items'])
+        for page in range(2, first_page['totalPages'] + 1):
+            page_data = parsing.safe_request(f'{base_url}v3/flats/?order=asc&page={page}&project_slug={slug}', logger=logger)
+            items.extend(page_data['items'])
+    return items
+
+
+async def concurrent_crawl(base_url, slugs, concurrency, rate_limit):
+    async with fetching.AsyncFetcher(logger, concurrency=concurrency, rate_limit=rate_limit) as fetcher:
+        projects = await asyncio.gather(*(
+            fetcher.fetch_paginated(lambda page, slug=slug: f'{base_url}v3/flats/?order=asc&page={page}&project_slug={slug}')
+            for slug in slugs
+        ))
+    return [item for pages in projects for page in pages for item in page.data['items']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки страниц квартир")
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=config.FETCH_CONCURRENCY)
+    parser.add_argument("--rate-limit", type=float, default=config.FETCH_RATE_LIMIT,
+                        help="Запросов в секунду на хост, 0 - без ограничения")
+    args = parser.parse_args()
+
+    with StubFskServer(projects=args.projects, pages=args.pages, latency=args.latency) as server:
+        slugs = [p['slug'] for p in server.projects]
+
+        started = time.perf_counter()
+        sequential = sequential_crawl(server.url, slugs)
+        sequential_time = time.perf_counter() - started
+
+        timings = {}
+        for rate_limit in sorted({0.0, args.rate_limit}):
+            started = time.perf_counter()
+            concurrent = asyncio.run(concurrent_crawl(server.url, slugs, args.concurrency, rate_limit))
+            timings[rate_limit] = time.perf_counter() - started
+            assert [f['_id'] for f in sequential] == [f['_id'] for f in concurrent], "порядок квартир различается"
+
+    print(f"Запросов: {args.projects * args.pages}, задержка сервера: {args.latency * 1000:.0f} мс")
+    print(f"Последовательно: {sequential_time:.2f} с")
+    for rate_limit, elapsed in timings.items():
+        limit = f"не больше {rate_limit:g} запросов/с" if rate_limit else "без ограничения частоты"
+        print(f"Конкурентно ({args.concurrency}), {limit}: {elapsed:.2f} с, ускорение x{sequential_time / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Микро-бенчмарк разворачивания квартир: parsing.flatten_json против
+скомпилированного flattening.FlattenPlan на ответах в формате v3/flats.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.flatten --flats 20000
+"""
+import argparse
+import copy
+import time
+import tracemalloc
+
+from api_parser.benchmarks import fixtures
+from api_parser.utils import flattening, parsing
+
+
+def run(flatten, flats):
+    started = time.perf_counter()
+    for flat in flats:
+        flatten(flat)
+    return time.perf_counter() - started
+
+
+def retained_memory(flatten, flats):
+    """Память, которую занимают все полученные строки (как при накоплении в списке)."""
+    tracemalloc.start()
+    rows = [row for flat in flats for row in flatten(flat)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 2 ** 20, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк разворачивания JSON")
+    parser.add_argument("--flats", type=int, default=20_000)
+    args = parser.parse_args()
+
+    flats = [fixtures.make_flat(idx, f'project-{idx % 10}') for idx in range(args.flats)]
+    plan = flattening.FlattenPlan(schema=flats[:100])
+
+    for sample in flats[:1000]:
+        assert parsing.flatten_json(copy.deepcopy(sample)) == plan.flatten(sample), "строки различаются"
+
+    baseline_time = min(run(parsing.flatten_json, flats) for _ in range(3))
+    plan_time = min(run(plan.flatten, flats) for _ in range(3))
+    baseline_memory, rows = retained_memory(parsing.flatten_json, flats)
+    plan_memory, _ = retained_memory(plan.flatten, flats)
+
+    print(f"Квартир: {args.flats}, строк: {rows}")
+    print(f"flatten_json: {baseline_time:.2f} с, строки занимают {baseline_memory:.1f} МБ")
+    print(f"FlattenPlan:  {plan_time:.2f} с (x{baseline_time / plan_time:.2f}), строки занимают {plan_memory:.1f} МБ")
+
+    # патологическая запись: три списка по 30 словарей при наличии вложенных словарей
+    pathological = fixtures.make_flat(0)
+    for key in ('labels', 'traits', 'features'):
+        pathological[key] = [{'title': f'{key}-{i}', 'inner': [{'v': j} for j in range(3)]} for i in range(30)]
+    guarded = flattening.FlattenPlan(max_rows=50, overflow='truncate')
+    selective = flattening.FlattenPlan(explode_paths={'labels'})
+    print(f"Патологическая запись: flatten_json - {len(parsing.flatten_json(copy.deepcopy(pathological)))} строк, "
+          f"max_rows=50 - {len(guarded.flatten(pathological))}, "
+          f"explode_paths={{'labels'}} - {len(selective.flatten(pathological))}")
+
+
+if __name__ == "__main__":
+    main()
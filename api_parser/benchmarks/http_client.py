@@ -0,0 +1,83 @@
+"""
+Общий HTTP-клиент против прежних запросов: новые соединения на каждый
+requests.get против пула keep-alive, и нагрузка на сервер при его отказе
+(фиксированная пауза между повторами против задержки с джиттером
+и предохранителя). Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.http_client
+"""
+import argparse
+import time
+
+import requests
+
+from api_parser.benchmarks.stub_server import StubFskServer
+from api_parser.utils.http import CircuitOpenError, HttpClient
+
+
+def fixed_delay_get(url, retries, delay):
+    """Прежняя схема повторов: requests.get и одинаковая пауза после любой ошибки."""
+    for attempt in range(retries):
+        try:
+            response = requests.get(url, timeout=10)
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException:
+            time.sleep(delay)
+    return None
+
+
+def bench_connections(server, requests_count):
+    url = server.url + 'v3/projects/all'
+    for name, get in (
+        ("requests.get", lambda: requests.get(url, timeout=10)),
+        ("HttpClient", lambda client=HttpClient(): client.get(url)),
+    ):
+        connections_before = server.connections_opened
+        started = time.perf_counter()
+        for _ in range(requests_count):
+            get().raise_for_status()
+        elapsed = time.perf_counter() - started
+        print(f"{name}: {requests_count} запросов за {elapsed:.2f} с, "
+              f"новых соединений: {server.connections_opened - connections_before}")
+
+
+def bench_outage(server, urls_count, retries, delay):
+    server.error_rate = 1.0
+    url = server.url + 'v3/projects/all'
+
+    served_before = server.requests_served
+    started = time.perf_counter()
+    for _ in range(urls_count):
+        fixed_delay_get(url, retries, delay)
+    print(f"фиксированная пауза {delay} с: {time.perf_counter() - started:.2f} с, "
+          f"запросов к серверу: {server.requests_served - served_before}")
+
+    client = HttpClient(retries=retries)
+    served_before = server.requests_served
+    started = time.perf_counter()
+    for _ in range(urls_count):
+        try:
+            client.get(url)
+        except CircuitOpenError:
+            pass
+    print(f"джиттер + предохранитель: {time.perf_counter() - started:.2f} с, "
+          f"запросов к серверу: {server.requests_served - served_before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк общего HTTP-клиента")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--urls", type=int, default=10)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--delay", type=float, default=0.5, help="пауза прежней схемы (в коде было 2 с)")
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with StubFskServer(projects=50, latency=args.latency, retry_after=1) as server:
+        bench_connections(server, args.requests)
+        bench_outage(server, args.urls, args.retries, args.delay)
+
+
+if __name__ == "__main__":
+    main()
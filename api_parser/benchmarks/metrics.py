@@ -0,0 +1,104 @@
+"""
+Метрики выгрузки (utils.metrics): сколько стоит инструментирование и что оно
+показывает. flats.main против заглушки FSK API после прогрева прогоняется
+поочерёдно с выключенными и включёнными метриками (лучшее из --repeat), затем
+печатается сводка последнего прогона: задержки запросов, байты, ожидание
+ограничителя частоты, развёрнутые и записанные строки, время разворачивания и
+записи. Отдельно - цена вызова выключенных timer()/count().
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.metrics --projects 20 --pages 10
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import timeit
+
+import structlog
+
+from api_parser.benchmarks.stub_server import StubFskServer
+
+
+def disabled_call_ns(metrics, number=200_000):
+    """Время пары timer() + count() при выключенных метриках, нс."""
+    def call():
+        with metrics.timer('noop'):
+            pass
+        metrics.count('noop')
+    return timeit.timeit(call, number=number) / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк метрик выгрузки")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="FETCH_RATE_LIMIT, запросов в секунду на хост")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubFskServer(
+        projects=args.projects, pages=args.pages, latency=args.latency,
+    ) as server:
+        os.environ["FSK_API_URL"] = server.url
+        os.environ["RESUME"] = "false"
+        os.environ["FETCH_RATE_LIMIT"] = str(args.rate_limit)
+        os.chdir(tmp)
+
+        from api_parser.data import config
+        from api_parser.developers.fsk.flats import flats
+        from api_parser.utils import metrics
+
+        logging.disable(logging.CRITICAL)
+        # события stage/metrics не печатаются - сводка ниже
+        structlog.configure(logger_factory=structlog.ReturnLoggerFactory())
+
+        def run(enabled):
+            config.METRICS = enabled
+            metrics.reset()
+            started = time.perf_counter()
+            flats.main()
+            elapsed = time.perf_counter() - started
+            if enabled:
+                # сводка и файл Prometheus последнего прогона с метриками
+                nonlocal summary, prom_lines
+                summary = metrics.get_metrics().summary()
+                metrics.get_metrics().write(prom_path)
+                with open(prom_path) as file:
+                    prom_lines = sum(1 for _ in file)
+            return elapsed
+
+        summary, prom_lines, prom_path = None, 0, os.path.join(tmp, 'metrics.prom')
+        run(False)
+        timings = {False: [], True: []}
+        for _ in range(args.repeat):
+            for enabled in (True, False):
+                timings[enabled].append(run(enabled))
+
+        config.METRICS = False
+        metrics.reset()
+        noop_ns = disabled_call_ns(metrics)
+
+    off, on = min(timings[False]), min(timings[True])
+    print(f"flats.main: {args.projects} проектов x {args.pages} страниц, задержка сервера {args.latency * 1000:.0f} мс")
+    print(f"метрики выключены: {off:.3f} с, включены: {on:.3f} с ({(on / off - 1) * 100:+.1f}%)")
+    print(f"timer() + count() при выключенных метриках: {noop_ns:.0f} нс")
+
+    counters = {name: sum(item['value'] for item in items) for name, items in summary['counters'].items()}
+    print(f"запросов: {counters.get('http_responses', 0)}, скачано {counters.get('http_bytes', 0) / 2 ** 20:.1f} МБ, "
+          f"ошибок: {counters.get('http_errors', 0)}, "
+          f"ожидание ограничителя частоты (сумма по запросам): {counters.get('rate_limit_wait_seconds', 0):.1f} с")
+    print(f"квартир развёрнуто: {counters.get('flats_flattened', 0)}, строк: {counters.get('rows_flattened', 0)}, "
+          f"записано строк: {counters.get('rows_written', 0)}")
+    print(f"{'гистограмма':<22} {'n':>6} {'сумма, с':>9} {'p50, мс':>8} {'p95, мс':>8} {'max, мс':>8}")
+    for name, items in summary['histograms'].items():
+        for item in items:
+            print(f"{name:<22} {item['count']:>6} {item['sum']:>9.3f} {item['p50'] * 1000:>8.2f} "
+                  f"{item['p95'] * 1000:>8.2f} {item['max'] * 1000:>8.2f}")
+    print(f"metrics.prom: {prom_lines} строк")
+
+
+if __name__ == "__main__":
+    main()
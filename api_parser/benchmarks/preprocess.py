@@ -0,0 +1,110 @@
+"""
+Подготовка flats_expanded к анализу: цепочка ноутбука (read_csv всего файла,
+фильтры rooms != 7, rooms != 6, drop(columns_to_drop), маска выбросов, признаки
+отдельными присваиваниями) против utils.preprocessing.Preprocessor - целиком и
+кусками. Каждый вариант запускается в отдельном процессе, чтобы снять пик
+памяти процесса (ru_maxrss); результаты сверяются.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.preprocess --flats 300000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from api_parser.benchmarks.store import make_rows
+from api_parser.utils import export, preprocessing
+
+COLUMNS_TO_DROP = [
+    "photo", "preDiscountPrice", "preDiscount", "priceWoDiscount",
+    "mortgagePayment", "mortgagePaymentSubsidized", "mortgagePaymentFamily",
+    "mortgageFirstPaymentSubsidized", "investProfit", "externalId", "number",
+    "status", "numberOnFloor", "finishing", "bookingUser", "promoBNPLPercent",
+    "promoRoiPercent", "mortgageRate", "mortgageRateSubsidized",
+    "mortgageExtraSubsidized", "investProfitPercent", "areaKitchen", "floors",
+    "crmCategory", "crmRoomsQty", "original_flat_id", "complex_city", "floor_number"
+]
+RESULT_COLUMNS = ['price', 'areaTotal', 'rooms', 'complex_title', 'price_per_m2', 'discount_share']
+
+
+def notebook(path):
+    """Подготовка данных, как в ноутбуке аналитики, плюс те же признаки."""
+    df = pd.read_csv(path, low_memory=False)
+    df = df[df["rooms"] != 7]
+    df = df[df["rooms"] != 6]
+    df["discount_share"] = (df["priceWoDiscount"] - df["price"]).clip(lower=0) / df["priceWoDiscount"]
+    df.drop(columns=COLUMNS_TO_DROP, inplace=True, errors="ignore")
+    df = df[(df["rooms"] > 0) & (df["price"] > 0) & (df["areaTotal"] > 0)]
+    df["price_per_m2"] = df["price"] / df["areaTotal"]
+    return df
+
+
+def run(mode, path):
+    """Дочерний процесс: готовит данные выбранным способом и печатает сводку строкой JSON."""
+    preprocessor = preprocessing.Preprocessor()
+    if mode == 'notebook':
+        df = notebook(path)
+    elif mode == 'pipeline':
+        df = preprocessor.read_csv(path)
+    else:
+        df = preprocessing.concat(preprocessor.read_csv(path, chunksize=50_000))
+    df = df[RESULT_COLUMNS]
+    print(json.dumps({
+        'rows': len(df),
+        # ru_maxrss в Linux - в килобайтах
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'frame_mb': df.memory_usage(index=False, deep=True).sum() / 2 ** 20,
+        'sums': [float(np.float64(df[column].astype('float64').sum())) for column in RESULT_COLUMNS if column != 'complex_title'],
+        'complexes': df['complex_title'].astype(str).value_counts().sort_index().to_dict(),
+    }))
+
+
+def measure(mode, path):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-m', 'api_parser.benchmarks.preprocess', '--mode', mode, '--path', path],
+        check=True, capture_output=True, text=True,
+    )
+    return time.perf_counter() - started, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def same(left, right):
+    return (left['rows'] == right['rows'] and left['complexes'] == right['complexes']
+            and np.allclose(left['sums'], right['sums'], rtol=1e-5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк подготовки данных к анализу")
+    parser.add_argument("--flats", type=int, default=300_000)
+    parser.add_argument("--mode", choices=('notebook', 'pipeline', 'chunks'))
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'flats_expanded.csv')
+        with export.CsvExporter(path) as exporter:
+            exporter.write_rows(make_rows(args.flats, 40))
+        print(f"flats_expanded.csv: {exporter.rows_written} строк, {os.path.getsize(path) / 2 ** 20:.0f} МБ")
+
+        results = {mode: measure(mode, path) for mode in ('notebook', 'pipeline', 'chunks')}
+
+    baseline = results['notebook'][1]
+    for mode, (elapsed, result) in results.items():
+        print(f"{mode:<9} {elapsed:6.1f} с, пик памяти {result['peak_mb']:5.0f} МБ, "
+              f"результат {result['frame_mb']:5.1f} МБ, совпадает с ноутбуком: {same(result, baseline)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Потоковое чтение priceList: CianApiParser.get_prices (json.loads всего тела и
+список моделей) против iter_prices (элементы декодируются из потока ответа).
+Заглушка (stub_server) отдаёт файл v2/get-prices размером --mb мегабайт; каждый режим
+запускается в отдельном процессе, чтобы честно снять пик памяти (ru_maxrss).
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.price_stream --mb 300
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from api_parser.benchmarks.fixtures import write_price_list
+from api_parser.benchmarks.recordings import Recorder
+from api_parser.benchmarks.stub_server import StubFskServer
+
+
+def run(mode):
+    """Дочерний процесс: читает priceList выбранным способом и печатает итог строкой JSON."""
+    from api_parser.master import CianApiParser
+
+    parser = CianApiParser()
+    items = parser.get_prices() if mode == 'eager' else parser.iter_prices()
+    count, checksum = 0, 0.0
+    for item in items:
+        count += 1
+        checksum += item.minPrice
+    print(json.dumps({'count': count, 'checksum': checksum}))
+
+
+def measure(mode, url):
+    env = {**os.environ, 'CIAN_API_URL': url, 'USE_CACHE': 'false', 'REVALIDATE': 'false', 'LOGGING_LEVEL': '30'}
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-m', 'api_parser.benchmarks.price_stream', '--mode', mode],
+        check=True, capture_output=True, text=True, env=env,
+    )
+    elapsed = time.perf_counter() - started
+    # ru_maxrss в Linux - в килобайтах, это максимум среди уже завершённых дочерних процессов
+    peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return elapsed, peak_mb, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк потокового чтения priceList")
+    parser.add_argument("--mb", type=int, default=300, help="Размер ответа, МБ")
+    parser.add_argument("--mode", choices=('eager', 'streaming'))
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        count = write_price_list(os.path.join(tmp, 'get-prices.json'), args.mb)
+        recorder = Recorder(tmp)
+        recorder.register('v2/get-prices/', 'get-prices.json', 'application/json')
+        recorder.save()
+        with StubFskServer(latency=0, recordings=tmp) as server:
+            # потоковый режим запускаем первым: RUSAGE_CHILDREN хранит максимум по всем детям
+            streaming_time, streaming_peak, streaming = measure('streaming', server.url)
+            eager_time, eager_peak, eager = measure('eager', server.url)
+
+    print(f"Ответ: {args.mb} МБ, элементов: {count}")
+    print(f"get_prices:  {eager_time:.1f} с, пик памяти {eager_peak:.0f} МБ")
+    print(f"iter_prices: {streaming_time:.1f} с, пик памяти {streaming_peak:.0f} МБ")
+    print(f"Результаты совпадают: {eager == streaming}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Запись настоящих ответов FSK API, Cian API и m2.ru для воспроизведения в
+StubFskServer(recordings=...). Записывается небольшой срез: v3/projects/all,
+страницы v3/flats (все или первые --pages) и прогресс строительства первых
+--projects проектов, v2/get-newbuildings и v2/get-prices (с --cian, нужен ACCESS_TOKEN),
+первые --cards карточек из scraping/links.csv. Каждый ответ - отдельный файл,
+index.json сопоставляет путь с query (относительно адреса сервиса) и файл.
+Запуск из корня репозитория (нужна сеть и настоящий .env):
+
+    python -m api_parser.benchmarks.recordings --out recordings/ --projects 3 --cian --cards 20
+
+Записанная папка подключается к сценариям: python -m api_parser.benchmarks.suite --recordings recordings/
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+from pathlib import Path
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+M2_URL = 'https://m2.ru/'
+# браузерный User-Agent, как у scraping/parser_1.py: без него m2.ru отвечает заглушкой
+M2_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/88.0.4324.96 Safari/537.36'
+    ),
+}
+
+
+class Recorder:
+    """Сохраняет ответы в папку directory и ведёт её index.json."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        index_path = self.directory / 'index.json'
+        self.index = json.loads(index_path.read_text(encoding='utf-8')) if index_path.exists() else {}
+
+    def record(self, base_url, url, headers=None):
+        """
+        Загружает url и сохраняет тело под ключом - путём с query относительно
+        base_url (так его запросит код, настроенный на адрес заглушки).
+        Возвращает тело или None при ошибке.
+        """
+        from api_parser.utils import http
+
+        key = url[len(base_url):]
+        try:
+            response = http.get_client().get(url, headers=headers, logger=logger)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Не удалось записать {url}: {e}")
+            return None
+
+        content_type = response.headers.get('Content-Type', 'application/octet-stream')
+        extension = '.html' if 'html' in content_type else '.json'
+        name = hashlib.sha1(key.encode()).hexdigest()[:16] + extension
+        (self.directory / name).write_bytes(response.content)
+        self.register(key, name, content_type, url)
+        logger.info(f"Записан {url} ({len(response.content)} байт)")
+        return response.content
+
+    def register(self, key, name, content_type, url=None):
+        """Файл name папки - ответ на key (например, подготовленный бенчмарком, а не записанный)."""
+        self.index[key] = {'file': name, 'content_type': content_type, 'url': url}
+
+    def save(self):
+        (self.directory / 'index.json').write_text(
+            json.dumps(self.index, ensure_ascii=False, indent=2, sort_keys=True), encoding='utf-8',
+        )
+
+
+def record_fsk(recorder, projects_count, pages):
+    from api_parser.data import config
+    from api_parser.developers.fsk.flats import flats
+
+    base = config.FSK_API_URL
+    body = recorder.record(base, base + 'v3/projects/all')
+    if body is None:
+        return
+    slugs = [project['slug'] for project in json.loads(body) if project.get('slug')][:projects_count]
+    for slug in slugs:
+        first = recorder.record(base, flats.flats_page_url(slug, 1))
+        # страницы дальше записанных заглушка отдала бы синтетическими - пишем все, если не ограничено
+        total_pages = json.loads(first).get('totalPages', 1) if first is not None else 0
+        for page in range(2, min(total_pages, pages or total_pages) + 1):
+            recorder.record(base, flats.flats_page_url(slug, page))
+        recorder.record(base, f'{base}complex/{slug}/progress/')
+
+
+def record_cian(recorder):
+    from api_parser.data import config
+
+    headers = {'Authorization': f'Bearer {config.ACCESS_TOKEN}'}
+    for path in ('v2/get-newbuildings/', 'v2/get-prices/'):
+        recorder.record(config.CIAN_API_URL, config.CIAN_API_URL + path, headers=headers)
+
+
+def record_m2(recorder, cards, links_path):
+    with open(links_path, encoding='utf-8') as file:
+        links = [row['link'] for row in csv.DictReader(file)][:cards]
+    for link in links:
+        if urlsplit(link).netloc != urlsplit(M2_URL).netloc:
+            continue
+        recorder.record(M2_URL, link, headers=M2_HEADERS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запись ответов API для воспроизведения в бенчмарках")
+    parser.add_argument("--out", type=Path, required=True, help="Папка записей")
+    parser.add_argument("--projects", type=int, default=3, help="Сколько проектов FSK записать")
+    parser.add_argument("--pages", type=int, default=0, help="Страниц v3/flats на проект (0 - все)")
+    parser.add_argument("--cian", action="store_true", help="Записать v2/get-newbuildings и v2/get-prices")
+    parser.add_argument("--cards", type=int, default=20, help="Сколько карточек m2.ru записать")
+    parser.add_argument("--links", type=Path, default=Path('scraping/links.csv'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    # пакет benchmarks подставляет адреса заглушек - здесь нужны настоящие из .env
+    from environs import Env
+
+    Env().read_env(override=True)
+    recorder = Recorder(args.out)
+    try:
+        record_fsk(recorder, args.projects, args.pages)
+        if args.cian:
+            record_cian(recorder)
+        if args.cards:
+            record_m2(recorder, args.cards, args.links)
+    finally:
+        recorder.save()
+    logger.info(f"Записано ответов: {len(recorder.index)} в {args.out}")
+
+
+if __name__ == "__main__":
+    main()
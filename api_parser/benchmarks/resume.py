@@ -0,0 +1,63 @@
+"""
+Прерванная выгрузка flats.main и её продолжение по журналу обхода:
+сервер «падает» посреди первого прогона, второй прогон догружает только
+незавершённые страницы (RESUME включается на время бенчмарка). Итог
+сравнивается с выгрузкой без сбоев.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.resume
+"""
+import argparse
+import filecmp
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from api_parser.benchmarks.stub_server import StubFskServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк продолжения выгрузки по журналу")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--fail-after", type=int, default=60, help="после скольких запросов сервер падает")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubFskServer(
+        projects=args.projects, pages=args.pages, latency=args.latency,
+    ) as server:
+        os.environ["FSK_API_URL"] = server.url
+        os.environ["RESUME"] = "true"
+        os.environ["JOURNAL_PATH"] = os.path.join(tmp, "journal.sqlite3")
+        os.chdir(tmp)
+
+        from api_parser.developers.fsk.flats import flats
+        from api_parser.utils import http
+
+        logging.disable(logging.CRITICAL)
+
+        def run(name):
+            # предохранитель общего клиента не должен переносить сбой между прогонами
+            http.get_client().breaker = http.CircuitBreaker()
+            served_before = server.requests_served
+            started = time.perf_counter()
+            flats.main()
+            elapsed = time.perf_counter() - started
+            print(f"{name}: {elapsed:.2f} с, запросов к серверу: {server.requests_served - served_before}")
+
+        run("без сбоев")
+        shutil.copy("flats_expanded.csv", "reference.csv")
+
+        server.fail_after = server.requests_served + args.fail_after
+        run("прерванный прогон")
+        server.fail_after = None
+        run("продолжение")
+
+        print(f"Выгрузка совпадает с эталоном: {filecmp.cmp('reference.csv', 'flats_expanded.csv', shallow=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Два последовательных прогона flats.main с условными запросами (REVALIDATE):
+второй прогон получает 304 и не разворачивает неизменившиеся страницы.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.revalidation
+"""
+import argparse
+import filecmp
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from api_parser.benchmarks.stub_server import StubFskServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк условных запросов")
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubFskServer(
+        projects=args.projects, pages=args.pages, per_page=args.per_page, latency=args.latency, etags=True,
+    ) as server:
+        os.environ["FSK_API_URL"] = server.url
+        os.environ["REVALIDATE"] = "true"
+        os.environ["VALIDATORS_DIR"] = os.path.join(tmp, "validators")
+        os.environ["FETCH_RATE_LIMIT"] = "0"
+        os.chdir(tmp)
+
+        from api_parser.developers.fsk.flats import flats
+        from api_parser.utils import revalidation
+
+        logging.disable(logging.INFO)
+        for run in ("первый", "второй"):
+            store = revalidation.get_validator_store()
+            store.stats = revalidation.RevalidationStats()
+            started = time.perf_counter()
+            flats.main()
+            elapsed = time.perf_counter() - started
+            stats = store.stats
+            print(f"{run} прогон: {elapsed:.2f} с, скачано {stats.bytes_downloaded / 2 ** 20:.1f} МБ, "
+                  f"304: {stats.not_modified}, без изменений по хэшу: {stats.unchanged}, "
+                  f"пропущено разворачиваний: {stats.skipped_pages}")
+            shutil.copy("flats_expanded.csv", f"{run}.csv")
+
+        print(f"Выгрузки совпадают: {filecmp.cmp('первый.csv', 'второй.csv', shallow=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Запросы ноутбука «GP_2_Визуализации и аналитика» (value_counts и groupby по
+комнатности, ЖК, проекту и мебели): pandas по flats_expanded.csv, загруженному
+целиком, против SQL по индексам utils.store. Результаты сверяются; в pandas
+квартиры берутся по одной строке на _id, как в таблице flats хранилища.
+Затем повторная выгрузка без каждой десятой квартиры проверяет, что
+finish_run() удаляет снятые квартиры, а метки квартир не теряются.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.store --flats 200000
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from api_parser.benchmarks import fixtures
+from api_parser.utils import export, flattening, store
+
+FILTER = ('rooms > 0 AND price > 0 AND "areaTotal" > 0', lambda df: df[(df.rooms > 0) & (df.price > 0) & (df.areaTotal > 0)])
+
+# (название, pandas по DataFrame, тот же запрос к хранилищу)
+QUERIES = [
+    ("value_counts(rooms)",
+     lambda df: df['rooms'].value_counts(),
+     lambda db: db.count_by('flats', 'rooms')),
+    ("groupby(complex_title).price.mean",
+     lambda df: df.groupby('complex_title')['price'].mean(),
+     lambda db: db.mean_by('flats', 'price', 'complex_title')),
+    ("groupby([rooms, complex_title]).size",
+     lambda df: df.groupby(['rooms', 'complex_title']).size(),
+     lambda db: db.count_by('flats', 'rooms', 'complex_title')),
+    ("groupby(rooms).price.mean",
+     lambda df: df.groupby('rooms')['price'].mean(),
+     lambda db: db.mean_by('flats', 'price', 'rooms')),
+    ("value_counts(project_slug)",
+     lambda df: df['project_slug'].value_counts(),
+     lambda db: db.count_by('flats', 'project_slug')),
+    ("groupby(project_slug).price.mean",
+     lambda df: df.groupby('project_slug')['price'].mean(),
+     lambda db: db.mean_by('flats', 'price', 'project_slug')),
+    ("groupby(furniture).price.mean",
+     lambda df: df.groupby('furniture')['price'].mean(),
+     lambda db: db.mean_by('flats', 'price', 'furniture')),
+    ("фильтр выбросов, groupby(rooms).size",
+     lambda df: FILTER[1](df).groupby('rooms').size(),
+     lambda db: db.count_by('flats', 'rooms', where=FILTER[0])),
+]
+
+
+def make_flats(flats, projects, skip=None):
+    """Синтетические квартиры по проектам; skip(idx) - квартиры, снятые с продажи."""
+    per_project = math.ceil(flats / projects)
+    for idx in range(flats):
+        if skip is None or not skip(idx):
+            yield idx, fixtures.make_flat(idx, f'project-{idx // per_project}')
+
+
+def make_rows(flats, projects):
+    """Строки flats_expanded по синтетическим квартирам - тем же планом, что и в выгрузке."""
+    plan = flattening.get_plan('v3/flats')
+    for idx, flat in make_flats(flats, projects):
+        flat['original_flat_id'] = idx
+        yield from plan.flatten(flat)
+
+
+def make_records(flats, projects, skip=None, page_size=1000):
+    """Квартиры по одной записи пачками по page_size, как их пишет в хранилище выгрузка."""
+    from api_parser.developers.fsk.flats.flats import flat_records
+
+    page = []
+    for _, flat in make_flats(flats, projects, skip):
+        page.append(flat)
+        if len(page) >= page_size:
+            yield flat_records(page)
+            page = []
+    if page:
+        yield flat_records(page)
+
+
+def crawl(db, pages):
+    """Полный запуск выгрузки в хранилище; возвращает число удалённых квартир."""
+    db.begin_run('flats')
+    for page in pages:
+        db.upsert('flats', page)
+    return db.finish_run('flats')
+
+
+def same(expected, actual):
+    """Сравнивает Series pandas с {значение: агрегат} хранилища (bool в SQLite - 0/1)."""
+    expected = {
+        tuple(int(v) if isinstance(v, bool) else v for v in key) if isinstance(key, tuple)
+        else int(key) if isinstance(key, bool) else key: value
+        for key, value in expected.items()
+    }
+    return expected.keys() == actual.keys() and all(
+        math.isclose(expected[key], actual[key], rel_tol=1e-9) for key in expected
+    )
+
+
+def timed(run, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк запросов ноутбука: pandas по CSV против SQLite")
+    parser.add_argument("--flats", type=int, default=200_000)
+    parser.add_argument("--projects", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with export.CsvExporter(os.path.join(tmp, 'flats_expanded.csv')) as exporter:
+            exporter.write_rows(make_rows(args.flats, args.projects))
+
+        started = time.perf_counter()
+        with store.Store(os.path.join(tmp, 'store.sqlite3')) as db:
+            crawl(db, make_records(args.flats, args.projects))
+        upsert_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        df = pd.read_csv(exporter.path, low_memory=False)
+        load_time = time.perf_counter() - started
+        flats = df.drop_duplicates('_id')
+
+        print(f"квартир: {args.flats}, строк в CSV: {len(df)}, "
+              f"CSV {os.path.getsize(exporter.path) / 2 ** 20:.0f} МБ, "
+              f"SQLite {os.path.getsize(os.path.join(tmp, 'store.sqlite3')) / 2 ** 20:.0f} МБ")
+        print(f"pd.read_csv целиком: {load_time:.2f} с; upsert в хранилище (один раз при выгрузке): {upsert_time:.2f} с")
+        print(f"{'запрос':<40} {'pandas, мс':>10} {'SQL, мс':>8}  совпадает")
+
+        pandas_total = sql_total = 0.0
+        with store.Store(os.path.join(tmp, 'store.sqlite3')) as db:
+            for title, pandas_query, sql_query in QUERIES:
+                pandas_time, expected = timed(lambda: pandas_query(flats))
+                sql_time, actual = timed(lambda: sql_query(db))
+                pandas_total += pandas_time
+                sql_total += sql_time
+                print(f"{title:<40} {pandas_time * 1000:>10.1f} {sql_time * 1000:>8.1f}  {same(expected, actual)}")
+
+            sold = lambda idx: idx % 10 == 0
+            deleted = crawl(db, make_records(args.flats, args.projects, skip=sold))
+            kept = [idx for idx in range(args.flats) if not sold(idx)]
+            remaining, labelled = db.connection.execute(
+                "SELECT COUNT(*), COUNT(json_extract(data, '$.labels')) FROM flats"
+            ).fetchone()
+            expected_labelled = sum(1 for _, flat in make_flats(args.flats, args.projects, sold) if flat['labels'])
+
+    print(f"все запросы: pandas {pandas_total * 1000:.0f} мс (+ {load_time * 1000:.0f} мс на чтение CSV), "
+          f"SQL {sql_total * 1000:.0f} мс")
+    print(f"повторная выгрузка без каждой десятой квартиры: удалено {deleted}, осталось {remaining} "
+          f"(совпадает: {remaining == len(kept) and deleted == args.flats - len(kept)}), "
+          f"квартир с метками {labelled} (совпадает: {labelled == expected_labelled})")
+
+
+if __name__ == "__main__":
+    main()
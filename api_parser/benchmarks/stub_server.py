@@ -0,0 +1,286 @@
+import gzip
+import hashlib
+import json
+import random
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from api_parser.benchmarks import fixtures
+
+
+class StubFskServer:
+    """
+    Локальный HTTP-сервер, имитирующий FSK API (v3/projects/all, v3/flats,
+    complex/{slug}/progress), Cian API (v2/get-newbuildings, v2/get-prices:
+    buildings и prices записей), карточки m2.ru (cards карточек по путям
+    fixtures.m2_card_path) и realty.yandex.ru для archive/scraping_v0 (offers
+    карточек: выдача по offers_per_page, страницы карточек и ответы
+    map-nearby-suggestions). Все сервисы отвечают с одного адреса url.
+    recordings - папка, записанная benchmarks/recordings.py: записанные ответы
+    отдаются вместо синтетических (остальные пути - по-прежнему синтетика),
+    файлы записей передаются потоком, не читаясь в память целиком.
+    latency - задержка ответа в секундах, чтобы было видно время сетевых запросов,
+    latency_jitter - случайная добавка к задержке от 0 до latency_jitter секунд,
+    etags - отдавать ETag и отвечать 304 на совпадающий If-None-Match,
+    error_status/error_rate - доля запросов, на которые отвечать ошибкой
+    (например 503), retry_after - значение заголовка Retry-After в таких ответах,
+    fail_after - после стольких запросов сервер «падает» и отвечает только ошибкой,
+    mutate - функция квартира -> квартира или None (снята с продажи) для имитации
+    изменений каталога между выгрузками.
+    compress - сжимать gzip ответы JSON клиентам с Accept-Encoding: gzip; blocked - offerId,
+    на прямой запрос map-nearby-suggestions которых (без Referer страницы
+    карточки) отвечать 403 с капчей.
+    port - порт сервера, по умолчанию любой свободный.
+    Соединения держатся открытыми (HTTP/1.1 keep-alive), их число - connections_opened.
+    """
+
+    def __init__(self, projects=10, pages=5, per_page=20, latency=0.05, etags=False,
+                 error_status=503, error_rate=0.0, retry_after=None, fail_after=None,
+                 buildings=200, prices=2000, cards=100, recordings=None, latency_jitter=0.0,
+                 offers=0, offers_per_page=20, compress=False, port=0):
+        self.projects = [fixtures.make_project(i) for i in range(projects)]
+        self.pages = pages
+        self.per_page = per_page
+        self.buildings = buildings
+        self.prices = prices
+        self.cards = cards
+        self.offers = offers
+        self.offers_per_page = offers_per_page
+        self.recordings = _load_recordings(recordings)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.etags = etags
+        self.error_status = error_status
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.fail_after = fail_after
+        self.compress = compress
+        self.blocked = set()
+        self.mutate = None
+        self.requests_served = 0
+        self.not_modified_served = 0
+        self.errors_served = 0
+        self.connections_opened = 0
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/'
+
+    def card_urls(self):
+        """
+        Ссылки на карточки m2.ru сервера (как links.csv для scraping/parser_1.py):
+        записанные, если они есть в recordings, иначе cards синтетических.
+        """
+        recorded = [
+            key for key, entry in self.recordings.items()
+            if entry['content_type'].startswith('text/html') and not key.startswith(('offer/', fixtures.REALTY_LIST_PATH))
+        ]
+        paths = recorded or [fixtures.m2_card_path(idx) for idx in range(self.cards)]
+        return [self.url + path for path in paths]
+
+    def offer_urls(self):
+        """Ссылки на карточки realty.yandex.ru: записанные, если они есть в recordings, иначе offers синтетических."""
+        recorded = [key for key in self.recordings if key.startswith('offer/')]
+        paths = recorded or [f'offer/{fixtures.realty_offer_id(idx)}/' for idx in range(self.offers)]
+        return [self.url + path for path in paths]
+
+    def suggestions_url(self, offer_id):
+        """Адрес map-nearby-suggestions, который запросил бы скрипт карточки offer_id."""
+        return f'{self.url}{fixtures.REALTY_SUGGESTIONS_PATH}?offerId={offer_id}'
+
+    def offer_items(self):
+        """Ответы map-nearby-suggestions карточек offer_urls: offerId -> item."""
+        items = {}
+        for url in self.offer_urls():
+            offer_id = url.rstrip('/').rsplit('/', 1)[-1]
+            body, _ = self._payload(fixtures.REALTY_SUGGESTIONS_PATH, f'offerId={offer_id}')
+            body = body.read_bytes() if isinstance(body, Path) else body
+            items[offer_id] = json.loads(body)['response']['points'][0]['item']
+        return items
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._random.random() * self.latency_jitter if self.latency_jitter else 0.0
+        return self.latency + jitter
+
+    def _captcha(self, path, query, headers):
+        """Отвечать ли 403: прямой запрос map-nearby-suggestions для offerId из blocked."""
+        if not self.blocked or path != fixtures.REALTY_SUGGESTIONS_PATH:
+            return False
+        offer_id = parse_qs(query).get('offerId', [''])[0]
+        return offer_id in self.blocked and '/offer/' not in headers.get('Referer', '')
+
+    def _offer_index(self, offer_id):
+        """Номер синтетической карточки realty.yandex.ru по offerId или None, если такой нет."""
+        try:
+            idx = int(offer_id) - int(fixtures.realty_offer_id(0))
+        except ValueError:
+            return None
+        return idx if 0 <= idx < self.offers else None
+
+    def _payload(self, path, query):
+        """
+        (тело, Content-Type) ответа на path без ведущего / или None (404);
+        тело записанного ответа - путь к его файлу.
+        """
+        recorded = self.recordings.get(f'{path}?{query}' if query else path)
+        if recorded is not None:
+            return recorded['path'], recorded['content_type']
+
+        route = path.rstrip('/')
+        if route == fixtures.REALTY_LIST_PATH.rstrip('/'):
+            page = int(parse_qs(query).get('page', ['1'])[0])
+            offers = range((page - 1) * self.offers_per_page, min(page * self.offers_per_page, self.offers))
+            if not offers:
+                return None
+            return fixtures.make_realty_list(map(fixtures.realty_offer_id, offers)).encode(), 'text/html; charset=utf-8'
+        if route.startswith('offer/') or route == fixtures.REALTY_SUGGESTIONS_PATH.rstrip('/'):
+            offer_id = route.split('/')[1] if route.startswith('offer/') else parse_qs(query).get('offerId', [''])[0]
+            idx = self._offer_index(offer_id)
+            if idx is None:
+                return None
+            if route.startswith('offer/'):
+                return fixtures.make_realty_card(offer_id).encode(), 'text/html; charset=utf-8'
+            payload = {'response': {'points': [{'item': fixtures.make_realty_item(offer_id, idx)}]}}
+            return json.dumps(payload, ensure_ascii=False).encode(), 'application/json'
+
+        if route.startswith('moskva/nedvizhimost/'):
+            try:
+                idx = int(route.rsplit('-', 1)[-1])
+            except ValueError:
+                return None
+            if idx >= self.cards:
+                return None
+            return fixtures.make_m2_card(idx).encode(), 'text/html; charset=utf-8'
+
+        if route == 'v3/projects/all':
+            payload = self.projects
+        elif route == 'v3/flats':
+            query = parse_qs(query)
+            payload = fixtures.make_flats_page(query['project_slug'][0], int(query['page'][0]), self.pages, self.per_page)
+            if self.mutate is not None:
+                items = (self.mutate(flat) for flat in payload['items'])
+                payload['items'] = [flat for flat in items if flat is not None]
+        elif route.startswith('complex/') and route.endswith('/progress'):
+            payload = fixtures.make_progress(route.split('/')[1])
+        elif route == 'v2/get-newbuildings':
+            payload = {'newbuildingList': fixtures.make_buildings(self.buildings)}
+        elif route == 'v2/get-prices':
+            payload = {'priceList': fixtures.make_price_items(self.prices)}
+        else:
+            return None
+        return json.dumps(payload).encode(), 'application/json'
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # заголовки и тело уходят отдельными записями - без этого keep-alive упирается в delayed ACK
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections_opened += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests_served += 1
+                    failed = stub._random.random() < stub.error_rate or (
+                        stub.fail_after is not None and stub.requests_served > stub.fail_after
+                    )
+                    if failed:
+                        stub.errors_served += 1
+                time.sleep(stub._delay())
+                if failed:
+                    self.send_response(stub.error_status)
+                    if stub.retry_after is not None:
+                        self.send_header('Retry-After', str(stub.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                parts = urlsplit(self.path)
+                path = parts.path.lstrip('/')
+                if stub._captcha(path, parts.query, self.headers):
+                    self.send_error(403, explain='captcha')
+                    return
+                response = stub._payload(path, parts.query)
+                if response is None:
+                    self.send_error(404)
+                    return
+
+                body, content_type = response
+                compressed = stub.compress and content_type.startswith('application/json') and (
+                    'gzip' in self.headers.get('Accept-Encoding', '')
+                )
+                if isinstance(body, Path) and (stub.etags or compressed):
+                    # ETag и сжатие считаются по всему телу
+                    body = body.read_bytes()
+                if isinstance(body, Path):
+                    self.send_response(200)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(body.stat().st_size))
+                    self.end_headers()
+                    with open(body, 'rb') as file:
+                        shutil.copyfileobj(file, self.wfile, 1 << 20)
+                    return
+
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if stub.etags and self.headers.get('If-None-Match') == etag:
+                    with stub._lock:
+                        stub.not_modified_served += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                if stub.etags:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Type', content_type)
+                if compressed:
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _load_recordings(directory):
+    """
+    {путь?query: {'path', 'content_type'}} по index.json папки записей
+    (формат - benchmarks/recordings.py); пусто без папки.
+    """
+    if directory is None:
+        return {}
+    directory = Path(directory)
+    index = json.loads((directory / 'index.json').read_text(encoding='utf-8'))
+    return {
+        key: {'path': directory / entry['file'], 'content_type': entry['content_type']}
+        for key, entry in index.items()
+    }
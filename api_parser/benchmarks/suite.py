@@ -0,0 +1,254 @@
+"""
+Сценарные бенчмарки конвейеров против локальной заглушки (stub_server), без
+обращений к fsk.ru, Cian API и m2.ru:
+
+- projects - v3/projects/all и projects_expanded,
+- flats - выгрузка квартир flats.run,
+- progress - прогресс строительства progress.run,
+- cian - v2/get-newbuildings и v2/get-prices через CianApiParser,
+- m2 - загрузка и разбор карточек scraping/parser_1.scrape_cards.
+
+Каждый сценарий выполняется в отдельном процессе (лучший из --repeat по
+времени): записей в секунду, перцентили задержки запросов (utils.metrics;
+у m2 свой клиент aiohttp, задержка не измеряется), число запросов и пик RSS.
+Заглушка может отвечать с задержкой, разбросом и долей ошибок и отдавать
+записанные ответы (--recordings, см. benchmarks/recordings.py).
+
+Результаты дописываются в --results (JSONL, по умолчанию benchmarks/results.jsonl
+в репозитории) вместе с коммитом git и
+сравниваются с прошлым запуском сценария с теми же параметрами: падение
+пропускной способности или рост памяти больше --threshold - регрессия
+(с --fail-on-regression код возврата 1).
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.suite
+    python -m api_parser.benchmarks.suite --scenario flats cian --latency 0.02 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api_parser.benchmarks.stub_server import StubFskServer
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# хранится в репозитории: первые записи - базовый замер, с которым сравниваются следующие запуски
+RESULTS = Path(__file__).resolve().parent / 'results.jsonl'
+SCENARIOS = ('projects', 'flats', 'progress', 'cian', 'm2')
+# параметры, от которых зависит нагрузка: результаты сравниваются только при их совпадении
+WORKLOAD = ('projects', 'pages', 'per_page', 'buildings', 'prices', 'cards',
+            'latency', 'jitter', 'error_rate', 'rate_limit', 'recordings')
+
+
+def scenario_projects():
+    from api_parser.developers.fsk.projects import projects
+
+    return projects.export_projects(projects.fetch_projects())
+
+
+def scenario_flats():
+    from api_parser.developers.fsk.flats import flats
+    from api_parser.developers.fsk.projects import projects
+
+    return flats.run(projects.fetch_projects())
+
+
+def scenario_progress():
+    from api_parser.developers.fsk.progress import progress
+    from api_parser.developers.fsk.projects import projects
+
+    return progress.run(projects.fetch_projects())
+
+
+def scenario_cian():
+    from api_parser.master import CianApiParser
+
+    parser = CianApiParser()
+    return len(parser.get_new_buildings()) + sum(1 for _ in parser.iter_prices())
+
+
+def scenario_m2():
+    sys.path.insert(0, str(REPO_ROOT / 'scraping'))
+    import parser_1
+
+    links = json.loads(Path('cards.json').read_text())
+    cards = asyncio.run(parser_1.scrape_cards(links, concurrency=8, delay=0, workers=1, backend='stream'))
+    return sum(1 for card in cards if card)
+
+
+def run_child(name):
+    """Дочерний процесс: выполняет сценарий и печатает измерения строкой JSON."""
+    from api_parser.utils import metrics
+
+    started = time.perf_counter()
+    items = globals()[f'scenario_{name}']()
+    elapsed = time.perf_counter() - started
+
+    latency = metrics.get_metrics().histogram('http_request_seconds')
+    print(json.dumps({
+        'items': items,
+        'elapsed': elapsed,
+        # ru_maxrss в Linux - в килобайтах
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'latency_ms': {
+            f'p{round(q * 100)}': latency.quantile(q) * 1000 for q in (0.5, 0.95, 0.99)
+        } if latency.count else None,
+    }))
+
+
+def measure(name, server, args, tmp):
+    env = {
+        **os.environ,
+        # сценарий пишет файлы в свою временную папку - пакет ищется от корня репозитория
+        'PYTHONPATH': os.pathsep.join(filter(None, (str(REPO_ROOT), os.environ.get('PYTHONPATH')))),
+        'BASE_DIR': tmp,
+        'FSK_API_URL': server.url,
+        'CIAN_API_URL': server.url,
+        'FETCH_RATE_LIMIT': str(args.rate_limit),
+        'METRICS': 'true',
+        'LOGGING_LEVEL': '30',
+        'OUTPUT_FORMAT': 'csv',
+        'RESUME': 'false',
+        'REVALIDATE': 'false',
+        'USE_CACHE': 'false',
+        'CDC': 'false',
+        'STORE': 'false',
+    }
+    requests_before, errors_before = server.requests_served, server.errors_served
+    completed = subprocess.run(
+        [sys.executable, '-m', 'api_parser.benchmarks.suite', '--child', name],
+        cwd=tmp, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(f"Сценарий {name} завершился с кодом {completed.returncode}:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['requests'] = server.requests_served - requests_before
+    result['errors_injected'] = server.errors_served - errors_before
+    return result
+
+
+def git_revision():
+    """(коммит, есть ли незакоммиченные изменения) или (None, None) вне репозитория."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def load_results(path):
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def previous_result(results, record):
+    """Последний сохранённый результат того же сценария с той же нагрузкой."""
+    for result in reversed(results):
+        if result['scenario'] == record['scenario'] and result['params'] == record['params']:
+            return result
+    return None
+
+
+def compare(previous, record, threshold):
+    """(описание изменений, регрессия ли) относительно previous."""
+    if previous is None:
+        return 'нет прошлых результатов', False
+    throughput = record['throughput'] / previous['throughput'] - 1 if previous['throughput'] else 0.0
+    memory = record['peak_rss_mb'] / previous['peak_rss_mb'] - 1 if previous['peak_rss_mb'] else 0.0
+    regression = throughput < -threshold or memory > threshold
+    text = (f"{previous['commit'] or '?'}: записей/с {throughput * 100:+.0f}%, RSS {memory * 100:+.0f}%"
+            + (" - РЕГРЕССИЯ" if regression else ""))
+    return text, regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сценарные бенчмарки конвейеров против локальной заглушки")
+    parser.add_argument("--scenario", nargs="*", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--buildings", type=int, default=2000)
+    parser.add_argument("--prices", type=int, default=20000)
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01, help="Задержка ответа заглушки, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, до стольких секунд")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="FETCH_RATE_LIMIT в сценариях")
+    parser.add_argument("--recordings", type=Path, default=None, help="Папка записанных ответов")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--results", type=Path, default=RESULTS)
+    parser.add_argument("--no-save", action="store_true", help="Не сохранять результаты")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Допустимое ухудшение, доля")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    params = {key: getattr(args, key) for key in WORKLOAD}
+    params['recordings'] = None if args.recordings is None else str(args.recordings.resolve())
+    commit, dirty = git_revision()
+    history = load_results(args.results)
+    records, regressions = [], 0
+
+    print(f"{'сценарий':<9} {'записей':>8} {'время, с':>9} {'записей/с':>10} {'запросов':>9} "
+          f"{'p50/p95/p99, мс':>18} {'RSS, МБ':>8}  сравнение")
+    with StubFskServer(
+        projects=args.projects, pages=args.pages, per_page=args.per_page,
+        buildings=args.buildings, prices=args.prices, cards=args.cards,
+        latency=args.latency, latency_jitter=args.jitter, error_rate=args.error_rate,
+        recordings=args.recordings,
+    ) as server:
+        for name in args.scenario:
+            runs = []
+            for _ in range(args.repeat):
+                with tempfile.TemporaryDirectory() as tmp:
+                    Path(tmp, 'cards.json').write_text(json.dumps(server.card_urls()))
+                    runs.append(measure(name, server, args, tmp))
+            result = min(runs, key=lambda run: run['elapsed'])
+            record = {
+                'scenario': name,
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'commit': commit,
+                'dirty': dirty,
+                'python': platform.python_version(),
+                'params': params,
+                **result,
+                'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+                'throughput': result['items'] / result['elapsed'] if result['elapsed'] else 0.0,
+            }
+            text, regression = compare(previous_result(history, record), record, args.threshold)
+            regressions += regression
+            records.append(record)
+
+            latency = record['latency_ms']
+            latency_text = '-' if latency is None else f"{latency['p50']:.1f}/{latency['p95']:.1f}/{latency['p99']:.1f}"
+            print(f"{name:<9} {record['items']:>8} {record['elapsed']:>9.2f} {record['throughput']:>10.0f} "
+                  f"{record['requests']:>9} {latency_text:>18} {record['peak_rss_mb']:>8.0f}  {text}")
+
+    if not args.no_save:
+        with open(args.results, 'a', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"Результаты дописаны в {args.results} (коммит {commit or '?'}{', есть изменения' if dirty else ''})")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
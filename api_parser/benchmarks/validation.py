@@ -0,0 +1,124 @@
+"""
+Валидация priceList: прежняя построчная схема ([PriceListItem(**item) for ...]
+с @validator и поиском RegionEnum[...] на каждую строку) против validate_batch
+(TypeAdapter(list[PriceListItem]), таблицы имён перечислений и валидаторы pydantic v2).
+Результаты сверяются; во втором прогоне 1% строк испорчен - пачка не прерывается.
+Запуск из корня репозитория:
+
+    python -m api_parser.benchmarks.validation --items 100000
+"""
+import argparse
+import time
+import warnings
+from typing import Any, Optional
+
+from pydantic import BaseModel, ValidationError, model_validator, validator
+
+from api_parser.benchmarks.fixtures import make_price_items
+from api_parser.models import PriceListItem, validate_batch
+from api_parser.models.additionals import ClassTypeEnum, FlatTypeEnum, RegionEnum, SubRegionEnum
+
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+
+class LegacyPriceListItem(BaseModel):
+    """PriceListItem до перехода на пакетную валидацию."""
+    region: RegionEnum
+    subRegion: SubRegionEnum
+    classType: ClassTypeEnum
+    flatType: FlatTypeEnum
+    minPrice: float
+    hasDecoration: Optional[str]
+    isApartments: str
+    isFinished: str
+    finishYear: Optional[int]
+
+    @validator('region', pre=True)
+    def validate_region(cls, region: Any) -> str:
+        try:
+            return RegionEnum[region].value
+        except KeyError:
+            raise ValidationError(f'Unexpected region - {region}')
+
+    @validator('subRegion', pre=True)
+    def validate_sub_region(cls, subRegion: Any) -> str:
+        try:
+            return SubRegionEnum[subRegion].value
+        except KeyError:
+            raise ValidationError(f'Unexpected subRegion - {subRegion}')
+
+    @validator('classType', pre=True)
+    def validate_class_type(cls, classType: Any) -> str:
+        try:
+            return ClassTypeEnum[classType].value
+        except KeyError:
+            raise ValidationError(f'Unexpected classType - {classType}')
+
+    @validator('flatType', pre=True)
+    def validate_flat_type(cls, flatType: Any) -> str:
+        try:
+            return FlatTypeEnum[flatType].value
+        except KeyError:
+            raise ValidationError(f'Unexpected flatType - {flatType}')
+
+    @validator('minPrice', pre=True)
+    def validate_min_price(cls, value):
+        if value <= 0:
+            raise ValidationError('min_price must be greater than 0')
+        return value
+
+    @validator('hasDecoration', 'isApartments', 'isFinished', pre=True)
+    def validate_boolean_value(cls, value: Any):
+        if value is None:
+            return value
+
+        if isinstance(value, bool):
+            return "Да" if value else "Нет"
+        raise ValueError('Value must be a boolean')
+
+    @model_validator(mode='after')
+    def validate_finish_year(cls, values):
+        if not values.isFinished == 'Да' and values.finishYear is None:
+            raise ValidationError('finish_year must be provided if is_finished is False')
+        return values
+
+
+def best_of(run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк валидации priceList")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    items = make_price_items(args.items)
+    legacy_time, legacy = best_of(lambda: [LegacyPriceListItem(**item) for item in items], args.repeat)
+    batch_time, result = best_of(lambda: validate_batch(PriceListItem, items), args.repeat)
+
+    same = [row.model_dump() for row in legacy] == [row.model_dump() for row in result.items]
+    print(f"строк: {len(items)}, результаты совпадают: {same}")
+    print(f"построчно (@validator): {legacy_time:.2f} с, {len(items) / legacy_time:,.0f} строк/с")
+    print(f"validate_batch:         {batch_time:.2f} с, {len(items) / batch_time:,.0f} строк/с "
+          f"(x{legacy_time / batch_time:.1f})")
+
+    broken = make_price_items(args.items, broken_share=0.01, seed=1)
+    started = time.perf_counter()
+    result = validate_batch(PriceListItem, broken)
+    elapsed = time.perf_counter() - started
+    print(f"1% строк с ошибками: {elapsed:.2f} с, корректных {len(result.items)}, "
+          f"ошибочных {len(result.errors)}, например {result.errors[0].index}: {result.errors[0].errors[0]['msg']}")
+    try:
+        [LegacyPriceListItem(**item) for item in broken]
+    except Exception as exc:
+        print(f"построчно та же пачка прерывается на первой ошибке: {type(exc).__name__}")
+
+
+if __name__ == "__main__":
+    main()
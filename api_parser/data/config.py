@@ -16,9 +16,51 @@ ACCESS_TOKEN = env.str("ACCESS_TOKEN")
 
 LOGGING_LEVEL: int = env.int("LOGGING_LEVEL", 10)
 
+FETCH_CONCURRENCY: int = env.int("FETCH_CONCURRENCY", 8)
+FETCH_RATE_LIMIT: float = env.float("FETCH_RATE_LIMIT", 10.0)
+
+OUTPUT_FORMAT: str = env.str("OUTPUT_FORMAT", "csv")
+
+# Условные запросы (ETag/Last-Modified) и пропуск неизменившихся страниц
+REVALIDATE: bool = env.bool("REVALIDATE", False)
+VALIDATORS_DIR: pathlib.Path = env.path("VALIDATORS_DIR", BASE_DIR / "validators")
+
+# Журнал обхода (включается явно): прерванная выгрузка продолжается с первой незавершённой страницы
+RESUME: bool = env.bool("RESUME", False)
+JOURNAL_PATH: pathlib.Path = env.path("JOURNAL_PATH", BASE_DIR / "journal.sqlite3")
+JOURNAL_MAX_AGE: int = env.int("JOURNAL_MAX_AGE", 24 * 3600)
+
+# Выгрузка изменений (вставки/удаления/изменения цен) относительно прошлого снимка
+CDC: bool = env.bool("CDC", False)
+SNAPSHOTS_PATH: pathlib.Path = env.path("SNAPSHOTS_PATH", BASE_DIR / "snapshots.sqlite3")
+
+# Локальное хранилище SQLite: выгрузки дописывают в него записи upsert'ом по натуральным ключам
+STORE: bool = env.bool("STORE", False)
+STORE_PATH: pathlib.Path = env.path("STORE_PATH", BASE_DIR / "store.sqlite3")
+# Сводки по квартирам (средние по ЖК/комнатности/региону, корреляции), обновляемые при каждом upsert
+STORE_AGGREGATES: bool = env.bool("STORE_AGGREGATES", True)
+
+# Узкая выгрузка квартир: JSON {колонка: путь}, например
+# {"price": "price", "project": "project.slug", "label": "labels[accent=true].title"}
+# (синтаксис путей - utils/paths.py). Пусто - квартира разворачивается целиком.
+FLATS_COLUMNS: dict | None = env.json("FLATS_COLUMNS", None)
+
+# Справочники ипотеки: последние тела ответов и их хэши. Неизменившийся справочник
+# не разворачивается и не перезаписывается, пока не истёк REFERENCE_TTL
+REFERENCE_DIR: pathlib.Path = env.path("REFERENCE_DIR", BASE_DIR / "reference")
+REFERENCE_TTL: int = env.int("REFERENCE_TTL", 7 * 24 * 3600)
+
+# Метрики выгрузки (utils/metrics.py): время этапов, задержки запросов, байты и строки.
+# В конце запуска сводка пишется в лог и в METRICS_PATH (.prom - формат Prometheus, иначе JSON)
+METRICS: bool = env.bool("METRICS", False)
+METRICS_PATH: pathlib.Path | None = env.path("METRICS_PATH", None)
+
 USE_CACHE: bool = env.bool("USE_CACHE", False)
 
 if USE_CACHE:
-    CACHE_HOST: str = env.str("CACHE_HOST")
-    CACHE_PORT: int = env.int("CACHE_PORT")
-    CACHE_PASSWORD: str = env.str("CACHE_PASSWORD")
+    # Без CACHE_HOST ответы кэшируются на диске в CACHE_DIR
+    CACHE_HOST: str | None = env.str("CACHE_HOST", None)
+    CACHE_PORT: int = env.int("CACHE_PORT", 6379)
+    CACHE_PASSWORD: str | None = env.str("CACHE_PASSWORD", None)
+    CACHE_DIR: pathlib.Path = env.path("CACHE_DIR", BASE_DIR / "cache")
+    CACHE_LRU_SIZE: int = env.int("CACHE_LRU_SIZE", 1024)
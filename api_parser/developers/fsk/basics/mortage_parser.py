@@ -1,10 +1,13 @@
+import asyncio
+import hashlib
 import logging
-import requests
-import json
-import pandas as pd
 from pathlib import Path
 
+import orjson
+import pandas as pd
+
 from api_parser.data import config
+from api_parser.utils import cache, export, fetching, store as data_store
 
 # Настраиваем логирование
 logging.basicConfig(
@@ -13,9 +16,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Создаём сессию requests
-session = requests.Session()
-
 # Словарь с путями, которые нужно запросить
 paths = {
     'city': [
@@ -32,38 +32,193 @@ paths = {
     ],
 }
 
-# Указываем директорию для сохранения результатов
-output_dir = Path('data')
-# Создаём её, если не существует
-output_dir.mkdir(exist_ok=True)
+# Таблицы локального хранилища (utils.store) по именам справочников
+STORE_TABLES = {
+    'city': 'cities',
+    'mortgage': 'mortgage_programs',
+    'banks': 'banks',
+    'v3_mortgage': 'program_types',
+}
+
+
+def endpoints():
+    """Справочники: (имя файла, url) - имя из domain и части пути, например v3/mortgage -> v3_mortgage."""
+    return [
+        ((domain + path.split('/')[0]).replace('/', '_'), config.FSK_API_URL + domain + path)
+        for domain in paths
+        for path in paths.get(domain)
+    ]
+
+
+class ReferenceStore:
+    """
+    Локальный кэш справочников: последнее тело ответа и его sha256 по имени справочника.
+    Записи живут ttl секунд, после этого справочник перезаписывается, даже если не изменился.
+    """
+
+    def __init__(self, directory=None, ttl=None):
+        self.tier = cache.DiskTier(config.REFERENCE_DIR if directory is None else directory)
+        self.ttl = config.REFERENCE_TTL if ttl is None else ttl
+
+    def body(self, name):
+        return self.tier.get(name)
+
+    def digest(self, name):
+        value = self.tier.get(f'{name}#sha256')
+        return None if value is None else value.decode()
+
+    def set(self, name, body, digest):
+        self.tier.set(name, body, self.ttl)
+        self.tier.set(f'{name}#sha256', digest.encode(), self.ttl)
+
+
+def records(data):
+    """Записи справочника: ответ-список как есть, одиночный объект - одной записью (как pd.json_normalize)."""
+    return data if isinstance(data, list) else [data]
+
+
+class MortgageIndex:
+    """
+    Справочники ипотеки в памяти для соединения с другими выгрузками без чтения CSV:
+    банки, города и типы программ по id, программы по id банка, ставки по типу программы.
+    """
+
+    def __init__(self, cities=(), banks=(), programs=(), program_types=()):
+        self.cities = {city['id']: city for city in cities}
+        self.banks = {bank['id']: bank for bank in banks}
+        self.program_types = {program_type['value']: program_type for program_type in program_types}
+        self.programs_by_bank = {}
+        self.rates_by_type = {}
+        for program in programs:
+            self.programs_by_bank.setdefault(program.get('bank_id'), []).append(program)
+            if program.get('percent_rate') is not None:
+                self.rates_by_type.setdefault(program.get('type'), []).append(program['percent_rate'])
+        for rates in self.rates_by_type.values():
+            rates.sort()
+
+    @classmethod
+    def from_payloads(cls, payloads):
+        """Индекс из разобранных ответов {имя справочника: JSON}; отсутствующие справочники пусты."""
+        return cls(**{
+            field: records(payloads[name]) if payloads.get(name) is not None else ()
+            for field, name in (
+                ('cities', 'city'), ('banks', 'banks'), ('programs', 'mortgage'), ('program_types', 'v3_mortgage'),
+            )
+        })
 
-# Перебираем домены и пути для формирования полного URL
-for domain in paths:
-    for path in paths.get(domain):
-        # Формируем URL для запроса
-        url = config.FSK_API_URL + domain + path
-        logger.info(f"Запрашиваем данные по адресу: {url}")
+    def programs_for_bank(self, bank_id):
+        return self.programs_by_bank.get(bank_id, [])
+
+    def rates_for_type(self, program_type):
+        """Ставки программ типа по возрастанию."""
+        return self.rates_by_type.get(program_type, [])
+
+    def min_rate(self, program_type):
+        rates = self.rates_for_type(program_type)
+        return rates[0] if rates else None
+
+
+async def fetch_bodies(urls):
+    """Загружает все справочники одновременно; тела ответов в порядке urls (None при ошибке)."""
+    async with fetching.AsyncFetcher(
+        logger,
+        concurrency=config.FETCH_CONCURRENCY,
+        rate_limit=config.FETCH_RATE_LIMIT,
+    ) as fetcher:
+        pages = await asyncio.gather(*(fetcher.fetch_page(url) for url in urls))
+    return [None if page is None else page.body for page in pages]
+
+
+def export_reference(name, body, data, store, output_dir, table_store=None):
+    """
+    Сохраняет справочник в CSV/Parquet, если его содержимое изменилось с прошлого
+    запуска или файла ещё нет. Возвращает число записанных строк (0 - пропущен).
+    В table_store (utils.store) записи обновляются всегда - upsert идемпотентен.
+    """
+    if table_store is not None:
+        table_store.upsert(STORE_TABLES[name], records(data))
+    digest = hashlib.sha256(body).hexdigest()
+    path = output_dir / f"{name}.{export.EXPORTERS[config.OUTPUT_FORMAT].extension}"
+    if store.digest(name) == digest and path.exists():
+        logger.info(f"Справочник {name} не изменился, файл {path} не перезаписываем")
+        return 0
+
+    # Преобразуем JSON в DataFrame
+    df = pd.json_normalize(data)
+    logger.info(f"Получено {len(df)} записей справочника {name}. Сохраняем.")
+
+    # Сохраняем DataFrame в CSV/Parquet
+    with export.make_exporter(name, output_dir=output_dir) as exporter:
+        exporter.write_frame(df)
+    store.set(name, body, digest)
+    logger.info(f"Файл сохранён: {exporter.path}")
+    return exporter.rows_written
+
+
+_index = None
+
+
+def refresh(output_dir='data', store=None):
+    """
+    Загружает все справочники одновременно, сохраняет изменившиеся в output_dir
+    и обновляет общий индекс. Если справочник не загрузился, индекс берёт его
+    последнюю версию из локального кэша.
+    """
+    global _index
+    store = ReferenceStore() if store is None else store
+    # Указываем директорию для сохранения результатов и создаём её, если не существует
+    output_dir = Path(output_dir)
+    output_dir.mkdir(exist_ok=True)
+
+    table_store = data_store.open_store()
+    names, urls = zip(*endpoints())
+    payloads = {}
+    rows_written = 0
+    for name, url, body in zip(names, urls, asyncio.run(fetch_bodies(urls))):
+        if body is None:
+            body = store.body(name)
+            if body is None:
+                logger.error(f"Не удалось получить справочник {name} по адресу {url}")
+                continue
+            logger.error(f"Не удалось получить справочник {name} по адресу {url}, в индексе - версия из кэша")
+            payloads[name] = orjson.loads(body)
+            continue
 
         try:
-            response = session.get(url)
-            response.raise_for_status()
             # Преобразуем ответ в JSON
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Ошибка при запросе к {url}: {e}")
-            continue
-        except json.JSONDecodeError as e:
+            payloads[name] = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Ошибка декодирования JSON для {url}: {e}")
             continue
+        rows_written += export_reference(name, body, payloads[name], store, output_dir, table_store)
+
+    if table_store is not None:
+        table_store.close()
+    logger.info(f"Справочники ипотеки обновлены, записано строк: {rows_written}")
+    _index = MortgageIndex.from_payloads(payloads)
+    return _index
+
+
+def get_index():
+    """
+    Общий индекс справочников ипотеки: после refresh в этом процессе - его результат,
+    иначе из локального кэша, а если там есть не все справочники - загрузка (refresh).
+    """
+    global _index
+    if _index is None:
+        store = ReferenceStore()
+        payloads = {name: store.body(name) for name, _ in endpoints()}
+        if all(body is not None for body in payloads.values()):
+            _index = MortgageIndex.from_payloads({name: orjson.loads(body) for name, body in payloads.items()})
+        else:
+            refresh()
+    return _index
+
 
-        # Преобразуем JSON в DataFrame
-        df = pd.json_normalize(data)
-        logger.info(f"Получено {len(df)} записей из {url}. Сохраняем в CSV.")
+def main(output_dir='data'):
+    """Выгружает справочники ипотеки (города, программы, банки, типы программ) в output_dir."""
+    return refresh(output_dir)
 
-        # Формируем имя файла из domain и части пути
-        path_name = (domain + path.split('/')[0] + '.csv').replace('/', '_')
-        csv_path = output_dir / path_name
 
-        # Сохраняем DataFrame в CSV
-        df.to_csv(csv_path, index=False, encoding="utf-8-sig")
-        logger.info(f"Файл сохранён: {csv_path}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import logging
+
+from api_parser.developers.fsk.basics import mortage_parser
+from api_parser.developers.fsk.flats import flats
+from api_parser.developers.fsk.progress import progress
+from api_parser.developers.fsk.projects import projects
+from api_parser.utils import cache, dag, http, metrics, revalidation
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def fetch_projects():
+    projects_data = projects.fetch_projects()
+    if not projects_data:
+        raise RuntimeError("Не удалось получить список проектов")
+    return projects_data
+
+
+def build_dag(output_dir='data'):
+    """
+    Граф выгрузок FSK: v3/projects/all запрашивается один раз и передаётся
+    выгрузкам проектов, квартир и прогресса; справочники ипотеки от него не зависят.
+    """
+    return (
+        dag.Dag()
+        .add('projects_all', fetch_projects)
+        .add('projects', projects.export_projects, deps=('projects_all',))
+        .add('flats', flats.run, deps=('projects_all',))
+        .add('progress', progress.run, deps=('projects_all',))
+        .add('mortgage', lambda: mortage_parser.main(output_dir))
+    )
+
+
+def main():
+    """
+    Единая точка запуска всех выгрузок FSK в одном процессе: этапы выполняются
+    по графу зависимостей, независимые ветви - параллельно, в конце выводится
+    время каждого этапа (и сводка метрик, если включён METRICS).
+    Код возврата 1, если хотя бы один этап не выполнен.
+    """
+    parser = argparse.ArgumentParser(description="Выгрузка всех данных FSK")
+    parser.add_argument("--workers", type=int, default=None, help="Сколько этапов выполнять одновременно")
+    parser.add_argument("--output-dir", default='data', help="Каталог справочников ипотеки")
+    args = parser.parse_args()
+
+    # общие клиент, кэш и хранилище валидаторов создаются до запуска потоков
+    http.get_client()
+    cache.get_cache()
+    revalidation.get_validator_store()
+
+    results = build_dag(args.output_dir).run(workers=args.workers, logger=logger)
+    logger.info("Время этапов:\n" + dag.format_timings(results))
+    metrics.report()
+
+    if any(result.status != 'ok' for result in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
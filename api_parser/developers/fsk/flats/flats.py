@@ -1,8 +1,13 @@
+import asyncio
+import hashlib
 import logging
-import pandas as pd
 
-from api_parser.utils import parsing
+import orjson
+
+from api_parser.utils import changes, export, fetching, flattening, metrics, paths, revalidation, store
+from api_parser.utils import journal as crawl_journal
 from api_parser.data import config
+from api_parser.developers.fsk.projects import projects
 
 # Инициализация логгера
 logging.basicConfig(
@@ -11,79 +16,301 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
+# Колонки с небольшим числом повторяющихся значений - в Parquet хранятся словарём
+DICTIONARY_COLUMNS = (
+    'kind', 'group', 'crmObjectType', 'project_title', 'project_slug',
+    'complex_title', 'complex_slug', 'corpus_kind', 'labels_title', 'traits_title',
+)
+
+
+def flats_page_url(slug, page):
+    return f'{config.FSK_API_URL}v3/flats/?order=asc&page={page}&project_slug={slug}'
+
+
+async def fetch_project_pages(fetcher, slug, journal=None):
     """
-    Основная логика:
-    1. Получаем список проектов
-    2. Формируем список slug для проектов
-    3. Сбор всех квартир
-    4. "Разворачиваем" каждую квартиру с помощью parsing.flatten_json
-    5. Превращаем результат в DataFrame и сохраняем в CSV
+    Загружает страницы квартир проекта, кроме уже записанных в журнал.
+    Возвращает список (номер страницы, Page или None при ошибке).
     """
+    done = journal.pages(slug) if journal is not None else {}
+    if not done:
+        pages = await fetcher.fetch_paginated(lambda page: flats_page_url(slug, page))
+        return list(enumerate(pages, start=1))
 
-    # 1. Получаем список проектов
-    projects_url = config.FSK_API_URL + 'v3/projects/all'
-    projects_data = parsing.safe_request(projects_url, logger=logger)
+    total_pages = next(iter(done.values()))
+    missing = [page for page in range(1, total_pages + 1) if page not in done]
+    pages = await asyncio.gather(*(fetcher.fetch_page(flats_page_url(slug, page)) for page in missing))
+    return list(zip(missing, pages))
 
-    if not projects_data:
-        logger.error("Не удалось получить список проектов. Завершаем работу.")
+
+async def iter_flats_pages(projects_slugs, journal=None):
+    """
+    Конкурентно загружает страницы квартир всех проектов и отдаёт их
+    по одному проекту в порядке projects_slugs: (slug, список (номер, ответ)).
+    Одновременно в памяти находится не больше FETCH_CONCURRENCY проектов.
+    Страницы, уже записанные в journal, повторно не запрашиваются.
+    """
+    async with fetching.AsyncFetcher(
+        logger,
+        concurrency=config.FETCH_CONCURRENCY,
+        rate_limit=config.FETCH_RATE_LIMIT,
+    ) as fetcher:
+        pages_iter = fetcher.iter_ordered(
+            fetch_project_pages(fetcher, slug, journal) for slug in projects_slugs
+        )
+        slugs = iter(projects_slugs)
+        async for pages in pages_iter:
+            yield next(slugs), pages
+
+
+def rows_layout():
+    """
+    Отпечаток набора колонок строк квартир: 'v3/flats' при полном разворачивании,
+    'v3/flats#<хэш>' при спецификации FLATS_COLUMNS. Входит в ключ строк в
+    хранилище валидаторов и в версию журнала обхода: строки, сохранённые с
+    другим набором колонок, не переиспользуются.
+    """
+    if not config.FLATS_COLUMNS:
+        return 'v3/flats'
+    columns = orjson.dumps(config.FLATS_COLUMNS, option=orjson.OPT_SORT_KEYS)
+    return f'v3/flats#{hashlib.sha1(columns).hexdigest()[:16]}'
+
+
+def flatten_flats(flats, start_id=0):
+    """
+    Разворачивает квартиры в строки, проставляя сквозной original_flat_id.
+    Если задан config.FLATS_COLUMNS, вместо полного разворачивания каждая
+    квартира даёт одну строку с колонками по путям спецификации.
+    """
+    if config.FLATS_COLUMNS:
+        spec = paths.get_spec(rows_layout(), {**config.FLATS_COLUMNS, 'original_flat_id': 'original_flat_id'})
+        for idx, flat in enumerate(flats, start=start_id):
+            flat['original_flat_id'] = idx
+            yield spec(flat)
         return
 
-    # 2. Получаем slugs всех проектов
-    projects_slugs = [p.get('slug') for p in projects_data if p.get('slug')]
-    logger.info(f"Найдено проектов: {len(projects_slugs)}")
+    plan = flattening.get_plan('v3/flats')
+    for idx, flat in enumerate(flats, start=start_id):
+        # Добавляем оригинальный ID квартиры для идентификации
+        flat['original_flat_id'] = idx
+        yield from plan.flatten(flat)
 
-    # 3. Сбор всех квартир в единый список
-    all_flats_raw = []
 
-    for slug in projects_slugs:
-        logger.info(f"Обрабатываем проект: {slug}")
-        first_page_url = f'{config.FSK_API_URL}v3/flats/?order=asc&page=1&project_slug={slug}'
-        first_page_data = parsing.safe_request(first_page_url, logger=logger)
+def flat_records(flats):
+    """
+    Квартиры по одной строке для хранилища (utils.store): те же колонки, что в
+    flats_expanded, но списки словарей (labels, traits...) сохраняются строкой
+    JSON, а не размножают строки.
+    """
+    plan = flattening.get_plan('v3/flats#records', explode_paths=())
+    return [plan.flatten(flat)[0] for flat in flats]
+
+
+def flat_keys(flats):
+    """(_id, хэш, цена) квартир страницы - вход для поиска изменений между выгрузками."""
+    return [
+        (flat['_id'], changes.record_digest(flat), flat.get('price'))
+        for flat in flats if flat.get('_id') is not None
+    ]
+
+
+def flatten_page(page, start_id, validators=None, records=False):
+    """
+    Развёрнутые строки страницы: {'start_id', 'flats', 'rows', 'keys'} или None,
+    если в ответе нет items; с records - ещё 'records', квартиры по одной строке
+    для хранилища. Для страницы без изменений с прошлого запуска берутся
+    строки, сохранённые в хранилище валидаторов с тем же набором колонок.
+    """
+    rows_key = f'{page.url}#rows#{rows_layout()}'
+    if validators is not None and not page.changed:
+        stored = validators.get(rows_key)
+        if stored is not None:
+            stored = orjson.loads(stored)
+            if 'keys' in stored and (not records or 'records' in stored):
+                validators.stats.skipped_pages += 1
+                return stored
+
+    if 'items' not in page.data:
+        return None
+
+    flats = page.data['items']
+    with metrics.timer('flatten_seconds'):
+        # ключи и записи считаются до разворачивания: оно добавляет в квартиры original_flat_id
+        keys = flat_keys(flats)
+        flats_records = flat_records(flats) if records else None
+        unit = {
+            'start_id': start_id,
+            'flats': len(flats),
+            'rows': list(flatten_flats(flats, start_id=start_id)),
+            'keys': keys,
+        }
+        if records:
+            unit['records'] = flats_records
+    metrics.count('flats_flattened', len(flats))
+    metrics.count('rows_flattened', len(unit['rows']))
+    if validators is not None:
+        validators.set(rows_key, orjson.dumps(unit))
+    return unit
+
+
+def write_unit(exporter, unit, start_id, slug=None, tracker=None, store=None):
+    """
+    Записывает строки страницы, сдвигая original_flat_id, если страница
+    была развёрнута с другим начальным номером, и сравнивает её квартиры
+    с прошлым снимком в tracker. В store (utils.store) квартиры
+    обновляются по _id, по одной записи на квартиру. Возвращает число квартир.
+    """
+    shift = start_id - unit['start_id']
+    if shift:
+        for row in unit['rows']:
+            row['original_flat_id'] += shift
+    exporter.write_rows(unit['rows'])
+    if store is not None:
+        if 'records' in unit:
+            store.upsert('flats', unit['records'])
+        else:
+            # страница из журнала запуска с выключенным STORE: по такому запуску удалять квартиры нельзя
+            store.abandon_run('flats')
+    if tracker is not None:
+        tracker.track(slug, unit['keys'])
+    return unit['flats']
 
-        if not first_page_data:
+
+async def export_flats(projects_slugs, exporter, journal=None, tracker=None, store=None):
+    """
+    Потоковый конвейер: страницы проекта -> развёрнутые строки -> exporter.
+    Каждая записанная страница отмечается в journal; страницы, завершённые
+    прерванным запуском, берутся из журнала без запросов к API.
+    tracker - поиск изменений относительно прошлой выгрузки (changes.ChangeTracker),
+    store - локальное хранилище (store.Store) с начатым запуском таблицы flats.
+    Возвращает (количество квартир, количество незагруженных страниц,
+    количество различных _id квартир).
+    """
+    validators = revalidation.get_validator_store()
+    flats_count = 0
+    failed_pages = 0
+    # одна квартира может попасть на две страницы, если каталог меняется во время обхода
+    flat_ids = set()
+    async for slug, fetched in iter_flats_pages(projects_slugs, journal):
+        logger.info(f"Обрабатываем проект: {slug}")
+        done = journal.pages(slug) if journal is not None else {}
+        if not fetched and not done:
             logger.warning(f"Пропускаем проект {slug} из-за ошибки запроса.")
+            failed_pages += 1
             continue
 
-        total_pages = first_page_data.get('totalPages', 1)
-        all_flats_raw.extend(first_page_data.get('items', []))
+        fetched = dict(fetched)
+        total_pages = next(iter(done.values())) if done else len(fetched)
+        for page_number in range(1, total_pages + 1):
+            if page_number in done:
+                unit = orjson.loads(journal.load(slug, page_number))
+                flats_count += write_unit(exporter, unit, flats_count, slug, tracker, store)
+                flat_ids.update(key for key, _, _ in unit['keys'])
+                continue
 
-        for page in range(2, total_pages + 1):
-            page_url = f'{config.FSK_API_URL}v3/flats/?order=asc&page={page}&project_slug={slug}'
-            page_data = parsing.safe_request(page_url, logger=logger)
+            page = fetched.get(page_number)
+            unit = None if page is None else flatten_page(page, flats_count, validators, store is not None)
+            if unit is None:
+                logger.warning(f"Ошибка получения страницы {page_number} для проекта {slug}, пропускаем.")
+                failed_pages += 1
+                continue
+            if journal is not None:
+                journal.record(slug, page_number, orjson.dumps(unit), total_pages)
+            flats_count += write_unit(exporter, unit, flats_count, slug, tracker, store)
+            flat_ids.update(key for key, _, _ in unit['keys'])
 
-            if page_data and 'items' in page_data:
-                all_flats_raw.extend(page_data['items'])
-            else:
-                logger.warning(f"Ошибка получения страницы {page} для проекта {slug}, пропускаем.")
+        logger.info(f"Обработано {flats_count} квартир")
 
-    logger.info(f"Общее количество загруженных квартир: {len(all_flats_raw)}")
+    if validators is not None:
+        logger.info(f"Статистика условных запросов: {validators.stats.summary()}")
+    return flats_count, failed_pages, len(flat_ids)
 
-    # 4. «Разворачиваем» каждую квартиру с помощью parsing.flatten_json
-    all_flats_flat = []
-    for idx, flat in enumerate(all_flats_raw):
-        # Добавляем оригинальный ID квартиры для идентификации
-        flat['original_flat_id'] = idx
 
-        # Разворачиваем
-        flat_rows = parsing.flatten_json(flat)
-        all_flats_flat.extend(flat_rows)
+def export_changes(tracker, failed_pages):
+    """
+    Сохраняет вставки, удаления и изменения цен относительно прошлой выгрузки.
+    По неполной выгрузке удаления не определить - снимок остаётся прежним,
+    изменения найдёт следующий полный запуск.
+    """
+    if failed_pages:
+        tracker.rollback()
+        logger.warning("Выгрузка неполная, изменения относительно прошлого снимка не сохраняются")
+    else:
+        with export.make_exporter("flats_changes", dictionary_columns=('op', 'project_slug')) as exporter:
+            exporter.write_rows(tracker.changes())
+        tracker.commit()
+        logger.info(f"Файл изменений {exporter.path} сохранён: {tracker.summary()}")
+    tracker.close()
 
-        # Выводим прогресс каждые 100 квартир
-        if (idx + 1) % 100 == 0:
-            logger.info(f"Обработано {idx + 1} квартир из {len(all_flats_raw)}")
 
-    # 5. Превращаем в DataFrame и сохраняем
-    df_flats = pd.DataFrame(all_flats_flat)
-    df_flats.to_csv("flats_expanded.csv", index=False, encoding="utf-8-sig")
+def run(projects_data):
+    """
+    Выгрузка квартир по уже полученному списку проектов v3/projects/all:
+    1. Формируем список slug для проектов
+    2. Потоково загружаем страницы квартир каждого проекта
+    3. "Разворачиваем" каждую квартиру скомпилированным планом flattening
+    4. Дописываем строки в файл (CSV или Parquet) пачками, не держа весь каталог в памяти;
+       завершённые страницы отмечаются в журнале обхода, чтобы прерванный
+       запуск продолжился с первой незавершённой страницы
+    5. При включённом CDC сохраняем изменения относительно прошлой выгрузки;
+       при включённом STORE квартиры по одной записи обновляются в хранилище,
+       а снятые с продажи удаляются из него после полной выгрузки
+    Возвращает число записанных строк.
+    """
+
+    # 1. Получаем slugs всех проектов
+    projects_slugs = [p.get('slug') for p in projects_data if p.get('slug')]
+    logger.info(f"Найдено проектов: {len(projects_slugs)}")
+
+    # 2-4. Загрузка, разворачивание и запись одним конвейером
+    # блоки журнала с другим набором колонок не продолжаются: запуск начнётся заново
+    journal = crawl_journal.open_journal("flats_expanded", version=rows_layout())
+    if journal is not None and journal.resumed:
+        logger.info("Продолжаем прерванную выгрузку по журналу обхода")
+    tracker = changes.open_tracker("flats")
+    flats_store = store.open_store()
+    if flats_store is not None:
+        flats_store.begin_run('flats')
+    with export.make_exporter("flats_expanded", dictionary_columns=DICTIONARY_COLUMNS) as exporter:
+        flats_count, failed_pages, unique_flats = asyncio.run(
+            export_flats(projects_slugs, exporter, journal, tracker, flats_store)
+        )
+    if flats_store is not None:
+        deleted = None if failed_pages else flats_store.finish_run('flats')
+        if deleted is None:
+            logger.warning("Выгрузка неполная, снятые с продажи квартиры остаются в хранилище до полного запуска")
+        else:
+            logger.info(f"Удалено из хранилища снятых с продажи квартир: {deleted}")
+        flats_store.close()
+
+    if tracker is not None:
+        export_changes(tracker, failed_pages)
+
+    if journal is not None:
+        if failed_pages:
+            logger.warning(f"Не загружено страниц: {failed_pages}, следующий запуск догрузит только их")
+        else:
+            journal.finish()
+        journal.close()
 
-    logger.info(f"Файл flats_expanded.csv успешно сохранён! Всего строк: {len(df_flats)}")
+    logger.info(f"Файл {exporter.path} успешно сохранён! Всего строк: {exporter.rows_written}")
 
-    # Выводим информацию о результатах
-    flat_ids = df_flats['original_flat_id'].nunique() if 'original_flat_id' in df_flats.columns else 0
-    logger.info(f"Исходных квартир: {len(all_flats_raw)}")
-    logger.info(f"Уникальных ID квартир в результате: {flat_ids}")
-    logger.info(f"Среднее количество строк на квартиру: {len(df_flats) / max(1, len(all_flats_raw)):.2f}")
+    # Выводим информацию о результатах (каждая квартира даёт хотя бы одну строку)
+    logger.info(f"Исходных квартир: {flats_count}")
+    logger.info(f"Уникальных ID квартир в результате: {unique_flats}")
+    logger.info(f"Среднее количество строк на квартиру: {exporter.rows_written / max(1, flats_count):.2f}")
+    return exporter.rows_written
+
+
+def main():
+    """Получает список проектов и выгружает их квартиры (см. run)."""
+    projects_data = projects.fetch_projects()
+
+    if not projects_data:
+        logger.error("Не удалось получить список проектов. Завершаем работу.")
+        return
+    run(projects_data)
+    metrics.report()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
 import pandas as pd
 import logging
 
-from api_parser.utils import parsing
+import orjson
+
 from api_parser.data import config
+from api_parser.utils import export, journal as crawl_journal, metrics, parsing, store
+from api_parser.developers.fsk.projects import projects
 
 
 logging.basicConfig(
@@ -12,24 +15,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def run(projects_data):
     """
-    Основная функция выполнения скрипта:
-    1. Получение списка проектов
-    2. Получение прогресса для каждого проекта
-    3. Сохранение данных в CSV
-    4. Вывод нескольких строк для проверки
+    Выгрузка прогресса строительства по уже полученному списку проектов:
+    1. Получение прогресса для каждого проекта
+    2. Сохранение данных в CSV/Parquet
+    3. Вывод нескольких строк для проверки
+    Возвращает число записанных строк.
     """
 
-    # 1. Получаем список проектов
-    projects_url = config.FSK_API_URL + 'v3/projects/all'
-    projects_data = parsing.safe_request(projects_url, logger=logger)
-
-    if not projects_data:
-        logger.error("Не удалось получить список проектов. Завершаем работу.")
-        return
-
-    # 2. Получаем полную информацию о прогрессе для каждого проекта
+    # 1. Получаем полную информацию о прогрессе для каждого проекта
+    # (проекты, завершённые прерванным запуском, берутся из журнала обхода)
+    journal = crawl_journal.open_journal("project_progress")
+    failed_projects = 0
     all_project_progress = []
     for project in projects_data:
         slug = project.get('slug')
@@ -37,7 +35,13 @@ def main():
             logger.warning("В данных проекта отсутствует slug. Пропускаем.")
             continue
 
-        progress_url = f'https://fsk.ru/api/complex/{slug}/progress/'
+        stored = journal.load(slug, 1) if journal is not None else None
+        if stored is not None:
+            all_project_progress.extend(orjson.loads(stored))
+            logger.info(f"Прогресс проекта {slug} взят из журнала обхода")
+            continue
+
+        progress_url = f'{config.FSK_API_URL}complex/{slug}/progress/'
         progress_data = parsing.safe_request(progress_url, logger=logger)
 
         if progress_data and 'items' in progress_data:
@@ -46,28 +50,55 @@ def main():
                 item['project_slug'] = slug
 
             all_project_progress.extend(progress_data['items'])
+            if journal is not None:
+                journal.record(slug, 1, orjson.dumps(progress_data['items']))
             logger.info(f"Получен прогресс для проекта: {slug}")
         else:
+            failed_projects += 1
             logger.warning(f"Не удалось получить прогресс для проекта: {slug}")
 
-    # 3. Сохраняем данные в CSV
-    if all_project_progress:
-        df_progress = pd.DataFrame(all_project_progress)
-
-        # Сохраняем в CSV
-        df_progress.to_csv("project_progress.csv", index=False, encoding="utf-8-sig")
+    if journal is not None:
+        if failed_projects:
+            logger.warning(f"Не получен прогресс {failed_projects} проектов, следующий запуск догрузит только их")
+        else:
+            journal.finish()
+        journal.close()
 
-        logger.info("Файл project_progress.csv успешно сохранён!")
-        logger.info(f"Всего записей о прогрессе: {df_progress.__len__()}")
-        logger.info(f"Количество уникальных проектов: {df_progress['project_slug'].nunique()}")
+    # 2. Сохраняем данные (CSV или Parquet по config.OUTPUT_FORMAT)
+    if all_project_progress:
+        with export.make_exporter("project_progress", dictionary_columns=('project_slug',)) as exporter:
+            exporter.write_rows(all_project_progress)
+
+        logger.info(f"Файл {exporter.path} успешно сохранён!")
+        logger.info(f"Всего записей о прогрессе: {exporter.rows_written}")
+        logger.info(f"Количество уникальных проектов: {len({item['project_slug'] for item in all_project_progress})}")
+
+        progress_store = store.open_store()
+        if progress_store is not None:
+            with progress_store:
+                stored = progress_store.upsert('progress', all_project_progress)
+                logger.info(f"В хранилище записано: {stored} из {len(all_project_progress)} (записи без _id пропускаются)")
     else:
         logger.warning("Не удалось получить данные о прогрессе проектов.")
 
-    # 4. Вывод первых нескольких строк для проверки
+    # 3. Вывод первых нескольких строк для проверки
     if all_project_progress:
-        df_progress = pd.DataFrame(all_project_progress)
+        df_progress = pd.DataFrame(all_project_progress[:5])
         logger.info("Первые 5 записей для проверки:")
-        logger.info("\n" + df_progress.head().to_string())
+        logger.info("\n" + df_progress.to_string())
+        return exporter.rows_written
+    return 0
+
+
+def main():
+    """Получает список проектов и выгружает прогресс строительства (см. run)."""
+    projects_data = projects.fetch_projects()
+
+    if not projects_data:
+        logger.error("Не удалось получить список проектов. Завершаем работу.")
+        return
+    run(projects_data)
+    metrics.report()
 
 
 if __name__ == '__main__':
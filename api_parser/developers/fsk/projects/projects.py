@@ -1,7 +1,9 @@
 import logging
-import requests
 import pandas as pd
 
+from api_parser.data import config
+from api_parser.utils import export, parsing, store
+
 # Инициализация логгера
 logging.basicConfig(
     level=logging.INFO,
@@ -55,39 +57,57 @@ def process_json_list(json_list):
     return processed_data
 
 
-def main():
+def fetch_projects():
     """
-    Основная функция:
-    1. Выполняет запрос к API.
-    2. Выводит базовую информацию и проверяет структуру ответа.
-    3. Разворачивает данные и сохраняет в CSV.
+    Список проектов v3/projects/all через общий клиент (кэш, условные запросы).
+    Используется всеми конвейерами FSK; None при ошибке запроса.
     """
-    session = requests.Session()
-    response = session.get('https://fsk.ru/api/v3/projects/all')
+    all_projects = parsing.safe_request(config.FSK_API_URL + 'v3/projects/all', logger=logger)
+    if all_projects is None:
+        return None
+
+    # Логируем структуру данных
+    logger.info(f"Тип данных all_projects: {type(all_projects)}")
+    if isinstance(all_projects, list):
+        logger.info(f"Количество проектов: {len(all_projects)}")
+    else:
+        logger.warning("Ошибка: API вернуло неожиданный формат данных.")
+    return all_projects
 
-    if response.status_code == 200:
-        all_projects = response.json()
 
-        # Логируем структуру данных
-        logger.info(f"Тип данных all_projects: {type(all_projects)}")
-        if isinstance(all_projects, list):
-            logger.info(f"Количество проектов: {len(all_projects)}")
-        else:
-            logger.warning("Ошибка: API вернуло неожиданный формат данных.")
+def export_projects(all_projects):
+    """Разворачивает проекты и сохраняет в CSV/Parquet; возвращает число строк."""
+    # Обрабатываем JSON
+    processed_projects = process_json_list(all_projects)
 
-        # Обрабатываем JSON
-        processed_projects = process_json_list(all_projects)
+    # Превращаем в DataFrame
+    df = pd.DataFrame(processed_projects)
+    logger.info(f"Форма DataFrame: {df.shape}")
 
-        # Превращаем в DataFrame
-        df = pd.DataFrame(processed_projects)
-        logger.info(f"Форма DataFrame: {df.shape}")
+    # Сохраняем в CSV/Parquet (формат задаётся config.OUTPUT_FORMAT)
+    with export.make_exporter("projects_expanded") as exporter:
+        exporter.write_rows(processed_projects)
+    logger.info(f"Файл сохранён как {exporter.path}")
 
-        # Сохраняем в CSV
-        csv_filename = "projects_expanded.csv"
-        df.to_csv(csv_filename, index=False, encoding="utf-8-sig")
-        logger.info(f"Файл сохранён как {csv_filename}")
-    else:
-        logger.error(f"Ошибка запроса API: {response.status_code}")
+    projects_store = store.open_store()
+    if projects_store is not None:
+        with projects_store:
+            logger.info(f"В хранилище записано проектов: {projects_store.upsert('projects', all_projects)}")
+    return exporter.rows_written
+
+
+def main():
+    """
+    Основная функция:
+    1. Выполняет запрос к API.
+    2. Выводит базовую информацию и проверяет структуру ответа.
+    3. Разворачивает данные и сохраняет в CSV/Parquet.
+    """
+    all_projects = fetch_projects()
+    if all_projects is None:
+        logger.error("Не удалось получить список проектов. Завершаем работу.")
+        return
+    export_projects(all_projects)
 
 
 if __name__ == "__main__":
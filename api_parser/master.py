@@ -1,31 +1,108 @@
-import requests
 import json
 import structlog
-from typing import List
+from typing import Iterator, List
 
 from api_parser.data import config
-from api_parser.utils import logging
-from api_parser.models import BuildingModel, PriceListItem
+from api_parser.utils import logging, streaming
+from api_parser.utils.cache import get_cache
+from api_parser.utils.http import get_client
+from api_parser.utils.revalidation import get_validator_store
+from api_parser.models import BuildingModel, PriceListItem, validate_batch
 
 
 class CianApiParser:
     def __init__(self) -> None:
         self.logger: structlog.typing.FilteringBoundLogger = logging.setup_logger().bind(type="cian_parser")
-        self.session = requests.Session()
+        self.client = get_client()
+        self.cache = get_cache()
+        self.validators = get_validator_store()
 
         if config.ACCESS_TOKEN is None:
             raise ValueError("Access token is not defined!")
 
-        self.session.headers = {
+        self.headers = {
             'Authorization': f'Bearer {config.ACCESS_TOKEN}'
         }
 
+    def _get_json(self, path: str) -> dict:
+        """
+        GET к Cian API с кэшированием тела ответа (ответы с ошибками не кэшируются).
+        При включённом REVALIDATE запрос условный, на 304 используется сохранённое тело.
+        """
+        url = config.CIAN_API_URL + path
+        if self.cache is not None:
+            cached = self.cache.get_json(url)
+            if cached is not None:
+                self.logger.debug("cache hit", url=url)
+                return cached
+
+        headers = dict(self.headers)
+        if self.validators is not None:
+            headers.update(self.validators.headers_for(url))
+        raw_response = self.client.get(url, headers=headers)
+        content = raw_response.content
+        if self.validators is not None:
+            page = self.validators.resolve(url, raw_response.status_code, raw_response.headers, content)
+            if page is None:
+                content = self.client.get(url, headers=self.headers).content
+            else:
+                content = page.body
+                self.logger.debug("revalidated", url=url, changed=page.changed)
+        response = json.loads(content)
+        if self.cache is not None and 'errors' not in response:
+            self.cache.set(url, content)
+        return response
+
+    def _validate(self, model, records: list) -> list:
+        """
+        Валидирует список записей одной пачкой; строки с ошибками пропускаются
+        и попадают в лог, а не прерывают весь ответ.
+        """
+        result = validate_batch(model, records)
+        if result.errors:
+            self.logger.warning(
+                "invalid rows skipped",
+                model=model.__name__,
+                invalid=len(result.errors),
+                total=len(records),
+                sample={
+                    error.index: [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors]
+                    for error in result.errors[:5]
+                },
+            )
+        return result.items
+
+    def _iter_list(self, path: str, key: str, error: str) -> Iterator[dict]:
+        """
+        Элементы списка response[key], декодируемые по мере чтения ответа:
+        тело не буферизуется целиком и дерево всего ответа не строится.
+        Кэш и условные запросы в этом режиме не используются.
+        """
+        response = self.client.get(config.CIAN_API_URL + path, headers=self.headers, stream=True)
+        with response:
+            try:
+                yield from streaming.iter_json_array(response.iter_content(streaming.CHUNK_SIZE), key)
+            except streaming.ArrayNotFoundError as e:
+                if 'errors' in e.head:
+                    raise ValueError(e.head.get('message'))
+                raise ValueError(error)
+
+    def _iter_validated(self, model, records: Iterator[dict], batch_size: int) -> Iterator:
+        for batch in streaming.batched(records, batch_size):
+            yield from self._validate(model, batch)
+
+    def iter_new_buildings(self, batch_size: int = 1000) -> Iterator[BuildingModel]:
+        """Потоковый вариант get_new_buildings: память не зависит от длины списка."""
+        records = self._iter_list('v2/get-newbuildings/', 'newbuildingList', "Error while getting list of building!")
+        return self._iter_validated(BuildingModel, records, batch_size)
+
+    def iter_prices(self, batch_size: int = 1000) -> Iterator[PriceListItem]:
+        """Потоковый вариант get_prices: память не зависит от длины списка."""
+        records = self._iter_list('v2/get-prices/', 'priceList', "Error while getting list of prices!")
+        return self._iter_validated(PriceListItem, records, batch_size)
+
     def get_new_buildings(self) -> List[BuildingModel]:
-        response = json.loads(
-            self.session.get(
-                url=config.CIAN_API_URL + 'v2/get-newbuildings/'
-            ).content
-        )
+        response = self._get_json('v2/get-newbuildings/')
 
         if 'errors' in response:
             raise ValueError(response['message'])
@@ -33,17 +110,13 @@ class CianApiParser:
         if 'newbuildingList' not in response.keys():
             raise ValueError("Error while getting list of building!")
 
-        return [BuildingModel(**building) for building in response['newbuildingList']]
+        return self._validate(BuildingModel, response['newbuildingList'])
 
     def get_prices(self) -> list:
         if config.ACCESS_TOKEN is None:
             raise ValueError("Access token is not defined!")
 
-        response = json.loads(
-            self.session.get(
-                url=config.CIAN_API_URL + 'v2/get-prices/'
-            ).content
-        )
+        response = self._get_json('v2/get-prices/')
 
         if 'errors' in response:
             raise ValueError(response['message'])
@@ -51,7 +124,7 @@ class CianApiParser:
         if 'priceList' not in response.keys():
             raise ValueError("Error while getting list of prices!")
 
-        return [PriceListItem(**prices) for prices in response['priceList']]
+        return self._validate(PriceListItem, response['priceList'])
 
 
 if __name__ == '__main__':
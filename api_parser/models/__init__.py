@@ -1,3 +1,4 @@
 from .base import BaseModel
 from .building import BuildingModel
 from .price import PriceListItem
+from .batch import BatchResult, RowError, validate_batch
@@ -0,0 +1,59 @@
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+class RowError(NamedTuple):
+    index: int
+    record: Any
+    errors: list[dict]
+
+
+class BatchResult(NamedTuple):
+    items: list
+    errors: list[RowError]
+
+
+_adapters: dict[type, TypeAdapter] = {}
+
+
+def get_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter(list[model]): схема валидации списка строится один раз на модель."""
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(list[model])
+    return adapter
+
+
+def validate_batch(model: type[BaseModel], records: list) -> BatchResult:
+    """
+    Валидирует весь список одним вызовом pydantic-core. Ошибочные строки
+    не прерывают пачку: они возвращаются в errors с номером строки и
+    ошибками pydantic, а items содержит модели остальных строк в исходном порядке.
+    """
+    # пакет utils читает config - models импортируется и без окружения выгрузки
+    from api_parser.utils import metrics
+
+    with metrics.timer('validate_seconds', model=model.__name__):
+        result = _validate(get_adapter(model), records)
+    metrics.count('rows_validated', len(records), model=model.__name__)
+    if result.errors:
+        metrics.count('rows_invalid', len(result.errors), model=model.__name__)
+    return result
+
+
+def _validate(adapter: TypeAdapter, records: list) -> BatchResult:
+    try:
+        return BatchResult(adapter.validate_python(records), [])
+    except ValidationError as exc:
+        by_row: dict[int, list[dict]] = {}
+        for error in exc.errors(include_url=False):
+            if not error['loc']:
+                # пришёл не список - построчно разбирать нечего
+                raise
+            by_row.setdefault(error['loc'][0], []).append({**error, 'loc': error['loc'][1:]})
+
+    errors = [RowError(index, records[index], row_errors) for index, row_errors in sorted(by_row.items())]
+    # повторный проход только по корректным строкам - тоже одним вызовом
+    valid = [record for index, record in enumerate(records) if index not in by_row]
+    return BatchResult(adapter.validate_python(valid), errors)
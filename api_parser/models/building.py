@@ -1,25 +1,11 @@
-from pydantic import BaseModel, validator, ValidationError
-from typing import Optional, AnyStr, Any
+from pydantic import BaseModel
+from typing import Optional, AnyStr
 
-from .additionals import SubRegionEnum, RegionEnum
+from .validators import Region, SubRegion
 
 
 class BuildingModel(BaseModel):
     id: int
     name: Optional[AnyStr] = None
-    region: RegionEnum
-    subRegion: SubRegionEnum
-
-    @validator('region', pre=True)
-    def validate_region(cls, region: Any) -> str:
-        try:
-            return RegionEnum[region].value
-        except KeyError:
-            raise ValidationError(f'Unexpected region - {region}')
-
-    @validator('subRegion', pre=True)
-    def validate_sub_region(cls, subRegion: Any) -> str:
-        try:
-            return SubRegionEnum[subRegion].value
-        except KeyError:
-            raise ValidationError(f'Unexpected subRegion - {subRegion}')
+    region: Region
+    subRegion: SubRegion
@@ -0,0 +1,83 @@
+"""
+Компактное кодированное представление перечислений в таблицах.
+
+Значения RegionEnum, SubRegionEnum, ClassTypeEnum и FlatTypeEnum - длинные
+строки, которые в выгрузках повторяются в каждой строке. В кодированном режиме
+колонка хранит маленький целый код (порядковый номер члена перечисления), а
+строки лежат один раз в общем словаре: в pandas это Categorical, в Parquet -
+словарная колонка arrow с тем же словарём. Строки подставляются только при выводе.
+
+Режим не включается настройкой: ни одна выгрузка пока не пишет эти колонки
+(модели Cian API CianApiParser только возвращает), и to_frame/column_categories
+вызываются явно - сейчас только бенчмарком benchmarks/coded.py. Выгрузке таких
+моделей в Parquet достаточно передать make_exporter(..., categories=column_categories(model)).
+"""
+import functools
+from enum import Enum
+from typing import Iterable
+
+from pydantic import BaseModel
+
+from .additionals import ClassTypeEnum, FlatTypeEnum, RegionEnum, SubRegionEnum
+
+CODED_ENUMS = (RegionEnum, SubRegionEnum, ClassTypeEnum, FlatTypeEnum)
+
+# Общий словарь: перечисление -> {член: код}. Код - позиция члена в перечислении,
+# поэтому новые значения нужно добавлять в конец перечисления, чтобы старые коды не сдвигались.
+CODES: dict[type[Enum], dict[Enum, int]] = {
+    enum: {member: code for code, member in enumerate(enum)} for enum in CODED_ENUMS
+}
+
+
+def categories(enum: type[Enum]) -> list[str]:
+    """Значения перечисления в порядке кодов."""
+    return [member.value for member in enum]
+
+
+@functools.cache
+def categorical_dtype(enum: type[Enum]):
+    import pandas as pd
+
+    return pd.CategoricalDtype(categories(enum))
+
+
+@functools.cache
+def coded_fields(model: type[BaseModel]) -> dict[str, type[Enum]]:
+    """Поля модели, которые кодируются: имя поля -> перечисление."""
+    return {
+        name: field.annotation
+        for name, field in model.model_fields.items()
+        if field.annotation in CODES
+    }
+
+
+def column_categories(model: type[BaseModel]) -> dict[str, list[str]]:
+    """Словари кодированных колонок модели - например для ParquetExporter(categories=...)."""
+    return {name: categories(enum) for name, enum in coded_fields(model).items()}
+
+
+def to_frame(model: type[BaseModel], items: Iterable[BaseModel], coded: bool = True):
+    """
+    DataFrame из моделей. coded=True - поля-перечисления становятся Categorical
+    из кодов int8 по общему словарю, иначе - строками значений.
+    """
+    import numpy as np
+    import pandas as pd
+
+    items = list(items)
+    enums = coded_fields(model)
+    columns = {}
+    for name in model.model_fields:
+        values = [getattr(item, name) for item in items]
+        enum = enums.get(name)
+        if enum is None:
+            columns[name] = values
+        elif coded:
+            codes = CODES[enum]
+            columns[name] = pd.Categorical.from_codes(
+                np.fromiter((codes[value] for value in values), dtype=np.int8, count=len(values)),
+                dtype=categorical_dtype(enum),
+            )
+        else:
+            columns[name] = [value.value for value in values]
+    return pd.DataFrame(columns)
@@ -0,0 +1,42 @@
+from enum import Enum
+from typing import Annotated, Any
+
+from pydantic import BeforeValidator
+
+from .additionals import ClassTypeEnum, FlatTypeEnum, RegionEnum, SubRegionEnum
+
+
+def by_name(enum: type[Enum]) -> BeforeValidator:
+    """
+    API присылает имя члена перечисления ("moscow"), модель хранит сам член.
+    Таблица имя -> член строится один раз; уже готовый член пропускается как есть.
+    """
+    members = dict(enum.__members__)
+
+    def lookup(value: Any) -> Enum:
+        if type(value) is enum:
+            return value
+        try:
+            return members[value]
+        except (KeyError, TypeError):
+            raise ValueError(f'Unexpected {enum.__name__} - {value}') from None
+
+    return BeforeValidator(lookup)
+
+
+def yes_no(value: Any) -> str | None:
+    """Булево значение API -> "Да"/"Нет" (None остаётся None)."""
+    if value is None or value == "Да" or value == "Нет":
+        return value
+    if value is True:
+        return "Да"
+    if value is False:
+        return "Нет"
+    raise ValueError('Value must be a boolean')
+
+
+Region = Annotated[RegionEnum, by_name(RegionEnum)]
+SubRegion = Annotated[SubRegionEnum, by_name(SubRegionEnum)]
+ClassType = Annotated[ClassTypeEnum, by_name(ClassTypeEnum)]
+FlatType = Annotated[FlatTypeEnum, by_name(FlatTypeEnum)]
+YesNo = Annotated[str, BeforeValidator(yes_no)]
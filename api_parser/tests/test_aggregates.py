@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+from api_parser.benchmarks import fixtures
+from api_parser.developers.fsk.flats.flats import flat_records
+from api_parser.utils import aggregates, store
+
+
+def crawl(version, flats=300):
+    """Записи квартир выгрузки version: каждая следующая меняет цены, убирает и добавляет квартиры."""
+    records = []
+    for idx in range(flats + 30 * version):
+        if version and idx % 20 == version:
+            continue
+        flat = fixtures.make_flat(idx, f'project-{idx % 4}')
+        flat['complex']['city'] = idx % 3 + 1
+        if version and idx % 10 == version:
+            flat['price'] = int(flat['price'] * (1 + version / 20))
+            flat['areaLiving'] = None
+        records.append(flat)
+    return flat_records(records)
+
+
+def write_run(db, records, batch_size=70):
+    db.begin_run('flats')
+    for start in range(0, len(records), batch_size):
+        db.upsert('flats', records[start:start + batch_size])
+    return db.finish_run('flats')
+
+
+def expected_groups(df, column):
+    grouped = df.groupby(column)
+    result = pd.DataFrame({'count': grouped.size()})
+    for value in aggregates.VALUES:
+        stats = grouped[value].agg(['count', 'mean', 'std'])
+        result[f'{value}_count'] = stats['count']
+        result[f'{value}_mean'] = stats['mean']
+        result[f'{value}_std'] = stats['std']
+    return result
+
+
+def assert_matches(summaries, df):
+    for dimension, column in aggregates.DIMENSIONS.items():
+        pd.testing.assert_frame_equal(
+            summaries.groups(dimension), expected_groups(df, column),
+            check_dtype=False, check_names=False, rtol=1e-9,
+        )
+    pd.testing.assert_frame_equal(
+        summaries.corr(), df[list(aggregates.FEATURES)].corr(),
+        check_dtype=False, rtol=1e-9,
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    with store.Store(tmp_path / 'store.sqlite3') as db:
+        yield db
+
+
+def test_incremental_summaries_equal_full_recompute(db):
+    summaries = aggregates.attach(db)
+    for version in range(3):
+        records = crawl(version)
+        write_run(db, records)
+        assert_matches(summaries, pd.DataFrame(records))
+
+    summaries.rebuild()
+    assert_matches(summaries, pd.DataFrame(crawl(2)))
+
+
+def test_removed_flats_are_subtracted(db):
+    summaries = aggregates.attach(db)
+    first, latest = crawl(0), crawl(1)
+    write_run(db, first)
+    removed = {record['_id'] for record in first} - {record['_id'] for record in latest}
+    assert removed
+    assert write_run(db, latest) == len(removed)
+    assert db.connection.execute('SELECT COUNT(*) FROM flats').fetchone()[0] == len(latest)
+    assert_matches(summaries, pd.DataFrame(latest))
+
+
+def test_repeated_upsert_within_run_is_counted_once(db):
+    summaries = aggregates.attach(db)
+    records = crawl(0)
+    db.begin_run('flats')
+    db.upsert('flats', records)
+    # повторная запись тех же квартир (например, страница, загруженная дважды)
+    db.upsert('flats', records[:50])
+    db.finish_run('flats')
+    assert_matches(summaries, pd.DataFrame(records))
+
+
+def test_attach_builds_summaries_for_existing_flats(db):
+    write_run(db, crawl(0))
+    summaries = aggregates.attach(db)
+    assert_matches(summaries, pd.DataFrame(crawl(0)))
@@ -0,0 +1,125 @@
+import time
+
+import fakeredis
+import pytest
+
+from api_parser.data import config
+from api_parser.utils import cache as cache_module
+from api_parser.utils.cache import DiskTier, LruTier, RedisTier, ResponseCache
+
+TTLS = {'short': 1, 'long': 3600}
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    """FakeRedis, считающий обращения get - чтобы видеть, какой уровень ответил."""
+
+    gets = 0
+
+    def get(self, name):
+        self.gets += 1
+        return super().get(name)
+
+
+@pytest.fixture
+def redis():
+    return CountingRedis()
+
+
+@pytest.fixture
+def cache(redis):
+    return ResponseCache(RedisTier(redis), local=LruTier(maxsize=2), ttls=TTLS)
+
+
+def test_miss_then_hit(cache, redis):
+    assert cache.get('https://api/long/1') is None
+    cache.set('https://api/long/1', b'body')
+    assert redis.get('api_parser:https://api/long/1') == b'body'
+    assert cache.get('https://api/long/1') == b'body'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_local_miss_falls_back_to_redis(cache, redis):
+    # ответ записан другим процессом: в памяти этого его нет
+    RedisTier(redis).set('https://api/long/1', b'body', 3600)
+    assert cache.get('https://api/long/1') == b'body'
+    assert cache.get_json('https://api/long/missing') is None
+
+
+def test_ttl_by_url_fragment(cache, redis):
+    cache.set('https://api/short/1', b'short')
+    cache.set('https://api/long/1', b'long')
+    cache.set('https://api/other/1', b'other')
+    assert 0 < redis.ttl('api_parser:https://api/short/1') <= 1
+    assert 1 < redis.ttl('api_parser:https://api/long/1') <= 3600
+    assert redis.ttl('api_parser:https://api/other/1') == cache.default_ttl
+
+
+def test_expired_response_is_gone_from_both_tiers(cache, redis):
+    cache.set('https://api/short/1', b'short')
+    cache.set('https://api/long/1', b'long')
+    assert cache.get('https://api/short/1') == b'short'
+    time.sleep(1.1)
+    assert cache.local.get('https://api/short/1') is None
+    assert redis.get('api_parser:https://api/short/1') is None
+    assert cache.get('https://api/short/1') is None
+    assert cache.get('https://api/long/1') == b'long'
+
+
+def test_redis_hit_is_promoted_to_lru(cache, redis):
+    RedisTier(redis).set('https://api/long/a', b'a', 3600)
+    assert cache.get('https://api/long/a') == b'a'
+    gets = redis.gets
+    assert cache.get('https://api/long/a') == b'a'
+    assert redis.gets == gets
+
+
+def test_lru_evicts_least_recently_used(cache, redis):
+    cache.set('https://api/long/a', b'a')
+    cache.set('https://api/long/b', b'b')
+    cache.get('https://api/long/a')
+    cache.set('https://api/long/c', b'c')
+    assert cache.local.get('https://api/long/b') is None
+    assert cache.local.get('https://api/long/a') == b'a'
+
+    # вытесненный из памяти ответ поднимается из Redis одним обращением
+    gets = redis.gets
+    assert cache.get('https://api/long/b') == b'b'
+    assert redis.gets == gets + 1
+    assert cache.local.get('https://api/long/b') == b'b'
+
+
+def test_disk_tier_fallback(tmp_path):
+    cache = ResponseCache(DiskTier(tmp_path), local=LruTier(maxsize=2), ttls=TTLS)
+    cache.set('https://api/short/1', b'short')
+    assert ResponseCache(DiskTier(tmp_path), ttls=TTLS).get('https://api/short/1') == b'short'
+    time.sleep(1.1)
+    assert ResponseCache(DiskTier(tmp_path), ttls=TTLS).get('https://api/short/1') is None
+
+
+@pytest.fixture
+def cache_config(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_module, '_cache', None)
+    monkeypatch.setattr(config, 'USE_CACHE', True)
+    monkeypatch.setattr(config, 'CACHE_DIR', tmp_path, raising=False)
+    monkeypatch.setattr(config, 'CACHE_LRU_SIZE', 16, raising=False)
+    monkeypatch.setattr(config, 'CACHE_PORT', 6379, raising=False)
+    monkeypatch.setattr(config, 'CACHE_PASSWORD', None, raising=False)
+    return monkeypatch
+
+
+def test_get_cache_uses_disk_without_cache_host(cache_config):
+    cache_config.setattr(config, 'CACHE_HOST', None, raising=False)
+    assert isinstance(cache_module.get_cache().remote, DiskTier)
+
+
+def test_get_cache_uses_redis_with_cache_host(cache_config):
+    cache_config.setattr(config, 'CACHE_HOST', 'localhost', raising=False)
+    response_cache = cache_module.get_cache()
+    assert isinstance(response_cache.remote, RedisTier)
+    assert response_cache.local.maxsize == 16
+
+
+def test_get_cache_disabled(monkeypatch):
+    monkeypatch.setattr(cache_module, '_cache', None)
+    monkeypatch.setattr(config, 'USE_CACHE', False)
+    assert cache_module.get_cache() is None
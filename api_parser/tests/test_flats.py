@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import orjson
+
+from api_parser.benchmarks import fixtures
+from api_parser.data import config
+from api_parser.developers.fsk.flats import flats
+from api_parser.utils import cache, journal, revalidation
+
+URL = 'http://127.0.0.1/v3/flats/?order=asc&page=1&project_slug=project-0'
+
+
+def make_page(changed=True):
+    body = orjson.dumps(fixtures.make_flats_page('project-0', 1, 1, 3))
+    return revalidation.Page(URL, body, changed=changed)
+
+
+def test_unchanged_page_rows_follow_flats_columns(tmp_path, monkeypatch):
+    validators = revalidation.ValidatorStore(cache.DiskTier(tmp_path))
+    monkeypatch.setattr(config, 'FLATS_COLUMNS', None)
+    full = flats.flatten_page(make_page(), 0, validators)
+    assert 'project_slug' in full['rows'][0]
+
+    monkeypatch.setattr(config, 'FLATS_COLUMNS', {'price': 'price', 'slug': 'project.slug'})
+    narrow = flats.flatten_page(make_page(changed=False), 0, validators)
+    assert narrow['rows'] == [
+        {'price': flat['price'], 'slug': 'project-0', 'original_flat_id': idx}
+        for idx, flat in enumerate(make_page().data['items'])
+    ]
+    assert validators.stats.skipped_pages == 0
+
+    # тот же набор колонок - строки берутся из хранилища валидаторов
+    assert flats.flatten_page(make_page(changed=False), 0, validators)['rows'] == narrow['rows']
+    assert validators.stats.skipped_pages == 1
+
+
+def test_rows_layout_depends_on_columns(monkeypatch):
+    monkeypatch.setattr(config, 'FLATS_COLUMNS', None)
+    full = flats.rows_layout()
+    monkeypatch.setattr(config, 'FLATS_COLUMNS', {'price': 'price', 'slug': 'project.slug'})
+    narrow = flats.rows_layout()
+    monkeypatch.setattr(config, 'FLATS_COLUMNS', {'slug': 'project.slug', 'price': 'price'})
+    assert flats.rows_layout() == narrow
+    monkeypatch.setattr(config, 'FLATS_COLUMNS', {'price': 'price'})
+    assert len({full, narrow, flats.rows_layout()}) == 3
+
+
+def test_journal_restarts_when_version_changes(tmp_path):
+    path = tmp_path / 'journal.sqlite3'
+    with journal.CrawlJournal(path, 'flats_expanded', version='v3/flats') as first:
+        assert not first.begin()
+        first.record('project-0', 1, b'rows', total_pages=2)
+
+    with journal.CrawlJournal(path, 'flats_expanded', version='v3/flats') as same:
+        assert same.begin()
+        assert same.pages('project-0') == {1: 2}
+
+    with journal.CrawlJournal(path, 'flats_expanded', version='v3/flats#columns') as other:
+        assert not other.begin()
+        assert other.pages('project-0') == {}
+
+
+def test_paths_import_without_environment_config():
+    # движок путей используется и archive/scraping_v0/card_parser.py, где настроек api_parser нет
+    code = ("import sys; from api_parser.utils import paths; "
+            "assert paths.compile_path('b[0].c')({'b': [{'c': 1}]}) == 1; assert 'api_parser.data.config' not in sys.modules")
+    env = {'PATH': os.environ.get('PATH', '')}
+    subprocess.run([sys.executable, '-c', code], check=True, env=env, cwd=Path(__file__).resolve().parents[2])
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from api_parser.benchmarks import fixtures
+from api_parser.benchmarks.recordings import Recorder
+from api_parser.benchmarks.stub_server import StubFskServer
+from api_parser.data import config
+from api_parser.master import CianApiParser
+from api_parser.utils import streaming
+
+# Размер ответа v2/get-prices для сверки через сервер; PRICE_STREAM_MB=300 - проверка на боевом объёме
+FIXTURE_MB = int(os.environ.get('PRICE_STREAM_MB', 5))
+
+DOCUMENT = {
+    'total': 3,
+    'meta': {'source': 'Циан "API"', 'nested': [1, [2, {'x': None}]]},
+    'priceList': [
+        {'region': 'moscow', 'minPrice': 12345678, 'title': 'Квартира «у метро»\n\\', 'rate': 1.5e-3},
+        {'region': 'spb', 'minPrice': -1, 'flags': [True, False, None], 'empty': {}},
+        12345678901234567890,
+    ],
+    'after': 'ключ после массива',
+}
+
+
+def chunked(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 1 << 16])
+def test_items_equal_json_loads_for_any_chunk_size(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    assert list(streaming.iter_json_array(chunked(data, size), 'priceList')) == DOCUMENT['priceList']
+
+
+@pytest.mark.parametrize('body', [b'{"priceList": []}', b'{"priceList":[ ] , "total": 0}', b' {\n"priceList" :[]}'])
+def test_empty_array(body):
+    assert list(streaming.iter_json_array(chunked(body, 1), 'priceList')) == []
+
+
+@pytest.mark.parametrize('cut', [1, 10, 15, 40, -30, -1])
+def test_truncated_stream_raises(cut):
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    # обрезка после массива не мешает: все элементы уже отданы
+    truncated = data[:cut] if cut > 0 else data[:data.index(b'],') + cut]
+    with pytest.raises(ValueError):
+        list(streaming.iter_json_array(chunked(truncated, 5), 'priceList'))
+
+
+@pytest.mark.parametrize('body, head', [
+    (b'{"errors": [{"code": 401}], "message": "Unauthorized"}', {'errors': [{'code': 401}], 'message': 'Unauthorized'}),
+    (b'{"priceList": null, "message": "empty"}', {'priceList': None, 'message': 'empty'}),
+    (b'{}', {}),
+])
+def test_non_array_payload_reports_head(body, head):
+    with pytest.raises(streaming.ArrayNotFoundError) as error:
+        list(streaming.iter_json_array(chunked(body, 4), 'priceList'))
+    assert error.value.head == head
+
+
+def test_non_object_payload_raises():
+    with pytest.raises(ValueError):
+        list(streaming.iter_json_array([b'[1, 2, 3]'], 'priceList'))
+
+
+def serve_prices(tmp_path, body):
+    """Заглушка Cian API, отдающая body как ответ v2/get-prices (через папку записей)."""
+    (tmp_path / 'get-prices.json').write_bytes(body)
+    recorder = Recorder(tmp_path)
+    recorder.register('v2/get-prices/', 'get-prices.json', 'application/json')
+    recorder.save()
+    return StubFskServer(latency=0, recordings=tmp_path)
+
+
+@pytest.fixture
+def cian(monkeypatch):
+    monkeypatch.setattr(config, 'USE_CACHE', False)
+    monkeypatch.setattr(config, 'REVALIDATE', False)
+
+    def parser(server):
+        monkeypatch.setattr(config, 'CIAN_API_URL', server.url)
+        return CianApiParser()
+    return parser
+
+
+def test_streaming_equals_json_loads_on_large_response(tmp_path, cian):
+    count = fixtures.write_price_list(tmp_path / 'prices.json', FIXTURE_MB)
+    with serve_prices(tmp_path, (tmp_path / 'prices.json').read_bytes()) as server:
+        parser = cian(server)
+        streamed = list(parser.iter_prices())
+        assert len(streamed) == count
+        assert streamed == parser.get_prices()
+
+
+def test_truncated_response_raises(tmp_path, cian):
+    body = json.dumps({'priceList': fixtures.make_price_items(100)}).encode()
+    with serve_prices(tmp_path, body[:len(body) // 2]) as server:
+        parser = cian(server)
+        with pytest.raises(ValueError):
+            list(parser.iter_prices())
+        with pytest.raises(ValueError):
+            parser.get_prices()
+
+
+def test_empty_price_list(tmp_path, cian):
+    with serve_prices(tmp_path, b'{"priceList": [], "total": 0}') as server:
+        parser = cian(server)
+        assert list(parser.iter_prices()) == parser.get_prices() == []
+
+
+def test_error_payload_raises_message(tmp_path, cian):
+    with serve_prices(tmp_path, b'{"errors": [{"code": 401}], "message": "Unauthorized"}') as server:
+        parser = cian(server)
+        with pytest.raises(ValueError, match='Unauthorized'):
+            list(parser.iter_prices())
+        with pytest.raises(ValueError, match='Unauthorized'):
+            parser.get_prices()
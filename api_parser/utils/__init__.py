@@ -1 +1,17 @@
-from . import logging, parsing
+"""
+Подмодули загружаются при первом обращении (api_parser.utils.cache,
+from api_parser.utils import paths): модулям, которым не нужны настройки
+окружения, например движку путей paths, не требуется api_parser.data.config.
+"""
+import importlib
+
+__all__ = [
+    'aggregates', 'cache', 'changes', 'dag', 'export', 'fetching', 'flattening', 'http', 'journal', 'logging',
+    'metrics', 'parsing', 'paths', 'preprocessing', 'revalidation', 'store', 'streaming',
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,221 @@
+"""
+Материализованные сводки по квартирам для аналитики «цена против признаков».
+
+Сводки лежат в той же базе, что и utils.store, и обновляются в транзакции
+каждой пачки upsert таблицы flats: вклад прежней версии квартиры (из
+хранилища) вычитается, вклад новой прибавляется. Квартиры, которые
+Store.finish_run удаляет после полной выгрузки (снятые с продажи), тоже
+вычитаются, так что сводки соответствуют последней выгрузке. Поэтому средние по ЖК, комнатности и региону и
+корреляционная матрица читаются за O(групп), а не пересчитываются по всем
+квартирам.
+
+- flats_groups: по каждому разрезу и значению группы - число квартир и
+  count/sum/sum of squares значений (цены, площади);
+- flats_comoments: по каждой паре признаков - число квартир, где заданы оба,
+  суммы, суммы квадратов и сумма произведений (попарная корреляция, как
+  DataFrame.corr()).
+"""
+import math
+
+import numpy as np
+import orjson
+
+# разрез -> поле развёрнутой строки квартиры
+DIMENSIONS = {
+    'complex': 'complex_title',
+    'rooms': 'rooms',
+    'region': 'complex_city',
+}
+# значения, для которых в разрезах считаются count/sum/sum of squares
+VALUES = ('price', 'areaTotal')
+# числовые признаки корреляционной матрицы
+FEATURES = ('price', 'areaTotal', 'areaLiving', 'areaKitchen', 'rooms', 'discount', 'floorNumber')
+
+
+def _number(value):
+    """Число для сводок; bool, строки и пропуски не считаются (как select_dtypes(np.number))."""
+    if type(value) is int or type(value) is float:
+        return value
+    return None
+
+
+class FlatsSummaries:
+    """
+    Сводки по таблице flats в соединении SQLite хранилища.
+    Подключаются к Store через attach(); rebuild() пересчитывает их с нуля.
+    """
+
+    def __init__(self, connection, dimensions=None, values=VALUES, features=FEATURES):
+        self.connection = connection
+        self.dimensions = DIMENSIONS if dimensions is None else dimensions
+        self.values = values
+        self.features = features
+        value_columns = ', '.join(
+            f'"{value}_n" INTEGER, "{value}_sum" REAL, "{value}_sumsq" REAL' for value in values
+        )
+        with connection:
+            connection.execute(f'''
+                CREATE TABLE IF NOT EXISTS flats_groups (
+                    dimension TEXT NOT NULL,
+                    grp NOT NULL,
+                    n INTEGER NOT NULL,
+                    {value_columns},
+                    PRIMARY KEY (dimension, grp)
+                )
+            ''')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS flats_comoments (
+                    a TEXT NOT NULL,
+                    b TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    sum_a REAL NOT NULL,
+                    sum_aa REAL NOT NULL,
+                    sum_ab REAL NOT NULL,
+                    PRIMARY KEY (a, b)
+                )
+            ''')
+
+        columns = ['n'] + [f'{value}_{part}' for value in values for part in ('n', 'sum', 'sumsq')]
+        quoted = [f'"{column}"' for column in columns]
+        self._groups_statement = (
+            f'INSERT INTO flats_groups (dimension, grp, {", ".join(quoted)}) '
+            f'VALUES (?, ?, {", ".join("?" * len(columns))}) ON CONFLICT (dimension, grp) DO UPDATE SET '
+            + ', '.join(f'{column} = {column} + excluded.{column}' for column in quoted)
+        )
+
+    def __call__(self, removed, added):
+        self.apply(removed, added)
+
+    def apply(self, removed, added):
+        """
+        Вычитает вклад строк removed (прежние версии обновляемых и удаляемые
+        квартиры) и прибавляет вклад строк added (в текущей транзакции).
+        """
+        rows = [*removed, *added]
+        if not rows:
+            return
+        signs = [-1] * len(removed) + [1] * len(added)
+        self._apply_groups(rows, signs)
+        self._apply_comoments(rows, np.array(signs, dtype=float))
+
+    def _apply_groups(self, rows, signs):
+        deltas = {}
+        for row, sign in zip(rows, signs):
+            contribution = [sign]
+            for value in self.values:
+                x = _number(row.get(value))
+                contribution += (0, 0, 0) if x is None else (sign, sign * x, sign * x * x)
+            for dimension, column in self.dimensions.items():
+                group = row.get(column)
+                # как в groupby: квартиры без значения группы не попадают ни в одну группу
+                if group is None or isinstance(group, (dict, list)):
+                    continue
+                delta = deltas.get((dimension, group))
+                if delta is None:
+                    deltas[(dimension, group)] = list(contribution)
+                else:
+                    for idx, part in enumerate(contribution):
+                        delta[idx] += part
+        self.connection.executemany(self._groups_statement, ([*key, *delta] for key, delta in deltas.items()))
+        # группы, из которых ушли все квартиры, удаляются
+        self.connection.execute('DELETE FROM flats_groups WHERE n <= 0')
+
+    def _apply_comoments(self, rows, signs):
+        matrix = np.array([[_number(row.get(feature)) for feature in self.features] for row in rows], dtype=float)
+        present = ~np.isnan(matrix)
+        values = np.where(present, matrix, 0.0)
+        present = present.astype(float)
+        weighted = values * signs[:, None]
+        # [a, b]: по строкам, где заданы оба признака
+        n = (present * signs[:, None]).T @ present
+        sum_a = weighted.T @ present
+        sum_aa = (weighted * values).T @ present
+        sum_ab = weighted.T @ values
+        self.connection.executemany('''
+            INSERT INTO flats_comoments (a, b, n, sum_a, sum_aa, sum_ab) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (a, b) DO UPDATE SET
+                n = n + excluded.n,
+                sum_a = sum_a + excluded.sum_a,
+                sum_aa = sum_aa + excluded.sum_aa,
+                sum_ab = sum_ab + excluded.sum_ab
+        ''', (
+            (a, b, int(n[i, j]), sum_a[i, j], sum_aa[i, j], sum_ab[i, j])
+            for i, a in enumerate(self.features)
+            for j, b in enumerate(self.features)
+        ))
+
+    def rebuild(self, batch_size=5_000):
+        """Пересчитывает сводки по всей таблице flats (начальное заполнение или сброс накопленной погрешности)."""
+        with self.connection:
+            self.connection.execute('DELETE FROM flats_groups')
+            self.connection.execute('DELETE FROM flats_comoments')
+            cursor = self.connection.execute('SELECT data FROM flats')
+            while batch := cursor.fetchmany(batch_size):
+                self.apply([], [orjson.loads(data) for data, in batch])
+
+    def is_empty(self):
+        return self.connection.execute('SELECT 1 FROM flats_comoments LIMIT 1').fetchone() is None
+
+    def groups(self, dimension):
+        """
+        Сводка разреза как DataFrame по значениям группы: count (квартир) и для
+        каждого значения - {value}_count, {value}_mean, {value}_std (ddof=1, как в pandas).
+        """
+        import pandas as pd
+
+        cursor = self.connection.execute(
+            'SELECT * FROM flats_groups WHERE dimension = ? ORDER BY grp', (dimension,),
+        )
+        names = [column[0] for column in cursor.description]
+        records = [dict(zip(names, row)) for row in cursor]
+        frame = {'count': [record['n'] for record in records]}
+        for value in self.values:
+            stats = [_moments(record[f'{value}_n'], record[f'{value}_sum'], record[f'{value}_sumsq'])
+                     for record in records]
+            frame[f'{value}_count'] = [record[f'{value}_n'] for record in records]
+            frame[f'{value}_mean'] = [mean for mean, _ in stats]
+            frame[f'{value}_std'] = [std for _, std in stats]
+        return pd.DataFrame(frame, index=pd.Index([record['grp'] for record in records], name=dimension))
+
+    def corr(self):
+        """Корреляционная матрица Пирсона признаков - как DataFrame.corr() по квартирам."""
+        import pandas as pd
+
+        moments = {
+            (a, b): (n, sum_a, sum_aa, sum_ab)
+            for a, b, n, sum_a, sum_aa, sum_ab in self.connection.execute('SELECT * FROM flats_comoments')
+        }
+        matrix = pd.DataFrame(np.nan, index=list(self.features), columns=list(self.features))
+        for a in self.features:
+            for b in self.features:
+                if (a, b) not in moments:
+                    continue
+                n, sum_a, sum_aa, sum_ab = moments[(a, b)]
+                _, sum_b, sum_bb, _ = moments[(b, a)]
+                variance = (n * sum_aa - sum_a ** 2) * (n * sum_bb - sum_b ** 2)
+                if n > 1 and variance > 0:
+                    matrix.loc[a, b] = (n * sum_ab - sum_a * sum_b) / math.sqrt(variance)
+        return matrix
+
+
+def _moments(n, total, total_sq):
+    """(среднее, стандартное отклонение с ddof=1) по count/sum/sum of squares."""
+    if not n:
+        return None, None
+    mean = total / n
+    if n < 2:
+        return mean, None
+    return mean, math.sqrt(max(0.0, (total_sq - n * mean * mean) / (n - 1)))
+
+
+def attach(store):
+    """
+    Подключает сводки к таблице flats хранилища: дальше они обновляются каждым upsert.
+    Если в хранилище уже есть квартиры, а сводок ещё нет, они строятся по ним.
+    Возвращает FlatsSummaries для чтения сводок.
+    """
+    summaries = FlatsSummaries(store.connection)
+    if summaries.is_empty():
+        summaries.rebuild()
+    store.watch('flats', summaries)
+    return summaries
@@ -0,0 +1,162 @@
+import collections
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import orjson
+
+from api_parser.data import config
+
+
+# Время жизни ответов по фрагменту url (первое совпадение), в секундах
+ENDPOINT_TTLS = {
+    'v3/projects/all': 6 * 3600,
+    'v3/flats': 3600,
+    '/progress': 12 * 3600,
+    'v2/get-newbuildings': 24 * 3600,
+    'v2/get-prices': 3600,
+}
+DEFAULT_TTL = 3600
+
+
+class LruTier:
+    """Кэш в памяти процесса: не больше maxsize записей, вытесняются давно не использованные."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.time():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl):
+        self._items[key] = (time.time() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+class RedisTier:
+    """
+    Удалённый кэш поверх Redis-совместимого клиента.
+    Нужны только методы get(key) и set(key, value, ex=ttl), поэтому
+    подходит и redis.Redis, и fakeredis.FakeRedis.
+    """
+
+    def __init__(self, client, prefix='api_parser:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+
+class DiskTier:
+    """Кэш в файлах на диске: используется, когда сервер кэша не настроен."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / hashlib.sha1(key.encode()).hexdigest()
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        # первые 8 байт - момент истечения срока в миллисекундах
+        if int.from_bytes(data[:8], 'big') < time.time() * 1000:
+            path.unlink(missing_ok=True)
+            return None
+        return data[8:]
+
+    def set(self, key, value, ttl):
+        path = self._path(key)
+        expires_at = int((time.time() + ttl) * 1000).to_bytes(8, 'big')
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(expires_at + value)
+        os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш тел HTTP-ответов: LRU в памяти перед удалённым
+    (Redis) или дисковым уровнем. Значения - байты тела ответа.
+    """
+
+    def __init__(self, remote, local=None, ttls=None, default_ttl=DEFAULT_TTL):
+        self.remote = remote
+        self.local = local if local is not None else LruTier()
+        self.ttls = ENDPOINT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, url):
+        for fragment, ttl in self.ttls.items():
+            if fragment in url:
+                return ttl
+        return self.default_ttl
+
+    def get(self, url):
+        value = self.local.get(url)
+        if value is None:
+            value = self.remote.get(url)
+            if value is not None:
+                self.local.set(url, value, self.ttl_for(url))
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, url, value):
+        ttl = self.ttl_for(url)
+        self.local.set(url, value, ttl)
+        self.remote.set(url, value, ttl)
+
+    def get_json(self, url):
+        value = self.get(url)
+        return None if value is None else orjson.loads(value)
+
+
+_cache = None
+
+
+def get_cache():
+    """
+    Общий кэш ответов по настройкам config: None, если USE_CACHE выключен;
+    Redis, если задан CACHE_HOST; иначе файлы в CACHE_DIR.
+    """
+    global _cache
+    if _cache is None and config.USE_CACHE:
+        if config.CACHE_HOST:
+            import redis
+
+            remote = RedisTier(redis.Redis(
+                host=config.CACHE_HOST,
+                port=config.CACHE_PORT,
+                password=config.CACHE_PASSWORD,
+            ))
+        else:
+            remote = DiskTier(config.CACHE_DIR)
+        _cache = ResponseCache(remote, local=LruTier(config.CACHE_LRU_SIZE))
+    return _cache
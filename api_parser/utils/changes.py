@@ -0,0 +1,158 @@
+import hashlib
+import itertools
+import sqlite3
+from pathlib import Path
+
+import orjson
+
+from api_parser.data import config
+
+
+def record_digest(record):
+    """Хэш записи, не зависящий от порядка ключей."""
+    return hashlib.blake2b(orjson.dumps(record, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+class ChangeTracker:
+    """
+    Поиск изменений между выгрузками (CDC) по стабильному ключу записи.
+
+    Предыдущий снимок хранится в SQLite как индекс ключ -> (хэш, цена), поэтому
+    новая выгрузка сравнивается с ним потоково, пачками по batch_size, не загружая
+    каталог в память. Найденные вставки и изменения копятся во временной таблице
+    до commit(): незавершённый запуск откатывается и не портит снимок.
+    name - имя снимка (у каждой выгрузки свой).
+    """
+
+    def __init__(self, path, name, batch_size=500):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.batch_size = batch_size
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                price NUMERIC,
+                slug TEXT,
+                run INTEGER NOT NULL,
+                PRIMARY KEY (name, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS snapshots_run ON snapshots (name, run);
+            CREATE TABLE IF NOT EXISTS snapshot_runs (
+                name TEXT PRIMARY KEY,
+                run INTEGER NOT NULL
+            );
+            CREATE TEMP TABLE IF NOT EXISTS changes (
+                op TEXT NOT NULL,
+                key TEXT NOT NULL,
+                slug TEXT,
+                price NUMERIC,
+                price_old NUMERIC
+            );
+        ''')
+        row = self._connection.execute('SELECT run FROM snapshot_runs WHERE name = ?', (name,)).fetchone()
+        self.run = 1 if row is None else row[0] + 1
+
+    def track(self, slug, keys):
+        """
+        Сравнивает записи со снимком. keys - [(ключ, хэш, цена), ...],
+        например unit['keys'] страницы из flats.flatten_page.
+        """
+        keys = iter(keys)
+        while batch := list(itertools.islice(keys, self.batch_size)):
+            placeholders = ', '.join('?' * len(batch))
+            previous = {
+                key: (digest, price)
+                for key, digest, price in self._connection.execute(
+                    f'SELECT key, digest, price FROM snapshots WHERE name = ? AND key IN ({placeholders})',
+                    (self.name, *(entry[0] for entry in batch)),
+                )
+            }
+
+            changes = []
+            for key, digest, price in batch:
+                old = previous.get(key)
+                if old is None:
+                    changes.append(('insert', key, slug, price, None))
+                    self.inserted += 1
+                elif old[0] != digest:
+                    changes.append(('update', key, slug, price, old[1]))
+                    self.updated += 1
+                else:
+                    self.unchanged += 1
+
+            self._connection.executemany('INSERT INTO changes VALUES (?, ?, ?, ?, ?)', changes)
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO snapshots (name, key, digest, price, slug, run) VALUES (?, ?, ?, ?, ?, ?)',
+                [(self.name, key, digest, price, slug, self.run) for key, digest, price in batch],
+            )
+
+    def changes(self):
+        """
+        Записи изменений: вставки и изменения в порядке обхода, затем удалённые
+        (записи прошлого снимка, не встретившиеся в этом запуске).
+        Вызывается после обработки всей выгрузки.
+        """
+        for op, key, slug, price, price_old in self._connection.execute(
+            'SELECT op, key, slug, price, price_old FROM changes ORDER BY rowid',
+        ):
+            yield self._change(op, key, slug, price, price_old)
+
+        for key, slug, price_old in self._connection.execute(
+            'SELECT key, slug, price FROM snapshots WHERE name = ? AND run < ? ORDER BY slug, key',
+            (self.name, self.run),
+        ):
+            yield self._change('delete', key, slug, None, price_old)
+
+    @staticmethod
+    def _change(op, key, slug, price, price_old):
+        delta = None if price is None or price_old is None else price - price_old
+        return {
+            'op': op,
+            '_id': key,
+            'project_slug': slug,
+            'price': price,
+            'price_old': price_old,
+            'price_delta': delta,
+        }
+
+    def commit(self):
+        """Делает текущую выгрузку снимком для следующего сравнения."""
+        with self._connection:
+            self.deleted = self._connection.execute(
+                'DELETE FROM snapshots WHERE name = ? AND run < ?', (self.name, self.run),
+            ).rowcount
+            self._connection.execute(
+                'INSERT OR REPLACE INTO snapshot_runs (name, run) VALUES (?, ?)', (self.name, self.run),
+            )
+            self._connection.execute('DELETE FROM changes')
+
+    def rollback(self):
+        """Выгрузка неполная - снимок остаётся прежним."""
+        self._connection.rollback()
+
+    def summary(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'unchanged': self.unchanged,
+        }
+
+    def close(self):
+        self._connection.close()
+
+
+def open_tracker(name):
+    """Поиск изменений по настройкам config: None, если CDC выключен."""
+    if not config.CDC:
+        return None
+    return ChangeTracker(config.SNAPSHOTS_PATH, name)
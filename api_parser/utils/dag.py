@@ -0,0 +1,109 @@
+"""
+Запуск этапов выгрузки как графа зависимостей.
+
+Этап - функция, которая получает результаты своих зависимостей позиционными
+аргументами в порядке deps. Каждый этап выполняется один раз, даже если от него
+зависят несколько других; независимые ветви идут параллельно в пуле потоков.
+Если этап упал, зависящие от него этапы пропускаются, остальные ветви доходят до конца.
+"""
+import concurrent.futures
+import time
+from typing import Any, Callable, NamedTuple
+
+from api_parser.utils import metrics
+
+
+class StageResult(NamedTuple):
+    name: str
+    status: str                 # 'ok', 'failed' или 'skipped'
+    started: float              # секунды от начала запуска
+    elapsed: float
+    value: Any = None
+    error: BaseException | None = None
+
+
+class Dag:
+    """Этапы с зависимостями; зависимости объявляются раньше зависящих от них этапов."""
+
+    def __init__(self):
+        self._stages: dict[str, tuple[Callable, tuple[str, ...]]] = {}
+
+    def add(self, name: str, func: Callable, deps=()) -> 'Dag':
+        if name in self._stages:
+            raise ValueError(f"Stage {name} is already defined")
+        unknown = [dep for dep in deps if dep not in self._stages]
+        if unknown:
+            raise ValueError(f"Unknown dependencies of stage {name} - {unknown}")
+        self._stages[name] = (func, tuple(deps))
+        return self
+
+    def run(self, workers=None, logger=None) -> dict[str, StageResult]:
+        """
+        Выполняет все этапы, запуская каждый, как только готовы его зависимости.
+        Возвращает {этап: StageResult} в порядке объявления этапов.
+        """
+        origin = time.perf_counter()
+        results: dict[str, StageResult] = {}
+        pending = dict(self._stages)
+        running: dict[concurrent.futures.Future, str] = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers or max(1, len(pending))) as executor:
+            while pending or running:
+                # этапы объявлены после своих зависимостей, поэтому цепочка
+                # пропусков разрешается за один проход
+                for name, (func, deps) in list(pending.items()):
+                    if any(dep not in results for dep in deps):
+                        continue
+                    del pending[name]
+                    failed = [dep for dep in deps if results[dep].status != 'ok']
+                    if failed:
+                        results[name] = StageResult(name, 'skipped', time.perf_counter() - origin, 0.0)
+                        if logger is not None:
+                            logger.warning(f"Этап {name} пропущен: не выполнены {', '.join(failed)}")
+                        continue
+                    args = [results[dep].value for dep in deps]
+                    running[executor.submit(_call, name, func, args, origin)] = name
+                    if logger is not None:
+                        logger.info(f"Запускаем этап {name}")
+
+                if not running:
+                    continue
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result = results[name] = StageResult(name, *future.result())
+                    if logger is None:
+                        continue
+                    if result.status == 'ok':
+                        logger.info(f"Этап {name} завершён за {result.elapsed:.1f} с")
+                    else:
+                        logger.error(f"Этап {name} завершился ошибкой за {result.elapsed:.1f} с: {result.error!r}",
+                                     exc_info=result.error)
+
+        return {name: results[name] for name in self._stages}
+
+
+def _call(name, func, args, origin):
+    """
+    Выполняет этап в потоке пула; время считается без ожидания в очереди.
+    При включённых метриках оно же попадает в stage_seconds.
+    """
+    started = time.perf_counter()
+    try:
+        with metrics.stage(name):
+            value, status, error = func(*args), 'ok', None
+    except Exception as exc:
+        value, status, error = None, 'failed', exc
+    return status, started - origin, time.perf_counter() - started, value, error
+
+
+def format_timings(results: dict[str, StageResult]) -> str:
+    """Таблица этапов: статус, начало и длительность, плюс общее время запуска."""
+    width = max([len('этап')] + [len(name) for name in results])
+    lines = [f"{'этап':<{width}}  {'статус':<7}  {'начало, с':>9}  {'время, с':>8}"]
+    for result in results.values():
+        lines.append(f"{result.name:<{width}}  {result.status:<7}  {result.started:>9.1f}  {result.elapsed:>8.1f}")
+    wall = max((result.started + result.elapsed for result in results.values()), default=0.0)
+    total = sum(result.elapsed for result in results.values())
+    lines.append(f"всего: {wall:.1f} с, сумма времени этапов: {total:.1f} с")
+    return '\n'.join(lines)
@@ -0,0 +1,295 @@
+import csv
+import os
+import tempfile
+
+import orjson
+
+from api_parser.data import config
+from api_parser.utils import metrics
+
+
+class _ColumnStats:
+    """Собирает типы значений колонки, чтобы вывести их так же, как pandas."""
+
+    __slots__ = ('has_int', 'has_float', 'has_bool', 'has_other', 'has_missing')
+
+    def __init__(self, has_missing=False):
+        self.has_int = self.has_float = self.has_bool = self.has_other = False
+        self.has_missing = has_missing
+
+    def update(self, value):
+        if value is None:
+            self.has_missing = True
+        elif value is True or value is False:
+            self.has_bool = True
+        elif isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                self.has_int = True
+            else:
+                self.has_other = True
+        elif isinstance(value, float):
+            self.has_float = True
+        else:
+            self.has_other = True
+
+    def formatter(self):
+        """Функция форматирования значения по dtype, который вывел бы pd.DataFrame."""
+        numeric = (self.has_int or self.has_float) and not (self.has_bool or self.has_other)
+        if numeric and (self.has_float or self.has_missing):
+            # float64: целые печатаются как 3.0, пропуски - пустой строкой
+            return lambda value: '' if value is None else repr(float(value))
+        return lambda value: '' if value is None else str(value)
+
+
+def _dumps(row):
+    """
+    Строка во временный файл. Целые больше 64 бит orjson не сериализует - если
+    такие есть, все целые вне int64 пишутся строками: колонка с ними всё равно
+    выводится строками (has_other).
+    """
+    try:
+        return orjson.dumps(row)
+    except orjson.JSONEncodeError:
+        return orjson.dumps(_big_ints_to_str(row))
+
+
+def _big_ints_to_str(value):
+    if type(value) is int and not -2 ** 63 <= value < 2 ** 63:
+        return str(value)
+    if type(value) is dict:
+        return {key: _big_ints_to_str(item) for key, item in value.items()}
+    if type(value) is list:
+        return [_big_ints_to_str(item) for item in value]
+    return value
+
+
+class _SpoolingExporter:
+    """
+    Основа потоковых экспортёров с постоянным расходом памяти.
+
+    Строки пачками по batch_size сбрасываются во временный файл, параллельно
+    запоминаются порядок колонок и типы значений. Итоговый файл формируется
+    при закрытии, когда известен полный набор колонок.
+    """
+
+    extension = None
+
+    def __init__(self, path, batch_size=10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._columns = {}
+        self._batch = []
+        self._spool = tempfile.NamedTemporaryFile(
+            mode='w+b', prefix='export_', suffix='.jsonl', dir=os.path.dirname(os.path.abspath(path)), delete=False,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._cleanup()
+
+    def write(self, row):
+        for key, value in row.items():
+            stats = self._columns.get(key)
+            if stats is None:
+                # колонка появилась не в первой строке - в предыдущих строках она пропущена
+                stats = self._columns[key] = _ColumnStats(has_missing=self.rows_written > 0)
+            stats.update(value)
+        for key, stats in self._columns.items():
+            if key not in row:
+                stats.has_missing = True
+
+        self._batch.append(row)
+        self.rows_written += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def write_rows(self, rows):
+        with metrics.timer('export_write_seconds', output=os.path.basename(self.path)):
+            for row in rows:
+                self.write(row)
+
+    def write_frame(self, df):
+        """Записывает DataFrame: NaN становятся пропусками, значения - обычными типами Python."""
+        self.write_rows(df.astype(object).where(df.notna(), None).to_dict('records'))
+
+    def close(self):
+        try:
+            self._flush()
+            self._spool.seek(0)
+            with metrics.timer('export_render_seconds', output=os.path.basename(self.path)):
+                self._render()
+            metrics.count('rows_written', self.rows_written, output=os.path.basename(self.path))
+        finally:
+            self._cleanup()
+
+    def _render(self):
+        raise NotImplementedError
+
+    def _iter_batches(self):
+        """Строки из временного файла пачками по batch_size."""
+        batch = []
+        for line in self._spool:
+            batch.append(orjson.loads(line))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _flush(self):
+        self._spool.writelines(_dumps(row) + b'\n' for row in self._batch)
+        self._batch.clear()
+
+    def _cleanup(self):
+        self._spool.close()
+        os.unlink(self._spool.name)
+
+
+class CsvExporter(_SpoolingExporter):
+    """
+    Потоковая запись строк-словарей в CSV. Результат побайтно совпадает
+    с pd.DataFrame(rows).to_csv(path, index=False, encoding=...).
+    """
+
+    extension = 'csv'
+
+    def __init__(self, path, encoding="utf-8-sig", batch_size=10_000):
+        super().__init__(path, batch_size=batch_size)
+        self.encoding = encoding
+
+    def _render(self):
+        columns = list(self._columns)
+        formatters = [self._columns[column].formatter() for column in columns]
+
+        with open(self.path, 'w', encoding=self.encoding, newline='') as f:
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(columns)
+            for batch in self._iter_batches():
+                writer.writerows(
+                    [fmt(row.get(column)) for column, fmt in zip(columns, formatters)]
+                    for row in batch
+                )
+
+
+class ParquetExporter(_SpoolingExporter):
+    """
+    Потоковая запись строк-словарей в Parquet (pyarrow).
+
+    Типы колонок выводятся по всем строкам: int64, float64, bool или строка.
+    Каждая пачка batch_size строк становится отдельной row group.
+    Колонки из dictionary_columns хранятся как словарные (в pandas читаются
+    как Categorical) - это выгодно для повторяющихся значений вроде complex_title.
+    categories задаёт для колонок заранее известный общий словарь
+    ({колонка: значения в порядке кодов}, см. models.codes.column_categories):
+    в файл пишутся коды int8/int16 по этому словарю, неизвестное значение - ошибка.
+    """
+
+    extension = 'parquet'
+
+    def __init__(self, path, batch_size=100_000, dictionary_columns=(), compression='zstd', categories=None):
+        super().__init__(path, batch_size=batch_size)
+        self.dictionary_columns = set(dictionary_columns)
+        self.compression = compression
+        self.categories = {column: list(values) for column, values in (categories or {}).items()}
+
+    def _render(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = list(self._columns)
+        types = [self._column_type(pa, column, self._columns[column]) for column in columns]
+        schema = pa.schema([(column, arrow_type) for column, (arrow_type, _) in zip(columns, types)])
+        # словари и таблицы кодов строятся один раз и общие для всех row group
+        coded = {
+            column: (pa.array(values, type=pa.string()), {value: code for code, value in enumerate(values)})
+            for column, values in self.categories.items()
+        }
+
+        with pq.ParquetWriter(self.path, schema, compression=self.compression) as writer:
+            for batch in self._iter_batches():
+                arrays = [
+                    self._encode(pa, column, batch, arrow_type, *coded[column]) if column in coded
+                    else pa.array([convert(row.get(column)) for row in batch], type=arrow_type)
+                    for column, (arrow_type, convert) in zip(columns, types)
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=len(batch))
+
+    @staticmethod
+    def _encode(pa, column, batch, arrow_type, dictionary, codes):
+        """Словарный массив колонки из кодов по заданному общему словарю."""
+        indices = []
+        for row in batch:
+            value = row.get(column)
+            if value is None:
+                indices.append(None)
+                continue
+            try:
+                indices.append(codes[value])
+            except KeyError:
+                raise ValueError(f"Unexpected value in column {column} - {value}")
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=arrow_type.index_type), dictionary)
+
+    def _column_type(self, pa, column, stats):
+        """Тип arrow для колонки и функция приведения значений к нему."""
+        if column in self.categories:
+            size = len(self.categories[column])
+            index_type = pa.int8() if size <= 2 ** 7 else pa.int16() if size <= 2 ** 15 else pa.int32()
+            return pa.dictionary(index_type, pa.string()), None
+        if stats.has_other or (stats.has_bool and (stats.has_int or stats.has_float)):
+            arrow_type, convert = pa.string(), _to_str
+        elif stats.has_bool:
+            arrow_type, convert = pa.bool_(), None
+        elif stats.has_float:
+            arrow_type, convert = pa.float64(), _to_float
+        elif stats.has_int:
+            arrow_type, convert = pa.int64(), None
+        else:
+            # в колонке только пропуски
+            arrow_type, convert = pa.string(), None
+
+        if column in self.dictionary_columns and arrow_type == pa.string():
+            arrow_type = pa.dictionary(pa.int32(), arrow_type)
+        return arrow_type, convert or _identity
+
+
+def _identity(value):
+    return value
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+EXPORTERS = {
+    CsvExporter.extension: CsvExporter,
+    ParquetExporter.extension: ParquetExporter,
+}
+
+
+def make_exporter(name, output_format=None, output_dir='.', **options):
+    """
+    Экспортёр для набора данных name в формате output_format
+    (по умолчанию config.OUTPUT_FORMAT): name='flats_expanded' -> flats_expanded.csv.
+    """
+    if output_format is None:
+        output_format = config.OUTPUT_FORMAT
+
+    try:
+        exporter_cls = EXPORTERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unexpected output format - {output_format}")
+
+    if exporter_cls is CsvExporter:
+        options.pop('dictionary_columns', None)
+        options.pop('categories', None)
+    return exporter_cls(os.path.join(output_dir, f"{name}.{exporter_cls.extension}"), **options)
@@ -0,0 +1,182 @@
+import asyncio
+import collections
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+import orjson
+
+from api_parser.utils import metrics
+from api_parser.utils.cache import get_cache
+from api_parser.utils.http import RETRY_STATUSES, Backoff, CircuitBreaker, parse_retry_after
+from api_parser.utils.revalidation import Page, get_validator_store
+
+
+class HostRateLimiter:
+    """
+    Ограничивает частоту запросов к каждому хосту.
+    rate - максимальное число запросов в секунду на хост (0 - без ограничения).
+    """
+
+    def __init__(self, rate=0.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+        self._locks = {}
+
+    async def wait(self, url):
+        if not self.interval:
+            return
+
+        host = urlsplit(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            metrics.count('rate_limit_wait_seconds', slot - now, host=host)
+            await asyncio.sleep(slot - now)
+
+
+class AsyncFetcher:
+    """
+    Асинхронный загрузчик JSON поверх пула соединений aiohttp.
+    concurrency - максимальное число одновременных запросов,
+    rate_limit - ограничение запросов в секунду на один хост,
+    cache - кэш ответов (по умолчанию общий кэш из get_cache()),
+    validators - хранилище валидаторов для условных запросов
+    (по умолчанию get_validator_store()).
+    Повторы, задержки и предохранитель по хостам - те же, что у http.HttpClient.
+    Используется как асинхронный контекстный менеджер.
+    """
+
+    def __init__(self, logger, concurrency=8, rate_limit=0.0, retries=3, timeout=10, cache=None, validators=None):
+        self.logger = logger
+        self.backoff = Backoff()
+        self.breaker = CircuitBreaker()
+        self.cache = get_cache() if cache is None else cache
+        self.validators = get_validator_store() if validators is None else validators
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(rate_limit)
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+    async def fetch_page(self, url):
+        """
+        Загружает url и возвращает Page (тело + признак изменения с прошлого запуска)
+        или None после всех неудачных попыток. Если включено хранилище валидаторов,
+        запрос отправляется условным и ответ 304 отдаёт сохранённое тело.
+        """
+        if self.cache is not None:
+            body = self.cache.get(url)
+            if body is not None:
+                metrics.count('cache_hits')
+                return self._resolve(url, 200, {}, body, downloaded=False)
+
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries):
+            if not self.breaker.allow(host):
+                self.logger.error(f"Хост {host} временно отключён после серии ошибок, пропускаем {url}")
+                return None
+
+            retry_after = None
+            try:
+                headers = self.validators.headers_for(url) if self.validators is not None else {}
+                async with self._semaphore:
+                    await self.rate_limiter.wait(url)
+                    self.logger.info(f"Отправляем запрос к {url} (попытка {attempt + 1}/{self.retries})")
+                    with metrics.timer('http_request_seconds', host=host):
+                        async with self._session.get(url, headers=headers) as response:
+                            metrics.count('http_responses', host=host, status=response.status)
+                            if response.status in RETRY_STATUSES:
+                                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                            if response.status != 304:
+                                response.raise_for_status()
+                            body = await response.read()
+                metrics.count('http_bytes', len(body), host=host)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES:
+                    self.breaker.record_success(host)
+                    self.logger.error(f"Ошибка запроса {url}: {e}")
+                    return None
+                self.breaker.record_failure(host)
+                self.logger.error(f"Ошибка запроса {url}: {e} (попытка {attempt + 1}/{self.retries})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.count('http_errors', host=host)
+                self.breaker.record_failure(host)
+                self.logger.error(f"Ошибка запроса {url}: {e} (попытка {attempt + 1}/{self.retries})")
+            else:
+                self.breaker.record_success(host)
+                page = self._resolve(url, response.status, response.headers, body)
+                if page is None:
+                    # на 304 не нашлось сохранённого тела - повторяем без условий
+                    continue
+                if self.cache is not None:
+                    self.cache.set(url, page.body)
+                return page
+
+            if attempt + 1 < self.retries:
+                await asyncio.sleep(self.backoff.delay(attempt, retry_after))
+        return None
+
+    def _resolve(self, url, status, headers, body, downloaded=True):
+        if self.validators is None:
+            return Page(url, body)
+        return self.validators.resolve(url, status, headers, body, downloaded=downloaded)
+
+    async def fetch_json(self, url):
+        """Асинхронный аналог parsing.safe_request: JSON ответа или None после всех попыток."""
+        page = await self.fetch_page(url)
+        return None if page is None else page.data
+
+    async def fetch_all(self, urls):
+        """Загружает все url конкурентно, порядок результатов совпадает с порядком urls."""
+        return await asyncio.gather(*(self.fetch_json(url) for url in urls))
+
+    async def fetch_paginated(self, page_url, first_page=1):
+        """
+        Загружает все страницы постраничного ресурса.
+        page_url - функция номер страницы -> url. После первой страницы
+        все остальные (по totalPages) запрашиваются одновременно.
+        Возвращает список Page по порядку страниц (None для неудачных).
+        """
+        first = await self.fetch_page(page_url(first_page))
+        if first is None or not first.data:
+            return []
+
+        total_pages = first.data.get('totalPages', 1)
+        rest = await asyncio.gather(*(
+            self.fetch_page(page_url(page)) for page in range(first_page + 1, total_pages + 1)
+        ))
+        return [first, *rest]
+
+    async def iter_ordered(self, coros, window=None):
+        """
+        Выполняет корутины конкурентно, держа в работе не больше window штук,
+        и отдаёт их результаты строго в исходном порядке.
+        """
+        window = window or self.concurrency
+        pending = collections.deque()
+        try:
+            for coro in coros:
+                pending.append(asyncio.ensure_future(coro))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,257 @@
+import orjson
+
+
+class FlattenLimitError(ValueError):
+    pass
+
+
+class _Node:
+    """Узел плана: префикс и заранее вычисленные имена колонок для ключей словаря."""
+
+    __slots__ = ('prefix', 'fields', 'expands')
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self.fields = {}
+        # узел уже разворачивался в несколько строк - сразу идём общим путём
+        self.expands = False
+
+    def field(self, key):
+        """(имя колонки, узел-потомок) для ключа; новые ключи добавляются в план при первой встрече."""
+        entry = self.fields.get(key)
+        if entry is None:
+            new_key = f"{self.prefix}_{key}" if self.prefix else key
+            entry = self.fields[key] = (new_key, _Node(new_key))
+        return entry
+
+
+class FlattenPlan:
+    """
+    Скомпилированный план разворачивания JSON, дающий те же строки, что parsing.flatten_json
+    (для данных, полученных из json: словари и списки встроенных типов).
+
+    Имена колонок для каждого пути ключей вычисляются один раз и хранятся в дереве
+    узлов плана. Поддеревья, которые разворачиваются в одну строку (нет непустых
+    списков словарей), собираются без рекурсии прямо в итоговый словарь, без
+    промежуточных base_row/{**a, **b}. Общий алгоритм используется только в узлах,
+    где действительно происходит размножение строк; такие узлы план запоминает.
+
+    max_rows - ограничение числа строк на одну запись; при превышении
+    overflow='raise' бросает FlattenLimitError, overflow='truncate' обрезает результат.
+    explode_paths - имена колонок-списков (например {'labels'}), которые
+    разворачиваются в отдельные строки; остальные списки словарей сохраняются
+    одной JSON-строкой. None - разворачивать все списки, как flatten_json.
+    """
+
+    def __init__(self, schema=None, max_rows=None, overflow='raise', explode_paths=None):
+        if overflow not in ('raise', 'truncate'):
+            raise ValueError(f"Unexpected overflow mode - {overflow}")
+
+        self.root = _Node()
+        self.max_rows = max_rows
+        self.overflow = overflow
+        self.explode_paths = None if explode_paths is None else frozenset(explode_paths)
+        if schema is not None:
+            self.learn(schema)
+
+    def learn(self, schema):
+        """Заранее добавляет в план все пути ключей из примера записи (или списка записей)."""
+        stack = [(schema, self.root)]
+        while stack:
+            data, node = stack.pop()
+            if isinstance(data, list):
+                stack.extend((item, node) for item in data)
+            elif isinstance(data, dict):
+                for key, value in data.items():
+                    stack.append((value, node.field(key)[1]))
+
+    def flatten(self, nested_data):
+        rows = self._rows(nested_data, self.root)
+        return self._limit(rows)
+
+    def _rows(self, data, node):
+        if type(data) is dict:
+            if not node.expands:
+                row = self._single_row(data, node)
+                if row is not None:
+                    return [row]
+                node.expands = True
+            return self._expand(data, node)
+
+        if type(data) is list:
+            results = []
+            for item in data:
+                results.extend(self._rows(item, node))
+            return self._limit(results)
+
+        return [{node.prefix or '_value': data}]
+
+    def _explodes(self, new_key, values):
+        """Нужно ли размножать строки по этому списку (пустой список словарей строк не даёт)."""
+        if not all(isinstance(item, dict) for item in values):
+            return False
+        return not values or self.explode_paths is None or new_key in self.explode_paths
+
+    def _join(self, values):
+        if self.explode_paths is not None and values and all(isinstance(item, dict) for item in values):
+            return orjson.dumps(values).decode()
+        return ", ".join(str(item) for item in values)
+
+    def _single_row(self, data, node, root_lists=None):
+        """
+        Собирает поддерево в одну строку обходом с явным стеком.
+        Порядок присваиваний повторяет flatten_json: примитивы узла, затем
+        вложенные словари по порядку, затем списки примитивов.
+        Возвращает None, если в поддереве есть непустой разворачиваемый список словарей.
+        Если передан root_lists, списки корневого узла не обрабатываются, а
+        складываются туда как (имя колонки, значение, узел) для общего алгоритма.
+        """
+        row = {}
+        tasks = [(data, node)]
+        while tasks:
+            data, node = tasks.pop()
+            if node is None:
+                # отложенные списки узла
+                for new_key, values in data:
+                    row[new_key] = self._join(values)
+                continue
+
+            fields = node.fields
+            children = []
+            lists = []
+            for key, value in data.items():
+                entry = fields.get(key) or node.field(key)
+                value_type = type(value)
+                if value_type is dict:
+                    children.append((value, entry[1]))
+                elif value_type is list:
+                    if root_lists is not None:
+                        root_lists.append((entry[0], value, entry[1]))
+                    elif self._explodes(entry[0], value):
+                        if value:
+                            # строк будет несколько - прерываемся до обхода потомков
+                            return None
+                    else:
+                        lists.append((entry[0], value))
+                else:
+                    row[entry[0]] = value
+
+            root_lists = None
+            if lists:
+                tasks.append((lists, None))
+            tasks.extend(reversed(children))
+        return row
+
+    def _expand(self, data, node):
+        """Общий случай с размножением строк: та же логика, что в flatten_json."""
+        list_fields = []
+        row = self._single_row(data, node, list_fields)
+        if row is not None:
+            # все вложенные словари дают по одной строке - собираем их без копирований
+            base_row = row
+            has_dicts = any(type(value) is dict for value in data.values())
+            dict_results = [row] if has_dicts or row else []
+        else:
+            base_row, dict_results, list_fields = self._expand_dicts(data, node)
+
+        list_results = []
+        for new_key, values, child in list_fields:
+            if self._explodes(new_key, values):
+                for item in values:
+                    nested_rows = self._rows(item, child)
+
+                    if not dict_results and not list_results:
+                        for nested_row in nested_rows:
+                            list_results.append({**base_row, **nested_row})
+                    elif dict_results and not list_results:
+                        for existing_row in dict_results:
+                            for nested_row in nested_rows:
+                                list_results.append({**existing_row, **nested_row})
+                    elif not dict_results and list_results:
+                        list_results = [
+                            {**existing_row, **nested_row}
+                            for existing_row in list_results
+                            for nested_row in nested_rows
+                        ]
+                    else:
+                        list_results.extend([
+                            {**existing_row, **nested_row}
+                            for existing_row in dict_results
+                            for nested_row in nested_rows
+                        ])
+                    list_results = self._limit(list_results)
+            else:
+                str_value = self._join(values)
+
+                if not dict_results and not list_results:
+                    base_row[new_key] = str_value
+                    list_results.append(base_row)
+                elif dict_results and not list_results:
+                    for row in dict_results:
+                        row[new_key] = str_value
+                    list_results = dict_results
+                elif list_results:
+                    for row in list_results:
+                        row[new_key] = str_value
+
+        if list_results:
+            return list_results
+        if dict_results:
+            return dict_results
+        return [base_row]
+
+    def _expand_dicts(self, data, node):
+        """base_row, декартово произведение вложенных словарей и список полей-списков узла."""
+        base_row = {}
+        list_fields = []
+        dict_fields = []
+
+        fields = node.fields
+        for key, value in data.items():
+            new_key, child = fields.get(key) or node.field(key)
+            value_type = type(value)
+            if value_type is dict:
+                dict_fields.append((value, child))
+            elif value_type is list:
+                list_fields.append((new_key, value, child))
+            else:
+                base_row[new_key] = value
+
+        dict_results = []
+        for value, child in dict_fields:
+            nested_rows = self._rows(value, child)
+            if not dict_results:
+                dict_results = [{**base_row, **nested_row} for nested_row in nested_rows]
+            else:
+                dict_results = self._limit([
+                    {**existing_row, **nested_row}
+                    for existing_row in dict_results
+                    for nested_row in nested_rows
+                ])
+
+        if not dict_results and base_row:
+            dict_results = [base_row]
+
+        return base_row, dict_results, list_fields
+
+    def _limit(self, rows):
+        if self.max_rows is None or len(rows) <= self.max_rows:
+            return rows
+        if self.overflow == 'raise':
+            raise FlattenLimitError(f"Record expands to more than {self.max_rows} rows")
+        del rows[self.max_rows:]
+        return rows
+
+
+_plans = {}
+
+
+def get_plan(endpoint, schema=None, **options):
+    """
+    План разворачивания для эндпоинта: создаётся один раз и переиспользуется,
+    накапливая имена колонок по мере появления новых ключей.
+    """
+    plan = _plans.get(endpoint)
+    if plan is None:
+        plan = _plans[endpoint] = FlattenPlan(schema=schema, **options)
+    return plan
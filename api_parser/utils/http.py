@@ -0,0 +1,165 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_parser.data import config
+from api_parser.utils import metrics
+
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Хост временно отключён: подряд слишком много неудачных запросов."""
+
+
+class Backoff:
+    """
+    Экспоненциальная задержка с полным джиттером: случайное время
+    от 0 до min(cap, base * 2 ** attempt) секунд.
+    """
+
+    def __init__(self, base=0.5, cap=30.0):
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.cap, retry_after)
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """Retry-After в секундах: заголовок бывает числом секунд или HTTP-датой."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    """
+    Предохранитель по хостам: после threshold неудач подряд хост «размыкается»
+    на cooldown секунд и запросы к нему сразу завершаются ошибкой.
+    По истечении cooldown пропускается пробный запрос.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at >= self.cooldown:
+                # полуоткрытое состояние: следующая неудача снова разомкнёт цепь
+                del self._opened_at[host]
+                self._failures[host] = self.threshold - 1
+                return True
+            return False
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+
+    def record_failure(self, host):
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold:
+                self._opened_at[host] = time.monotonic()
+
+
+class HttpClient:
+    """
+    Общий HTTP-клиент для всех загрузчиков: пул keep-alive соединений
+    размером pool_size, повторы с экспоненциальной задержкой и джиттером,
+    учёт Retry-After (429/503) и предохранитель по хостам.
+    """
+
+    def __init__(self, pool_size=8, retries=3, timeout=10, backoff=None, breaker=None):
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, headers=None, timeout=None, retries=None, logger=None, **kwargs):
+        """
+        GET с повторами. Возвращает последний ответ (в том числе с кодом ошибки,
+        если попытки закончились) - проверка статуса остаётся за вызывающим.
+        Сетевые ошибки после всех попыток пробрасываются.
+        """
+        host = urlsplit(url).netloc
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+
+        for attempt in range(retries):
+            if not self.breaker.allow(host):
+                raise CircuitOpenError(f"Circuit is open for {host}")
+
+            retry_after = None
+            try:
+                with metrics.timer('http_request_seconds', host=host):
+                    response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                metrics.count('http_errors', host=host)
+                self.breaker.record_failure(host)
+                if attempt + 1 == retries:
+                    raise
+                if logger is not None:
+                    logger.error(f"Ошибка запроса {url}: {e} (попытка {attempt + 1}/{retries})")
+            else:
+                metrics.count('http_responses', host=host, status=response.status_code)
+                if not kwargs.get('stream'):
+                    # без stream тело уже прочитано; потоковые ответы считает читающий их код
+                    metrics.count('http_bytes', len(response.content), host=host)
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success(host)
+                    return response
+
+                self.breaker.record_failure(host)
+                if attempt + 1 == retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                # при stream=True непрочитанный ответ держит соединение - возвращаем его в пул
+                response.close()
+                if logger is not None:
+                    logger.error(f"Ответ {response.status_code} от {url} (попытка {attempt + 1}/{retries})")
+
+            time.sleep(self.backoff.delay(attempt, retry_after))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Общий клиент процесса; размер пула соединений равен FETCH_CONCURRENCY."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(pool_size=config.FETCH_CONCURRENCY)
+    return _client
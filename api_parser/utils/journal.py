@@ -0,0 +1,114 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from api_parser.data import config
+
+
+class CrawlJournal:
+    """
+    Журнал обхода в SQLite: для каждого завершённого блока (slug, страница)
+    хранит его результат, чтобы прерванный запуск продолжился с первого
+    незавершённого блока, а не начинался заново.
+    pipeline - имя выгрузки (у каждой свой журнал в общей базе),
+    max_age - через сколько секунд незавершённый запуск считается устаревшим.
+    version - формат результатов блоков (например, набор колонок): запуск,
+    начатый с другим version, не продолжается, а начинается заново.
+    Результат блока - байты, формат выбирает конвейер.
+    """
+
+    def __init__(self, path, pipeline, max_age=24 * 3600, version=''):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.pipeline = pipeline
+        self.max_age = max_age
+        self.version = version
+        self.resumed = False
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                pipeline TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                version TEXT NOT NULL DEFAULT ''
+            );
+            CREATE TABLE IF NOT EXISTS units (
+                pipeline TEXT NOT NULL,
+                slug TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                total_pages INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (pipeline, slug, page)
+            );
+        ''')
+        existing = {row[1] for row in self._connection.execute('PRAGMA table_info(runs)')}
+        if 'version' not in existing:
+            # журнал, созданный до учёта формата блоков
+            self._connection.execute("ALTER TABLE runs ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+
+    def begin(self):
+        """Продолжает незавершённый запуск или начинает новый; возвращает True при продолжении."""
+        row = self._connection.execute(
+            'SELECT started_at, version FROM runs WHERE pipeline = ?', (self.pipeline,),
+        ).fetchone()
+        self.resumed = row is not None and time.time() - row[0] < self.max_age and row[1] == self.version
+        if not self.resumed:
+            with self._connection:
+                self._clear()
+                self._connection.execute(
+                    'INSERT INTO runs (pipeline, started_at, version) VALUES (?, ?, ?)',
+                    (self.pipeline, time.time(), self.version),
+                )
+        return self.resumed
+
+    def pages(self, slug):
+        """Завершённые страницы slug: {номер страницы: всего страниц}."""
+        return dict(self._connection.execute(
+            'SELECT page, total_pages FROM units WHERE pipeline = ? AND slug = ?', (self.pipeline, slug),
+        ))
+
+    def is_done(self, slug):
+        pages = self.pages(slug)
+        return bool(pages) and len(pages) == next(iter(pages.values()))
+
+    def load(self, slug, page):
+        row = self._connection.execute(
+            'SELECT payload FROM units WHERE pipeline = ? AND slug = ? AND page = ?', (self.pipeline, slug, page),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def record(self, slug, page, payload, total_pages=1):
+        """Отмечает блок завершённым; запись сразу фиксируется на диске."""
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO units (pipeline, slug, page, total_pages, payload) VALUES (?, ?, ?, ?, ?)',
+                (self.pipeline, slug, page, total_pages, payload),
+            )
+
+    def finish(self):
+        """Запуск завершён полностью - журнал выгрузки больше не нужен."""
+        with self._connection:
+            self._clear()
+
+    def _clear(self):
+        self._connection.execute('DELETE FROM units WHERE pipeline = ?', (self.pipeline,))
+        self._connection.execute('DELETE FROM runs WHERE pipeline = ?', (self.pipeline,))
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_journal(pipeline, version=''):
+    """Журнал выгрузки по настройкам config: None, если RESUME выключен."""
+    if not config.RESUME:
+        return None
+    journal = CrawlJournal(config.JOURNAL_PATH, pipeline, max_age=config.JOURNAL_MAX_AGE, version=version)
+    journal.begin()
+    return journal
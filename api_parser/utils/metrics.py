@@ -0,0 +1,311 @@
+"""
+Метрики выгрузки: время этапов, распределение задержек запросов, скачанные
+байты, развёрнутые и записанные строки.
+
+Включаются настройкой METRICS. Выключенные метрики ничего не стоят: get_metrics()
+возвращает None, count()/observe() сразу выходят, timer() отдаёт общий пустой
+контекстный менеджер. Метрики собираются только на уровне страниц, пачек и
+этапов - не отдельных строк.
+
+Этапы (stage) дополнительно пишутся в лог структурными событиями; в конце
+запуска report() пишет в лог сводку и сохраняет её в METRICS_PATH: .prom -
+текстовый формат Prometheus (для node_exporter textfile collector), иначе JSON.
+"""
+import bisect
+import contextlib
+import functools
+import inspect
+import math
+import os
+import threading
+import time
+
+import orjson
+import structlog
+
+from api_parser.data import config
+
+# Границы корзин гистограмм в секундах (как у клиентов Prometheus по умолчанию, плюс 30 с)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = 'api_parser_'
+
+
+class Histogram:
+    """Число наблюдений по корзинам BUCKETS; последняя корзина - всё, что больше."""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Оценка квантиля: линейная интерполяция внутри корзины (верх последней - максимум)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[idx - 1] if idx else 0.0
+                upper = min(BUCKETS[idx], self.max) if idx < len(BUCKETS) else self.max
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def summary(self):
+        result = {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'max': round(self.max, 6),
+        }
+        for q in QUANTILES:
+            value = self.quantile(q)
+            result[f'p{round(q * 100)}'] = None if value is None else round(value, 6)
+        return result
+
+
+class Metrics:
+    """Счётчики и гистограммы с метками; безопасны для потоков этапов Dag."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def histogram(self, name):
+        """Гистограмма name, объединённая по всем меткам (например, задержки по всем хостам)."""
+        merged = Histogram()
+        with self._lock:
+            for (histogram_name, _), histogram in self._histograms.items():
+                if histogram_name != name:
+                    continue
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+                merged.max = max(merged.max, histogram.max)
+        return merged
+
+    def summary(self):
+        """{'elapsed', 'counters': {имя: [{labels, value}]}, 'histograms': {имя: [{labels, count, ...}]}}"""
+        with self._lock:
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items(), key=_sort_key):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for (name, labels), histogram in sorted(self._histograms.items(), key=_sort_key):
+                histograms.setdefault(name, []).append({'labels': dict(labels), **histogram.summary()})
+        return {
+            'elapsed': round(time.time() - self.started, 3),
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def prometheus(self):
+        """Метрики в текстовом формате Prometheus."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items(), key=_sort_key)
+            histograms = sorted(self._histograms.items(), key=_sort_key)
+            typed = set()
+            for (name, labels), value in counters:
+                metric = f'{PREFIX}{name}_total'
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} counter')
+                lines.append(f'{metric}{_labels(labels)} {_number(value)}')
+            for (name, labels), histogram in histograms:
+                metric = f'{PREFIX}{name}'
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} histogram')
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, math.inf), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else _number(bound)
+                    lines.append(f'{metric}_bucket{_labels(labels, le=le)} {cumulative}')
+                lines.append(f'{metric}_sum{_labels(labels)} {_number(histogram.sum)}')
+                lines.append(f'{metric}_count{_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Сохраняет метрики в path (.prom - Prometheus, иначе JSON); запись атомарная."""
+        path = str(path)
+        if path.endswith('.prom'):
+            content = self.prometheus().encode()
+        else:
+            content = orjson.dumps(self.summary(), option=orjson.OPT_INDENT_2)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+
+def _sort_key(item):
+    (name, labels), _ = item
+    return name, labels
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_metrics = None
+_configured = False
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Общие метрики процесса: None, если METRICS выключен."""
+    global _metrics, _configured
+    if not _configured:
+        with _metrics_lock:
+            if not _configured:
+                _metrics = Metrics() if config.METRICS else None
+                _configured = True
+    return _metrics
+
+
+def reset():
+    """Сбрасывает собранные метрики; следующий get_metrics() заново читает config.METRICS."""
+    global _metrics, _configured
+    with _metrics_lock:
+        _metrics = None
+        _configured = False
+
+
+def count(name, value=1, **labels):
+    """Прибавляет value к счётчику name (байты, строки, запросы)."""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.count(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """Добавляет наблюдение value в гистограмму name."""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.observe(name, value, **labels)
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 'started')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+_NO_TIMER = contextlib.nullcontext()
+
+
+def timer(name, **labels):
+    """Контекстный менеджер: время блока в секундах -> гистограмма name."""
+    metrics = get_metrics()
+    if metrics is None:
+        return _NO_TIMER
+    return _Timer(metrics, name, labels)
+
+
+def timed(name, **labels):
+    """Декоратор timer(): время каждого вызова функции (в том числе корутины) -> гистограмма name."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timer(name, **labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def stage(name, logger=None):
+    """
+    Этап выгрузки: время -> гистограмма stage_seconds{stage=name} и структурное
+    событие stage в лог (status ok или failed). При выключенных метриках ничего не делает.
+    """
+    metrics = get_metrics()
+    if metrics is None:
+        yield
+        return
+
+    logger = logger or structlog.get_logger('api_parser.metrics')
+    started = time.perf_counter()
+    status = 'failed'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.observe('stage_seconds', elapsed, stage=name)
+        logger.info('stage', stage=name, status=status, elapsed=round(elapsed, 3))
+
+
+def report(logger=None, path=None):
+    """
+    Конец запуска: сводка метрик структурным событием metrics в лог и в файл
+    path (по умолчанию METRICS_PATH, если задан). Возвращает сводку или None.
+    """
+    metrics = get_metrics()
+    if metrics is None:
+        return None
+
+    summary = metrics.summary()
+    (logger or structlog.get_logger('api_parser.metrics')).info('metrics', **summary)
+    path = path or config.METRICS_PATH
+    if path:
+        metrics.write(path)
+    return summary
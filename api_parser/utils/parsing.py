@@ -1,19 +1,54 @@
-import time
+import json
 import requests
 
+from api_parser.utils import metrics
+from api_parser.utils.cache import get_cache
+from api_parser.utils.http import get_client
+from api_parser.utils.revalidation import get_validator_store
 
-def safe_request(url, logger, retries=3, timeout=10):
-    """Безопасный GET-запрос с повторными попытками."""
-    for attempt in range(retries):
-        try:
-            logger.info(f"Отправляем запрос к {url} (попытка {attempt + 1}/{retries})")
-            response = requests.get(url, timeout=timeout)
+
+def safe_request(url, logger, retries=3, timeout=10, cache=None):
+    """
+    Безопасный GET-запрос через общий HTTP-клиент (пул соединений,
+    повторы с экспоненциальной задержкой, Retry-After).
+    Ответ сначала ищется в cache (по умолчанию - общий кэш из get_cache()).
+    При включённом REVALIDATE запрос условный, на 304 отдаётся сохранённое тело.
+    """
+    if cache is None:
+        cache = get_cache()
+    if cache is not None:
+        data = cache.get_json(url)
+        if data is not None:
+            metrics.count('cache_hits')
+            logger.info(f"Ответ для {url} взят из кэша")
+            return data
+
+    validators = get_validator_store()
+    client = get_client()
+    try:
+        logger.info(f"Отправляем запрос к {url}")
+        headers = validators.headers_for(url) if validators is not None else {}
+        response = client.get(url, headers=headers, timeout=timeout, retries=retries, logger=logger)
+        if response.status_code != 304:
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Ошибка запроса {url}: {e} (попытка {attempt + 1}/{retries})")
-            time.sleep(2)
-    return None
+
+        body = response.content
+        if validators is not None:
+            page = validators.resolve(url, response.status_code, response.headers, body)
+            if page is None:
+                # на 304 не нашлось сохранённого тела - повторяем без условий
+                response = client.get(url, timeout=timeout, retries=retries, logger=logger)
+                response.raise_for_status()
+                page = validators.resolve(url, response.status_code, response.headers, response.content)
+            body = page.body
+        data = json.loads(body)
+    except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+        logger.error(f"Ошибка запроса {url}: {e}")
+        return None
+
+    if cache is not None:
+        cache.set(url, body)
+    return data
 
 
 def flatten_json(nested_data, parent_key=""):
@@ -0,0 +1,232 @@
+"""
+Декларативное извлечение полей из вложенного JSON по путям.
+
+Спецификация - словарь {колонка: путь} или {колонка: (путь, значение по умолчанию)}:
+
+    spec = Spec({
+        'metroName': 'location.metro.name',
+        'floor': 'floorsOffered[0]',
+        'parksCount': ('location.parks|len', 0),
+        'profitabilityLevel': 'location.allHeatmaps[name=profitability].level',
+    })
+    rows = spec.extract_many(items)
+
+Шаги пути разделяются точкой: ключ словаря, [N] - элемент списка по индексу,
+[ключ=значение] - первый словарь списка с таким значением ключа (значение
+разбирается как JSON, иначе сравнивается строкой). После | - функции из FUNCTIONS,
+применяемые к найденному значению. Если пути в записи нет (или по пути
+стоит не тот тип), колонка получает значение по умолчанию; None, явно
+записанный в последнем ключе, возвращается как есть - как dict.get.
+
+Спецификация компилируется один раз в функцию Python: общие префиксы путей
+разбираются один раз на запись, а поиск по фильтру [ключ=значение]
+заполняет все колонки, которые через него проходят, за один проход по списку.
+"""
+import json
+import re
+
+# Функции, доступные после | в пути
+FUNCTIONS = {
+    'len': len,
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'json': lambda value: json.dumps(value, ensure_ascii=False),
+}
+
+_STEP_RE = re.compile(r'([^.\[\]|]+)|\[([^\]]*)\]|(\.)')
+
+
+class _Node:
+    """Узел дерева путей: шаги-потомки и колонки, которые берут значение этого узла."""
+
+    __slots__ = ('children', 'leaves')
+
+    def __init__(self):
+        self.children = {}
+        self.leaves = []
+
+
+def _parse_value(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_path(path):
+    """
+    Разбирает путь в (шаги, функции). Шаг - ('key', имя), ('index', N)
+    или ('match', ключ, значение).
+    """
+    expression, *functions = path.split('|')
+    for name in functions:
+        if name.strip() not in FUNCTIONS:
+            raise ValueError(f"Unknown function in path - {path}")
+
+    steps = []
+    position = 0
+    expect_key = True
+    while position < len(expression):
+        match = _STEP_RE.match(expression, position)
+        if match is None:
+            raise ValueError(f"Invalid path - {path}")
+        key, selector, dot = match.groups()
+        if dot:
+            if expect_key:
+                raise ValueError(f"Invalid path - {path}")
+            expect_key = True
+        elif key is not None:
+            if not expect_key:
+                raise ValueError(f"Invalid path - {path}")
+            steps.append(('key', key.strip()))
+            expect_key = False
+        else:
+            if expect_key and steps:
+                raise ValueError(f"Invalid path - {path}")
+            field, eq, value = selector.partition('=')
+            if eq:
+                steps.append(('match', field.strip(), _parse_value(value.strip())))
+            else:
+                try:
+                    steps.append(('index', int(selector)))
+                except ValueError:
+                    raise ValueError(f"Invalid path - {path}") from None
+            expect_key = False
+        position = match.end()
+    if not steps or expect_key:
+        raise ValueError(f"Invalid path - {path}")
+    return steps, [name.strip() for name in functions]
+
+
+class Spec:
+    """
+    Скомпилированная спецификация полей: spec(record) - словарь колонок одной
+    записи в порядке спецификации, spec.extract_many(records) - список для пачки.
+    Текст сгенерированной функции - в spec.source.
+    """
+
+    def __init__(self, fields):
+        self.columns = list(fields)
+        self.defaults = {}
+        self.root = _Node()
+        for column, field in fields.items():
+            path, default = field if isinstance(field, tuple) else (field, None)
+            self.defaults[column] = default
+            steps, functions = parse_path(path)
+            node = self.root
+            for step in steps:
+                node = node.children.setdefault(step, _Node())
+            node.leaves.append((column, functions))
+
+        self._constants = {}
+        lines = ['def extract(record):', '    out = _DEFAULTS.copy()']
+        self._variables = 0
+        self._emit(self.root, 'record', lines, 1)
+        lines.append('    return out')
+        lines += [
+            '',
+            'def extract_many(records):',
+            '    return [extract(record) for record in records]',
+        ]
+        self.source = '\n'.join(lines)
+
+        namespace = {'_DEFAULTS': self.defaults, '_MISSING': _MISSING, **self._constants}
+        exec(compile(self.source, f'<spec {self.columns[:3]}...>', 'exec'), namespace)
+        self._extract = namespace['extract']
+        self.extract_many = namespace['extract_many']
+
+    def __call__(self, record):
+        return self._extract(record)
+
+    def _constant(self, value):
+        """Имя константы (функция, значение фильтра) в пространстве имён сгенерированного кода."""
+        name = f'_C{len(self._constants)}'
+        self._constants[name] = value
+        return name
+
+    def _variable(self):
+        self._variables += 1
+        return f'v{self._variables}'
+
+    def _assign(self, node, var, lines, depth):
+        pad = '    ' * depth
+        for column, functions in node.leaves:
+            value = var
+            for name in reversed(functions):
+                value = f'{self._constant(FUNCTIONS[name])}({value})'
+            lines.append(f'{pad}out[{column!r}] = {value}')
+
+    def _emit(self, node, var, lines, depth, is_dict=False):
+        """
+        Код обхода потомков узла, значение которого лежит в переменной var
+        (is_dict - тип уже проверен фильтром [ключ=значение]).
+        """
+        pad = '    ' * depth
+        keys = [(step, child) for step, child in node.children.items() if step[0] == 'key']
+        # словарь не бывает списком: шаги [N] и [ключ=значение] после фильтра не находят ничего
+        items = [] if is_dict else [(step, child) for step, child in node.children.items() if step[0] != 'key']
+
+        if keys:
+            inner = depth if is_dict else depth + 1
+            if not is_dict:
+                lines.append(f'{pad}if type({var}) is dict:')
+            for (_, key), child in keys:
+                child_var = self._variable()
+                lines.append(f'{"    " * inner}{child_var} = {var}.get({key!r}, _MISSING)')
+                lines.append(f'{"    " * inner}if {child_var} is not _MISSING:')
+                self._assign(child, child_var, lines, inner + 1)
+                if child.children:
+                    self._emit(child, child_var, lines, inner + 1)
+
+        if items:
+            lines.append(f'{pad}if type({var}) is list:')
+            for step, child in items:
+                child_var = self._variable()
+                if step[0] == 'index':
+                    index = step[1]
+                    bound = f'len({var}) > {index}' if index >= 0 else f'len({var}) >= {-index}'
+                    lines.append(f'{pad}    if {bound}:')
+                    lines.append(f'{pad}        {child_var} = {var}[{index}]')
+                    self._assign(child, child_var, lines, depth + 2)
+                    if child.children:
+                        self._emit(child, child_var, lines, depth + 2)
+                else:
+                    _, field, value = step
+                    lines.append(f'{pad}    for {child_var} in {var}:')
+                    lines.append(
+                        f'{pad}        if type({child_var}) is dict and '
+                        f'{child_var}.get({field!r}, _MISSING) == {self._constant(value)}:'
+                    )
+                    self._assign(child, child_var, lines, depth + 3)
+                    if child.children:
+                        self._emit(child, child_var, lines, depth + 3, is_dict=True)
+                    lines.append(f'{pad}            break')
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
+
+
+def compile_path(path, default=None):
+    """Функция record -> значение по одному пути."""
+    spec = Spec({'value': (path, default)})
+    return lambda record: spec(record)['value']
+
+
+_specs = {}
+
+
+def get_spec(name, fields):
+    """Спецификация по имени: компилируется при первом обращении и переиспользуется."""
+    spec = _specs.get(name)
+    if spec is None:
+        spec = _specs[name] = Spec(fields)
+    return spec
@@ -0,0 +1,139 @@
+"""
+Подготовка выгрузки квартир (flats_expanded) к анализу.
+
+То же, что делает ноутбук аналитики цепочкой фильтров и columns_to_drop, но за
+один проход: читаются только нужные колонки и сразу в компактных типах,
+маска выбросов считается векторно по массивам numpy, каждая колонка
+копируется один раз - уже отфильтрованной. Добавляются признаки цены за м² и
+скидки. Большие файлы обрабатываются кусками по chunksize строк.
+"""
+import numpy as np
+import pandas as pd
+
+# колонка -> тип при чтении; целые читаются как float, пока в них возможны пропуски
+READ_DTYPES = {
+    'price': 'float64',
+    'priceWoDiscount': 'float64',
+    'areaTotal': 'float32',
+    'areaLiving': 'float32',
+    'rooms': 'float32',
+    'discount': 'float32',
+    'floorNumber': 'float32',
+    'furniture': 'boolean',
+    'complex_title': 'category',
+    'project_slug': 'category',
+}
+# без этих колонок маску выбросов не посчитать
+REQUIRED = ('price', 'areaTotal', 'rooms')
+# колонки, нужные только для признаков - в результат не попадают
+DERIVATION_ONLY = ('priceWoDiscount',)
+# комнатность, которая в ноутбуке отбрасывается как нерепрезентативная
+EXCLUDED_ROOMS = (6, 7)
+
+
+class Preprocessor:
+    """
+    Колонки columns (по умолчанию все из READ_DTYPES, кроме DERIVATION_ONLY) читаются в типах READ_DTYPES.
+    Остаются квартиры с rooms > 0, price > 0, areaTotal > 0 и rooms не из
+    excluded_rooms; rooms становится int8. Признаки:
+    price_per_m2 - цена за м² общей площади,
+    discount_amount - priceWoDiscount - price (не меньше 0),
+    discount_share - discount_amount / priceWoDiscount.
+    """
+
+    def __init__(self, columns=None, excluded_rooms=EXCLUDED_ROOMS):
+        if columns is None:
+            columns = [column for column in READ_DTYPES if column not in DERIVATION_ONLY]
+        self.columns = tuple(columns)
+        missing = [column for column in REQUIRED if column not in self.columns]
+        if missing:
+            raise ValueError(f"Required columns are missing - {missing}")
+        self.excluded_rooms = np.array(excluded_rooms, dtype='float32')
+
+    @property
+    def read_columns(self):
+        return (*self.columns, *(column for column in DERIVATION_ONLY if column not in self.columns))
+
+    def transform(self, df):
+        """Фильтрует выбросы и добавляет признаки; df не меняется."""
+        rooms = df['rooms'].to_numpy(dtype='float32', na_value=np.nan)
+        price = df['price'].to_numpy(dtype='float64', na_value=np.nan)
+        area = df['areaTotal'].to_numpy(dtype='float32', na_value=np.nan)
+        # сравнения с NaN ложны - строки с пропусками отбрасываются той же маской
+        mask = (rooms > 0) & (price > 0) & (area > 0) & ~np.isin(rooms, self.excluded_rooms)
+        price = price[mask]
+
+        result = {}
+        for column in self.columns:
+            if column not in df.columns:
+                continue
+            if column == 'rooms':
+                result[column] = rooms[mask].astype('int8')
+            elif column == 'price':
+                result[column] = price
+            else:
+                result[column] = df[column].array[mask]
+        result['price_per_m2'] = (price / area[mask]).astype('float32')
+
+        if 'priceWoDiscount' in df.columns:
+            full_price = df['priceWoDiscount'].to_numpy(dtype='float64', na_value=np.nan)[mask]
+            full_price[full_price <= 0] = np.nan
+            amount = np.maximum(full_price - price, 0)
+            result['discount_amount'] = amount.astype('float32')
+            result['discount_share'] = (amount / full_price).astype('float32')
+
+        index = df.index[mask] if not isinstance(df.index, pd.RangeIndex) else None
+        return pd.DataFrame(result, index=index)
+
+    def read_csv(self, path, chunksize=None, encoding='utf-8-sig'):
+        """
+        Читает CSV выгрузки: DataFrame, а при chunksize - итератор обработанных
+        кусков по chunksize строк исходного файла.
+        """
+        wanted = set(self.read_columns)
+        chunks = pd.read_csv(
+            path,
+            usecols=lambda column: column in wanted,
+            dtype={column: READ_DTYPES[column] for column in wanted if column in READ_DTYPES},
+            encoding=encoding,
+            chunksize=chunksize,
+        )
+        if chunksize is None:
+            return self.transform(chunks)
+        return (self.transform(chunk) for chunk in chunks)
+
+    def read_parquet(self, path, chunksize=None):
+        """Читает Parquet выгрузки; при chunksize - итератор по пачкам из chunksize строк."""
+        import pyarrow.parquet as pq
+
+        file = pq.ParquetFile(path)
+        columns = [column for column in self.read_columns if column in file.schema_arrow.names]
+        if chunksize is None:
+            return self.transform(self._cast(file.read(columns=columns).to_pandas()))
+        return (
+            self.transform(self._cast(batch.to_pandas()))
+            for batch in file.iter_batches(batch_size=chunksize, columns=columns)
+        )
+
+    def read(self, path, chunksize=None):
+        """read_csv или read_parquet по расширению файла."""
+        if str(path).endswith('.parquet'):
+            return self.read_parquet(path, chunksize)
+        return self.read_csv(path, chunksize)
+
+    @staticmethod
+    def _cast(df):
+        return df.astype({column: READ_DTYPES[column] for column in df.columns if column in READ_DTYPES})
+
+
+def concat(chunks):
+    """Обработанные куски в один DataFrame; категории объединяются, а не превращаются в object."""
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    categorical = [column for column, dtype in chunks[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    for column in categorical:
+        categories = pd.api.types.union_categoricals([chunk[column] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
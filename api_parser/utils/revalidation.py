@@ -0,0 +1,135 @@
+import hashlib
+
+import orjson
+
+from api_parser.data import config
+from api_parser.utils.cache import DiskTier, RedisTier
+
+
+class RevalidationStats:
+    """Счётчики одного запуска: сколько страниц не изменилось и сколько байт скачано."""
+
+    def __init__(self):
+        self.requests = 0
+        self.not_modified = 0       # сервер ответил 304
+        self.unchanged = 0          # тело совпало по хэшу с прошлым запуском
+        self.changed = 0
+        self.skipped_pages = 0      # страницы, для которых не выполнялось разворачивание
+        self.bytes_downloaded = 0
+
+    def summary(self):
+        return dict(vars(self))
+
+
+class Page:
+    """
+    Ответ с признаком изменения относительно прошлого запуска.
+    JSON разбирается лениво - для неизменившихся страниц его можно не трогать.
+    """
+
+    __slots__ = ('url', 'body', 'changed', '_data')
+
+    def __init__(self, url, body, changed=True):
+        self.url = url
+        self.body = body
+        self.changed = changed
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = orjson.loads(self.body)
+        return self._data
+
+
+class ValidatorStore:
+    """
+    Хранит по url валидаторы (ETag, Last-Modified, хэш тела) и само тело ответа,
+    чтобы отправлять условные запросы и отдавать сохранённое тело на 304.
+    tier - DiskTier или RedisTier из api_parser.utils.cache.
+    """
+
+    def __init__(self, tier, ttl=30 * 24 * 3600):
+        self.tier = tier
+        self.ttl = ttl
+        self.stats = RevalidationStats()
+
+    def get(self, key):
+        return self.tier.get(key)
+
+    def set(self, key, value):
+        self.tier.set(key, value, self.ttl)
+
+    def _meta(self, url):
+        meta = self.get(f'{url}#meta')
+        return orjson.loads(meta) if meta else {}
+
+    def headers_for(self, url):
+        """Заголовки условного запроса для url (только если есть сохранённое тело для 304)."""
+        meta = self._meta(url)
+        headers = {}
+        if not meta or self.get(f'{url}#body') is None:
+            return headers
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def resolve(self, url, status, headers, body, downloaded=True):
+        """
+        Обрабатывает ответ: на 304 возвращает сохранённое тело, иначе
+        сравнивает хэш с прошлым запуском и запоминает новые валидаторы.
+        downloaded=False - тело взято из кэша ответов, а не из сети.
+        Возвращает Page или None, если на 304 нечего отдать.
+        """
+        self.stats.requests += 1
+        if status == 304:
+            stored = self.get(f'{url}#body')
+            if stored is None:
+                return None
+            self.stats.not_modified += 1
+            return Page(url, stored, changed=False)
+
+        if downloaded:
+            self.stats.bytes_downloaded += len(body)
+        meta = self._meta(url)
+        digest = hashlib.sha256(body).hexdigest()
+        changed = meta.get('hash') != digest
+        if changed:
+            self.stats.changed += 1
+            self.set(f'{url}#body', body)
+            meta = {}
+        else:
+            self.stats.unchanged += 1
+            if self.get(f'{url}#body') is None:
+                self.set(f'{url}#body', body)
+
+        # для того же тела сохраняем прежние валидаторы, если в ответе их нет
+        self.set(f'{url}#meta', orjson.dumps({
+            'etag': headers.get('ETag') or meta.get('etag'),
+            'last_modified': headers.get('Last-Modified') or meta.get('last_modified'),
+            'hash': digest,
+        }))
+        return Page(url, body, changed=changed)
+
+
+_store = None
+
+
+def get_validator_store():
+    """Общее хранилище валидаторов: None, если REVALIDATE выключен."""
+    global _store
+    if _store is None and config.REVALIDATE:
+        if config.USE_CACHE and config.CACHE_HOST:
+            import redis
+
+            tier = RedisTier(redis.Redis(
+                host=config.CACHE_HOST,
+                port=config.CACHE_PORT,
+                password=config.CACHE_PASSWORD,
+            ), prefix='api_parser:validators:')
+        else:
+            tier = DiskTier(config.VALIDATORS_DIR)
+        _store = ValidatorStore(tier)
+    return _store
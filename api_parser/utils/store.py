@@ -0,0 +1,312 @@
+"""
+Локальное аналитическое хранилище выгрузок в SQLite.
+
+Каждая сущность - таблица с натуральным ключом (_id квартиры, slug проекта,
+id банка...), несколькими типизированными колонками для фильтров и
+группировок и полной записью в JSON в колонке data (доступна через
+json_extract). Выгрузки дописывают строки пачками upsert'ом, так что
+повторный запуск обновляет записи, а не дублирует их. Агрегаты считаются
+SQL-запросами по индексам, без чтения CSV целиком.
+
+Выгрузка, которая видит всю сущность целиком (квартиры), оформляется запуском:
+begin_run() перед первой пачкой, finish_run() после полной выгрузки. Каждая
+строка помнит запуск, в котором встречалась последней (колонка _run), и
+finish_run() удаляет строки, не встретившиеся в завершённом запуске (проданные
+и снятые квартиры). Неполный запуск не завершается - строки остаются до
+следующего полного.
+"""
+import sqlite3
+from pathlib import Path
+from typing import NamedTuple
+
+import orjson
+
+from api_parser.data import config
+from api_parser.utils import metrics
+
+
+class TableSpec(NamedTuple):
+    key: tuple[str, ...]
+    columns: dict[str, str]                 # колонка -> тип SQLite
+    indexes: tuple[tuple[str, ...], ...] = ()
+
+
+TABLES = {
+    # по одной строке на квартиру (flats.flat_records), хотя в flats_expanded квартира
+    # может занимать несколько строк; индексы покрывают группировки ноутбука аналитики, и запросы не читают широкие строки с data
+    'flats': TableSpec(
+        key=('_id',),
+        columns={
+            '_id': 'TEXT', 'project_slug': 'TEXT', 'complex_slug': 'TEXT', 'complex_title': 'TEXT',
+            'rooms': 'INTEGER', 'price': 'REAL', 'areaTotal': 'REAL', 'discount': 'REAL', 'furniture': 'INTEGER',
+        },
+        indexes=(
+            ('project_slug', 'price'), ('complex_title', 'price'), ('rooms', 'price', 'areaTotal'),
+            ('rooms', 'complex_title'), ('furniture', 'price'), ('price',),
+        ),
+    ),
+    'projects': TableSpec(
+        key=('slug',),
+        columns={'slug': 'TEXT', '_id': 'TEXT', 'title': 'TEXT', 'city': 'INTEGER'},
+    ),
+    'progress': TableSpec(
+        key=('project_slug', '_id'),
+        columns={'project_slug': 'TEXT', '_id': 'TEXT'},
+    ),
+    'cities': TableSpec(
+        key=('id',),
+        columns={'id': 'INTEGER', 'title': 'TEXT'},
+    ),
+    'banks': TableSpec(
+        key=('id',),
+        columns={'id': 'INTEGER', 'title': 'TEXT'},
+    ),
+    'mortgage_programs': TableSpec(
+        key=('id',),
+        columns={'id': 'INTEGER', 'bank_id': 'INTEGER', 'type': 'INTEGER', 'percent_rate': 'REAL'},
+        indexes=(('bank_id',), ('type', 'percent_rate')),
+    ),
+    'program_types': TableSpec(
+        key=('value',),
+        columns={'value': 'INTEGER', 'name': 'TEXT', 'title': 'TEXT'},
+    ),
+}
+
+
+class Store:
+    """
+    Хранилище в одном файле SQLite (WAL: параллельные выгрузки пишут в него
+    каждая своим соединением). tables - схемы таблиц, по умолчанию TABLES.
+    """
+
+    def __init__(self, path, tables=None, batch_size=5_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tables = TABLES if tables is None else tables
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(self.path, timeout=60)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        # индексы большой таблицы обновляются в кэше страниц, а не чтением с диска
+        self._connection.execute('PRAGMA cache_size=-65536')
+        self._statements = {}
+        self._watchers = {}
+        self._runs = {}
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS store_runs (name TEXT PRIMARY KEY, run INTEGER NOT NULL)'
+            )
+        for name, spec in self.tables.items():
+            self._create(name, spec)
+
+    def _create(self, name, spec):
+        columns = ', '.join(f'{_quote(column)} {sql_type}' for column, sql_type in spec.columns.items())
+        key = _quote_all(spec.key)
+        with self._connection:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {_quote(name)} '
+                f'({columns}, data TEXT NOT NULL, _run INTEGER, PRIMARY KEY ({key}))'
+            )
+            existing = {row[1] for row in self._connection.execute(f'PRAGMA table_info({_quote(name)})')}
+            if '_run' not in existing:
+                # хранилище, созданное до учёта запусков
+                self._connection.execute(f'ALTER TABLE {_quote(name)} ADD COLUMN _run INTEGER')
+            for index in spec.indexes:
+                self._connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS {_quote(name + "_" + "_".join(index))} '
+                    f'ON {_quote(name)} ({_quote_all(index)})'
+                )
+
+        columns = [*spec.columns, 'data', '_run']
+        updates = ', '.join(
+            f'{_quote(column)} = excluded.{_quote(column)}' for column in columns if column not in spec.key
+        )
+        self._statements[name] = (
+            f'INSERT INTO {_quote(name)} ({_quote_all(columns)}) VALUES ({", ".join("?" * len(columns))}) '
+            f'ON CONFLICT ({key}) DO UPDATE SET {updates}'
+        )
+
+    @property
+    def connection(self):
+        return self._connection
+
+    def watch(self, table, watcher):
+        """
+        watcher(removed, added) вызывается в транзакции каждой пачки upsert таблицы
+        (removed - прежние версии обновляемых строк, added - новые строки) и при
+        удалении строк в finish_run() (removed - удаляемые строки, added пуст).
+        """
+        self._watchers.setdefault(table, []).append(watcher)
+
+    def begin_run(self, table):
+        """
+        Начинает запуск выгрузки таблицы: строки следующих upsert'ов отмечаются
+        его номером. Номер растёт и у незавершённых запусков. Возвращает номер.
+        """
+        with self._connection:
+            row = self._connection.execute('SELECT run FROM store_runs WHERE name = ?', (table,)).fetchone()
+            run = 1 if row is None else row[0] + 1
+            self._connection.execute('INSERT OR REPLACE INTO store_runs (name, run) VALUES (?, ?)', (table, run))
+        self._runs[table] = run
+        return run
+
+    def abandon_run(self, table):
+        """Запуск неполный: по нему ничего не удаляется, дальнейшие строки пишутся без номера запуска."""
+        self._runs.pop(table, None)
+
+    def finish_run(self, table):
+        """
+        Завершает полный запуск: удаляет строки таблицы, не встретившиеся в нём
+        (с прежним номером запуска или записанные вне запусков), сообщая о них
+        наблюдателям. Возвращает число удалённых строк или None, если запуска
+        нет (не начат или брошен abandon_run).
+        """
+        run = self._runs.pop(table, None)
+        if run is None:
+            return None
+        stale = f'FROM {_quote(table)} WHERE _run IS NULL OR _run < ?'
+        watchers = self._watchers.get(table, ())
+        with metrics.timer('store_delete_seconds', table=table), self._connection:
+            if watchers:
+                cursor = self._connection.execute(f'SELECT data {stale}', (run,))
+                while chunk := cursor.fetchmany(self.batch_size):
+                    removed = [orjson.loads(data) for data, in chunk]
+                    for watcher in watchers:
+                        watcher(removed, [])
+            deleted = self._connection.execute(f'DELETE {stale}', (run,)).rowcount
+        metrics.count('rows_deleted', deleted, table=table)
+        return deleted
+
+    def upsert(self, table, rows):
+        """
+        Вставляет или обновляет строки по ключу таблицы пачками по batch_size
+        (каждая пачка - одна транзакция). Строки без ключа пропускаются.
+        Возвращает число записанных записей.
+        """
+        spec = self.tables[table]
+        written = 0
+        # строки с одним ключом внутри пачки схлопываются заранее (последняя побеждает),
+        # как при последовательных upsert'ах, но без лишних обновлений индексов
+        batch = {}
+        for row in rows:
+            key = tuple(row.get(column) for column in spec.key)
+            if None in key:
+                continue
+            batch[key] = row
+            if len(batch) >= self.batch_size:
+                written += self._write(table, batch)
+        if batch:
+            written += self._write(table, batch)
+        return written
+
+    def _write(self, table, batch):
+        spec = self.tables[table]
+        watchers = self._watchers.get(table, ())
+        with metrics.timer('store_upsert_seconds', table=table), self._connection:
+            removed = self._current(table, list(batch)) if watchers else None
+            run = self._runs.get(table)
+            self._connection.executemany(
+                self._statements[table], (_params(spec.columns, row, run) for row in batch.values()),
+            )
+            for watcher in watchers:
+                watcher(removed, list(batch.values()))
+        count = len(batch)
+        metrics.count('rows_upserted', count, table=table)
+        batch.clear()
+        return count
+
+    def _current(self, table, keys, chunk_size=500):
+        """Сохранённые строки таблицы по ключам (только существующие)."""
+        spec = self.tables[table]
+        rows = []
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ', '.join(f'({", ".join("?" * len(spec.key))})' for _ in chunk)
+            rows.extend(orjson.loads(data) for data, in self._connection.execute(
+                f'SELECT data FROM {_quote(table)} WHERE ({_quote_all(spec.key)}) IN (VALUES {placeholders})',
+                [value for key in chunk for value in key],
+            ))
+        return rows
+
+    def query(self, sql, params=()):
+        """Результат произвольного SELECT списком словарей."""
+        cursor = self._connection.execute(sql, params)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def frame(self, sql, params=()):
+        """Результат произвольного SELECT как pandas.DataFrame."""
+        import pandas as pd
+
+        return pd.read_sql_query(sql, self._connection, params=params)
+
+    def count_by(self, table, *columns, where=None, params=()):
+        """Число строк по значениям колонок: аналог value_counts / groupby(columns).size()."""
+        return self._aggregate(table, columns, 'COUNT(*)', where, params)
+
+    def mean_by(self, table, value, *columns, where=None, params=()):
+        """Среднее value по значениям колонок: аналог groupby(columns)[value].mean()."""
+        return self._aggregate(table, columns, f'AVG({self._column(table, value)})', where, params)
+
+    def _aggregate(self, table, columns, expression, where, params):
+        """{значение колонки (кортеж для нескольких): агрегат} в порядке значений."""
+        group = ', '.join(self._column(table, column) for column in columns)
+        sql = f'SELECT {group}, {expression} FROM {_quote(table)}'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' GROUP BY {group} ORDER BY {group}'
+        rows = self._connection.execute(sql, params)
+        if len(columns) == 1:
+            return {row[0]: row[1] for row in rows}
+        return {tuple(row[:-1]): row[-1] for row in rows}
+
+    def _column(self, table, column):
+        if column not in self.tables[table].columns:
+            raise ValueError(f"Unexpected column of table {table} - {column}")
+        return _quote(column)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _quote(name):
+    return f'"{name}"'
+
+
+def _quote_all(names):
+    return ', '.join(_quote(name) for name in names)
+
+
+def _params(columns, row, run=None):
+    """
+    Параметры INSERT: типизированные колонки (вложенные структуры - строкой JSON),
+    вся строка в data и номер запуска.
+    """
+    params = [row.get(column) for column in columns]
+    for idx, value in enumerate(params):
+        if type(value) is dict or type(value) is list:
+            params[idx] = orjson.dumps(value).decode()
+    params.append(orjson.dumps(row).decode())
+    params.append(run)
+    return params
+
+
+def open_store():
+    """
+    Хранилище по настройкам config: None, если STORE выключен.
+    При STORE_AGGREGATES к таблице flats подключаются сводки utils.aggregates.
+    """
+    if not config.STORE:
+        return None
+    store = Store(config.STORE_PATH)
+    if config.STORE_AGGREGATES:
+        from api_parser.utils import aggregates
+
+        aggregates.attach(store)
+    return store
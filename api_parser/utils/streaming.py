@@ -0,0 +1,123 @@
+"""
+Потоковый разбор больших JSON-ответов вида {"priceList": [...], ...}.
+
+Элементы массива по ключу декодируются по одному прямо из потока кусков
+(например response.iter_content()) C-сканером стандартного json: в памяти
+одновременно находятся только текущий кусок ответа и текущий элемент, сколько
+бы элементов ни было в массиве.
+"""
+import codecs
+import itertools
+import json
+import re
+
+CHUNK_SIZE = 1 << 20
+# элемент больше этого размера не ждём до конца потока - это ошибка в данных
+MAX_ITEM_SIZE = 64 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class ArrayNotFoundError(ValueError):
+    """В документе нет массива по ключу; head - остальные ключи верхнего уровня."""
+
+    def __init__(self, key, head):
+        super().__init__(f"No array under key {key!r}")
+        self.key = key
+        self.head = head
+
+
+class _Reader:
+    """Буфер текста поверх потока байтовых кусков с позицией чтения."""
+
+    def __init__(self, chunks, max_item_size=MAX_ITEM_SIZE):
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.max_item_size = max_item_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Дочитывает кусок потока, отбрасывая прочитанное. False - поток закончился."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.text.decode(b'', final=True)
+        else:
+            text = self.text.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Следующий значимый символ ('' в конце потока)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, allowed):
+        char = self.peek()
+        if not char or char not in allowed:
+            raise ValueError(f"Expected one of {allowed!r}, got {char or 'end of stream'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Декодирует следующее значение JSON целиком, дочитывая поток по мере надобности."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # значение оборвалось на границе куска - дочитываем
+                if len(self.buffer) - self.pos > self.max_item_size or not self.fill():
+                    raise
+                continue
+            if end == len(self.buffer) and self.fill():
+                # число или литерал в конце буфера могли продолжиться в следующем куске
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks, key, max_item_size=MAX_ITEM_SIZE):
+    """
+    Элементы массива document[key] из потока байтовых кусков JSON-объекта.
+    Если массива нет, бросает ArrayNotFoundError с разобранными ключами
+    верхнего уровня (например errors/message ответа с ошибкой).
+    """
+    reader = _Reader(chunks, max_item_size)
+    reader.expect('{')
+    head = {}
+    if reader.peek() == '}':
+        raise ArrayNotFoundError(key, head)
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.pos += 1
+            if reader.peek() == ']':
+                return
+            while True:
+                yield reader.value()
+                if reader.expect(',]') == ']':
+                    return
+
+        head[name] = reader.value()
+        if reader.expect(',}') == '}':
+            raise ArrayNotFoundError(key, head)
+
+
+def batched(iterable, size):
+    """Списки по size элементов (itertools.batched появился только в Python 3.12)."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
@@ -0,0 +1,129 @@
+# api_client.py
+"""
+Данные карточек напрямую из map-nearby-suggestions, без браузера: тот же JSON,
+что страница карточки запрашивает сама, одним HTTP-запросом на карточку.
+
+Адрес запроса не зашит в код: первую карточку открывает браузер, и
+перехваченный seleniumwire запрос становится шаблоном - его путь и query
+сохраняются, меняется только ID объявления. Пока шаблона нет или в нем не нашелся
+ID, прямые запросы не делаются. Карточки, для которых прямой запрос не удался
+(ошибка, капча вместо JSON), обрабатываются через пул браузеров, как раньше.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from card_parser import capture_card, extract_card_data, process_card
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate, br",
+}
+API_TIMEOUT = 10
+
+
+def offer_id(card_url):
+    """ID объявления из ссылки вида .../offer/<id>/"""
+    return card_url.rstrip("/").rsplit("/", 1)[-1]
+
+
+class SuggestionsClient:
+    """
+      Пул HTTP-соединений к API карточек: keep-alive, повтор запроса
+      при 429/5xx с экспоненциальной паузой, ответ декомпрессируется requests
+    """
+
+    def __init__(self, workers=8, timeout=API_TIMEOUT):
+        self.template = None
+        self.workers = workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def learn(self, request_url, card_url):
+        """
+          Запоминает запрос, который страница карточки card_url сделала сама, как шаблон;
+          False, если ID объявления нет ни в пути, ни в query - такой шаблон не годится
+        """
+        key = offer_id(card_url)
+        parts = urlsplit(request_url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if key not in parts.path and all(value != key for _, value in query):
+            logging.warning(f"В запросе {request_url} нет ID объявления {key}, прямые запросы отключены")
+            return False
+        self.template = (key, parts, query)
+        logging.info(f"Шаблон прямого запроса карточек: {request_url}")
+        return True
+
+    def request_url(self, card_url):
+        """Адрес шаблона с ID объявления card_url; None, пока шаблона нет"""
+        if self.template is None:
+            return None
+        key, parts, query = self.template
+        new_key = offer_id(card_url)
+        query = [(name, new_key if value == key else value) for name, value in query]
+        return urlunsplit(parts._replace(path=parts.path.replace(key, new_key), query=urlencode(query)))
+
+    def fetch(self, card_url):
+        """Данные карточки или None, если шаблона нет или API не отдал разбираемый JSON"""
+        url = self.request_url(card_url)
+        if url is None:
+            return None
+        try:
+            resp = self.session.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            itm = resp.json()["response"]["points"][0]["item"]
+        except Exception as e:
+            logging.error(f"Прямой запрос для карточки {card_url} не удался: {e}")
+            return None
+        return extract_card_data(itm)
+
+    def fetch_many(self, card_urls):
+        """Данные карточек в порядке ссылок; запросы идут параллельно в workers потоков"""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self.fetch, card_urls))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def process_cards(card_urls, client, pool=None):
+    """
+      Обрабатывает карточки через API пачкой
+      Пока у client нет шаблона запроса, первая карточка открывается в браузере
+      пула и ее запрос map-nearby-suggestions становится шаблоном
+      Неудавшиеся карточки повторяет через пул браузеров (если он передан)
+      Возвращает список данных в порядке карточек (None - карточка не вернула данные)
+    """
+    results, start = [None] * len(card_urls), 0
+    if client.template is None and pool is not None and card_urls:
+        results[0], request_url = capture_card(card_urls[0], 1, len(card_urls), pool)
+        start = 1
+        if request_url is not None:
+            client.learn(request_url, card_urls[0])
+    results[start:] = client.fetch_many(card_urls[start:])
+    failed = [idx for idx, data in enumerate(results) if data is None]
+    if failed and pool is not None:
+        logging.info(f"Через API не получено {len(failed)} из {len(card_urls)} карточек, открываем в браузере")
+        total = len(card_urls)
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            retried = executor.map(lambda idx: process_card(card_urls[idx], idx + 1, total, pool), failed)
+            for idx, data in zip(failed, retried):
+                results[idx] = data
+    return results
@@ -0,0 +1,81 @@
+# bench_api.py
+"""
+Проверка и бенчмарк прямого API (api_client.py) на записях fixture_site.py:
+1. без шаблона запроса прямых запросов нет; с пулом браузеров шаблон берется из
+   запроса первой карточки (без браузера - адрес, который запросил бы ее скрипт);
+2. данные всех карточек через API совпадают с записанными ответами;
+3. карточки, на которых API отвечает капчей, без пула браузеров не возвращают
+   данные, а с пулом - получены через браузер и тоже совпадают с записями;
+4. скорость: API против пула браузеров (--browsers 0 - без браузерной части).
+
+    python bench_api.py --cards 200 --browsers 4
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+
+from api_client import SuggestionsClient, offer_id, process_cards
+from card_parser import extract_card_data, process_card
+from fixture_site import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк прямого API карточек")
+    parser.add_argument("--recordings", type=Path, default=None, help="Папка записей (без нее - синтетические)")
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--api-workers", type=int, default=8)
+    parser.add_argument("--browsers", type=int, default=4, help="Размер пула браузеров, 0 - без браузера")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    with serve(args.cards, args.latency, args.recordings) as site:
+        expected = {key: extract_card_data(item) for key, item in site.offer_items().items()}
+        card_urls = site.offer_urls()
+        with SuggestionsClient(args.api_workers) as client, ExitStack() as stack:
+            print(f"без шаблона получено через API: {sum(data is not None for data in client.fetch_many(card_urls))}")
+            pool = None
+            if args.browsers:
+                from driver import BrowserPool
+
+                pool = stack.enter_context(BrowserPool(args.browsers))
+                process_cards(card_urls[:1], client, pool)
+            else:
+                client.learn(site.suggestions_url(offer_id(card_urls[0])), card_urls[0])
+            last = card_urls[-1]
+            print(f"шаблон для последней карточки: {client.request_url(last)}, "
+                  f"как у ее страницы: {client.request_url(last) == site.suggestions_url(offer_id(last))}")
+
+            started = time.perf_counter()
+            direct = client.fetch_many(card_urls)
+            direct_rate = len(card_urls) / (time.perf_counter() - started)
+            print(f"API, {args.api_workers} потоков: {direct_rate:.1f} карточек/с, "
+                  f"совпадает с записями: {direct == list(expected.values())}")
+
+            site.blocked = {offer_id(url) for url in card_urls[::10]}
+            results = process_cards(card_urls, client)
+            missing = {offer_id(url) for url, data in zip(card_urls, results) if data is None}
+            print(f"капча на {len(site.blocked)} карточках, без браузера не получено: {len(missing)}, "
+                  f"это именно они: {missing == site.blocked}")
+            if pool is None:
+                return
+
+            results = process_cards(card_urls, client, pool)
+            print(f"с переходом на браузер совпадает с записями: {results == list(expected.values())}")
+
+            site.blocked = set()
+            sample = card_urls[:args.browsers * 5]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=pool.size) as executor:
+                browser = list(executor.map(lambda url: process_card(url, 1, len(sample), pool), sample))
+            browser_rate = len(sample) / (time.perf_counter() - started)
+            print(f"пул из {args.browsers} браузеров: {browser_rate:.1f} карточек/с, "
+                  f"API быстрее в x{direct_rate / browser_rate:.1f}, "
+                  f"браузер совпадает с записями: {browser == [expected[offer_id(url)] for url in sample]}")
+
+
+if __name__ == "__main__":
+    main()
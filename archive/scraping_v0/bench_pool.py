@@ -0,0 +1,74 @@
+# bench_pool.py
+"""
+Проверка и бенчмарк пула браузеров на локальном сайте fixture_site.py:
+1. прежняя схема - новый Chrome на каждую карточку, пауза 3 с, quit;
+2. пул долгоживущих браузеров с ожиданием ответа map-nearby-suggestions.
+Результаты обеих схем сверяются с записанными ответами; то же равенство
+проверяет тест tests/test_pool.py (с Chrome, если он установлен).
+
+    python bench_pool.py --cards 20 --browsers 4
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from card_parser import extract_card_data, parse_suggestions, process_card
+from driver import BrowserPool, create_driver
+from fixture_site import base_url, serve
+from page_parser import LIST_PATH, collect_card_urls, process_page
+
+
+def process_card_legacy(card_url, factory=create_driver, pause=3):
+    """Прежний process_card: отдельный браузер и фиксированная пауза на каждую карточку"""
+    drv = factory()
+    try:
+        drv.get(card_url)
+        time.sleep(pause)
+        for req in drv.requests:
+            if req.response and "map-nearby-suggestions" in req.url:
+                return parse_suggestions(
+                    req.response.body, req.response.headers.get("Content-Encoding", "identity"), card_url
+                )
+    finally:
+        drv.quit()
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пула браузеров")
+    parser.add_argument("--recordings", type=Path, default=None, help="Папка записей (без нее - синтетические)")
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--browsers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with serve(args.cards, args.latency, args.recordings, per_page=args.cards) as site:
+        expected = [extract_card_data(item) for item in site.offer_items().values()]
+        with BrowserPool(1) as pool, pool.acquire() as drv:
+            card_urls = collect_card_urls(drv, base_url(site) + LIST_PATH.format(page=1))
+
+        started = time.perf_counter()
+        legacy = [process_card_legacy(url) for url in card_urls]
+        legacy_rate = len(card_urls) / (time.perf_counter() - started)
+        print(f"браузер на карточку: {legacy_rate:.2f} карточек/с, "
+              f"совпадает с записями: {sorted(legacy, key=str) == sorted(expected, key=str)}")
+
+        started = time.perf_counter()
+        with BrowserPool(args.browsers) as pool:
+            launched = time.perf_counter()
+            pooled = process_page(1, pool, base_url(site))
+        rate = len(card_urls) / (time.perf_counter() - started)
+        print(f"пул из {args.browsers} браузеров: {rate:.2f} карточек/с (x{rate / legacy_rate:.1f}), "
+              f"запуск пула {launched - started:.1f} с, совпадает с записями: "
+              f"{sorted(pooled, key=str) == sorted(expected, key=str)}")
+
+        with BrowserPool(1) as pool:
+            started = time.perf_counter()
+            process_card(card_urls[0], 1, 1, pool)
+            print(f"ожидание ответа вместо паузы 3 с: {time.perf_counter() - started:.2f} с на карточку")
+
+
+if __name__ == "__main__":
+    main()
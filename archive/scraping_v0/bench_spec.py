@@ -0,0 +1,95 @@
+# bench_spec.py
+"""
+Бенчмарк извлечения полей карточки: прежние цепочки .get(...) против
+скомпилированной спецификации CARD_SPEC (api_parser/utils/paths.py).
+Результаты сверяются на полных записях и на записях с удаленными полями.
+
+    python bench_spec.py --items 100000
+"""
+import argparse
+import copy
+import random
+import time
+
+from card_parser import card_spec
+from fixture_site import fixtures
+
+
+def extract_chained(itm):
+    """Прежнее построение card_data"""
+    return {
+        "offerId": itm.get("offerId", ""),
+        "developer": itm.get("salesDepartments", [{}])[0].get("name", ""),
+        "area": itm.get("area", {}).get("value"),
+        "livingArea": itm.get("livingSpace", {}).get("value"),
+        "rooms": itm.get("roomsTotal"),
+        "floor": itm.get("floorsOffered", [None])[0],
+        "floorsTotal": itm.get("floorsTotal"),
+        "price": itm.get("price", {}).get("value"),
+        "pricePerM2": itm.get("price", {}).get("valuePerPart"),
+        "yearBuilt": itm.get("building", {}).get("builtYear"),
+        "quarterBuilt": itm.get("building", {}).get("builtQuarter"),
+        "buildingType": itm.get("building", {}).get("buildingType", ""),
+        "parking": itm.get("building", {}).get("improvements", {}).get("PARKING", False),
+        "lift": itm.get("building", {}).get("improvements", {}).get("LIFT", False),
+        "security": itm.get("building", {}).get("improvements", {}).get("SECURITY", False),
+        "address": itm.get("location", {}).get("geocoderAddress", ""),
+        "latitude": itm.get("location", {}).get("point", {}).get("latitude"),
+        "longitude": itm.get("location", {}).get("point", {}).get("longitude"),
+        "metroName": itm.get("location", {}).get("metro", {}).get("name"),
+        "metroTime": itm.get("location", {}).get("metro", {}).get("timeToMetro"),
+        "metroTransport": itm.get("location", {}).get("metro", {}).get("metroTransport"),
+        "parksCount": len(itm.get("location", {}).get("parks", [])),
+        "pondsCount": len(itm.get("location", {}).get("ponds", [])),
+        "metroStationsCount": len(itm.get("location", {}).get("metroList", [])),
+        "hasPriceHistory": itm.get("price", {}).get("hasPriceHistory", False),
+        "pricePrev": itm.get("price", {}).get("previous"),
+        "profitabilityDesc": next((h.get("description") for h in itm.get("location", {}).get("allHeatmaps", []) if h.get("name") == "profitability"), None),
+        "profitabilityLevel": next((h.get("level") for h in itm.get("location", {}).get("allHeatmaps", []) if h.get("name") == "profitability"), None)
+    }
+
+
+def make_items(count, seed=0):
+    """Записи map-nearby-suggestions; у трети удалены случайные ключи, а тепловых карт несколько"""
+    rng = random.Random(seed)
+    items = []
+    for n in range(count):
+        item = fixtures.make_realty_item(str(n), n)
+        item["location"]["allHeatmaps"] = [
+            {"name": name, "description": name, "level": level}
+            for level, name in enumerate(("transport", "infrastructure", "price-rent", "carsharing"))
+        ] + item["location"]["allHeatmaps"]
+        if n % 3 == 0:
+            for key in rng.sample(["area", "building", "location", "price", "offerId", "roomsTotal"], 2):
+                item.pop(key)
+        items.append(item)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк спецификации полей карточки")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    chained = [extract_chained(copy.deepcopy(item)) for item in items]
+    print(f"записей: {len(items)}, результаты совпадают: {card_spec.extract_many(items) == chained}")
+
+    timings = {}
+    for name, run in (
+        ("цепочки .get", lambda: [extract_chained(item) for item in items]),
+        ("спецификация", lambda: card_spec.extract_many(items)),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+        print(f"{name}: {best:.3f} с, {len(items) / best:.0f} записей/с")
+    print(f"ускорение: x{timings['цепочки .get'] / timings['спецификация']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,109 @@
 # card_parser.py
-import time
-import brotli
 import json
 import logging
-from seleniumwire import webdriver
+import sys
+from pathlib import Path
 
-def process_card(card_url, idx, total):
+from selenium.common.exceptions import TimeoutException
+from seleniumwire.utils import decode
+
+# движок путей общий с выгрузками FSK: api_parser.utils.paths не требует настроек окружения api_parser
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from api_parser.utils import paths  # noqa: E402
+
+SUGGESTIONS_PATTERN = "map-nearby-suggestions"
+CARD_TIMEOUT = 15  # максимальное ожидание ответа map-nearby-suggestions, с
+
+
+# Поля карточки: колонка -> путь в элементе response.points[].item (см. api_parser/utils/paths.py)
+CARD_SPEC = {
+    "offerId": ("offerId", ""),
+    "developer": ("salesDepartments[0].name", ""),
+    "area": "area.value",
+    "livingArea": "livingSpace.value",
+    "rooms": "roomsTotal",
+    "floor": "floorsOffered[0]",
+    "floorsTotal": "floorsTotal",
+    "price": "price.value",
+    "pricePerM2": "price.valuePerPart",
+    "yearBuilt": "building.builtYear",
+    "quarterBuilt": "building.builtQuarter",
+    "buildingType": ("building.buildingType", ""),
+    "parking": ("building.improvements.PARKING", False),
+    "lift": ("building.improvements.LIFT", False),
+    "security": ("building.improvements.SECURITY", False),
+    "address": ("location.geocoderAddress", ""),
+    "latitude": "location.point.latitude",
+    "longitude": "location.point.longitude",
+    "metroName": "location.metro.name",
+    "metroTime": "location.metro.timeToMetro",
+    "metroTransport": "location.metro.metroTransport",
+    "parksCount": ("location.parks|len", 0),
+    "pondsCount": ("location.ponds|len", 0),
+    "metroStationsCount": ("location.metroList|len", 0),
+    "hasPriceHistory": ("price.hasPriceHistory", False),
+    "pricePrev": "price.previous",
+    "profitabilityDesc": "location.allHeatmaps[name=profitability].description",
+    "profitabilityLevel": "location.allHeatmaps[name=profitability].level",
+}
+card_spec = paths.Spec(CARD_SPEC)
+
+
+def extract_card_data(itm):
+    """Поля карточки из элемента response.points[].item ответа map-nearby-suggestions"""
+    return card_spec(itm)
+
+
+def parse_suggestions(body, encoding, card_url):
     """
-      Создает новый драйвер и открывает URL карточки
-      Ждет 3 секунды для загрузки страницы и отправки запросов
-      Перебирает все запросы, ищет endpoint map-nearby-suggestions
-      сли запрос найден, декомпрессирует и парсит ответ, извлекая нужные данные
-      Закрывает драйвер и возвращает словарь с данными
+      Декомпрессирует тело ответа по заголовку Content-Encoding (br, gzip, ...)
+      и извлекает данные первой точки; None, если ответ не разобрался
     """
-    logging.info(f"Обрабатываем карточку {idx}/{total}: {card_url}")
-    opt = webdriver.Chromeopt()
-    opt.add_argument("--headless")
-    opt.add_argument("disable-logging")
-    drv = webdriver.Chrome(seleniumwire_opt={}, opt=opt)
-    card_data = None
     try:
+        dc = decode(body, encoding)
+    except Exception as e:
+        logging.error(f"Ошибка декомпрессии для карточки {card_url}: {e}")
+        dc = body
+    try:
+        js = json.loads(dc.decode('utf-8'))
+    except Exception as e:
+        logging.error(f"Ошибка загрузки JSON для карточки {card_url}: {e}")
+        return None
+    try:
+        return extract_card_data(js["response"]["points"][0]["item"])
+    except Exception as e:
+        logging.error(f"Ошибка извлечения данных из JSON для карточки {card_url}: {e}")
+        return None
+
+
+def capture_card(card_url, idx, total, pool, timeout=CARD_TIMEOUT):
+    """
+      Берет браузер из пула и открывает URL карточки
+      Ждет запроса endpoint'а map-nearby-suggestions (не дольше timeout секунд)
+      вместо фиксированной паузы
+      Декомпрессирует и парсит ответ, извлекая нужные данные
+      Возвращает браузер в пул и возвращает (словарь с данными, URL перехваченного запроса)
+    """
+    logging.info(f"Обрабатываем карточку {idx}/{total}: {card_url}")
+    card_data = request_url = None
+    with pool.acquire() as drv:
         drv.get(card_url)
-        time.sleep(3)  # ждем загрузки страницы и прихода запросов
-        
-        for req in drv.requests:
-            if req.response and "map-nearby-suggestions" in req.url:
-                body = req.response.body
-                try:
-                    dc = brotli.decompress(body)
-                except Exception as e:
-                    logging.error(f"Ошибка декомпрессии для карточки {card_url}: {e}")
-                    dc = body
-                try:
-                    data_str = dc.decode('utf-8')
-                except Exception as e:
-                    logging.error(f"Ошибка декодирования для карточки {card_url}: {e}")
-                    data_str = ""
-                try:
-                    js = json.loads(data_str)
-                except Exception as e:
-                    logging.error(f"Ошибка загрузки JSON для карточки {card_url}: {e}")
-                    js = None
-                if js:
-                    try:
-                        itm = js["response"]["points"][0]["item"]
-                        card_data = {
-                            "offerId": itm.get("offerId", ""),
-                            "developer": itm.get("salesDepartments", [{}])[0].get("name", ""),
-                            "area": itm.get("area", {}).get("value"),
-                            "livingArea": itm.get("livingSpace", {}).get("value"),
-                            "rooms": itm.get("roomsTotal"),
-                            "floor": itm.get("floorsOffered", [None])[0],
-                            "floorsTotal": itm.get("floorsTotal"),
-                            "price": itm.get("price", {}).get("value"),
-                            "pricePerM2": itm.get("price", {}).get("valuePerPart"),
-                            "yearBuilt": itm.get("building", {}).get("builtYear"),
-                            "quarterBuilt": itm.get("building", {}).get("builtQuarter"),
-                            "buildingType": itm.get("building", {}).get("buildingType", ""),
-                            "parking": itm.get("building", {}).get("improvements", {}).get("PARKING", False),
-                            "lift": itm.get("building", {}).get("improvements", {}).get("LIFT", False),
-                            "security": itm.get("building", {}).get("improvements", {}).get("SECURITY", False),
-                            "address": itm.get("location", {}).get("geocoderAddress", ""),
-                            "latitude": itm.get("location", {}).get("point", {}).get("latitude"),
-                            "longitude": itm.get("location", {}).get("point", {}).get("longitude"),
-                            "metroName": itm.get("location", {}).get("metro", {}).get("name"),
-                            "metroTime": itm.get("location", {}).get("metro", {}).get("timeToMetro"),
-                            "metroTransport": itm.get("location", {}).get("metro", {}).get("metroTransport"),
-                            "parksCount": len(itm.get("location", {}).get("parks", [])),
-                            "pondsCount": len(itm.get("location", {}).get("ponds", [])),
-                            "metroStationsCount": len(itm.get("location", {}).get("metroList", [])),
-                            "hasPriceHistory": itm.get("price", {}).get("hasPriceHistory", False),
-                            "pricePrev": itm.get("price", {}).get("previous"),
-                            "profitabilityDesc": next((h.get("description") for h in itm.get("location", {}).get("allHeatmaps", []) if h.get("name") == "profitability"), None),
-                            "profitabilityLevel": next((h.get("level") for h in itm.get("location", {}).get("allHeatmaps", []) if h.get("name") == "profitability"), None)
-                        }
-                    except Exception as e:
-                        logging.error(f"Ошибка извлечения данных из JSON для карточки {card_url}: {e}")
-                break
-    finally:
-        drv.quit()
+        try:
+            req = drv.wait_for_request(SUGGESTIONS_PATTERN, timeout=timeout)
+        except TimeoutException:
+            logging.error(f"Не дождались {SUGGESTIONS_PATTERN} для карточки {card_url} за {timeout} с")
+        else:
+            request_url = req.url
+            card_data = parse_suggestions(
+                req.response.body, req.response.headers.get("Content-Encoding", "identity"), card_url
+            )
     if card_data:
         logging.info(f"Спарсены данные карточки {idx}: {card_data}")
     else:
         logging.info(f"Карточка {idx} не вернула данные.")
-    return card_data
+    return card_data, request_url
+
+
+def process_card(card_url, idx, total, pool, timeout=CARD_TIMEOUT):
+    """Данные карточки через браузер пула (см. capture_card)"""
+    return capture_card(card_url, idx, total, pool, timeout)[0]
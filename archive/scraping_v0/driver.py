@@ -1,8 +1,109 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
 from seleniumwire import webdriver
 
+# Из всего трафика страницы нужен только ответ этого endpoint'а
+CAPTURE_SCOPES = [".*map-nearby-suggestions.*"]
+
+
 def create_driver():
     opts = webdriver.ChromeOptions()
     opts.add_argument("--headless")
     opts.add_argument("disable-logging")
     drv = webdriver.Chrome(seleniumwire_options={}, options=opts)
+    drv.scopes = CAPTURE_SCOPES
     return drv
+
+
+class BrowserPool:
+    """
+    Пул долгоживущих браузеров: драйверы запускаются по мере надобности
+    (не больше size) и переиспользуются для всех карточек. acquire() выдает
+    свободный драйвер с очищенной историей перехваченных запросов;
+    упавший браузер закрывается, вместо него при следующем acquire() запускается новый.
+    """
+
+    def __init__(self, size=4, factory=create_driver):
+        self.size = size
+        self.factory = factory
+        self.idle = queue.Queue()
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def _start(self):
+        """Запускает новый браузер, если пул еще не заполнен; иначе None"""
+        with self.lock:
+            if len(self.drivers) >= self.size:
+                return None
+            self.drivers.append(None)  # место занято на время запуска
+        try:
+            drv = self.factory()
+        finally:
+            with self.lock:
+                self.drivers.remove(None)
+        with self.lock:
+            self.drivers.append(drv)
+        logging.info(f"Запущен браузер пула ({len(self.drivers)}/{self.size})")
+        return drv
+
+    def _discard(self, drv):
+        with self.lock:
+            self.drivers.remove(drv)
+        try:
+            drv.quit()
+        except Exception:
+            pass
+
+    def _take(self):
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+            drv = self._start()
+            if drv is not None:
+                return drv
+            try:
+                # если браузер за это время упадет, его место освободится для нового
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    @contextmanager
+    def acquire(self):
+        drv = self._take()
+        healthy = True
+        try:
+            yield drv
+        except WebDriverException as e:
+            logging.error(f"Браузер пула упал, перезапускаем: {e}")
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                try:
+                    # уходим со страницы, чтобы ее запросы не попали в историю следующей карточки
+                    drv.get("about:blank")
+                    del drv.requests
+                except Exception as e:
+                    logging.error(f"Браузер пула не отвечает, перезапускаем: {e}")
+                    healthy = False
+            if healthy:
+                self.idle.put(drv)
+            else:
+                self._discard(drv)
+
+    def close(self):
+        for drv in list(self.drivers):
+            if drv is not None:
+                self._discard(drv)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,54 @@
+# fixture_site.py
+"""
+Локальный realty.yandex.ru для проверки скрапера: заглушка StubFskServer из
+api_parser/benchmarks, общая с бенчмарками api_parser и scraping. Она отдает
+страницы выдачи (карточки [data-test="OffersSerpItem"]), страницы карточек,
+скрипт которых запрашивает map-nearby-suggestions, и ответы map-nearby-suggestions
+(сжатые gzip, если клиент это поддерживает, - как у настоящего API).
+Синтетические данные строит api_parser/benchmarks/fixtures.py (make_realty_*),
+записанные ответы берутся из папки --recordings (формат index.json, см.
+api_parser/benchmarks/recordings.py; ключи - offer/<offerId>/ и
+gate/map-nearby-suggestions/?offerId=<offerId>). Для offerId из server.blocked
+прямой запрос (без Referer страницы карточки) получает 403 с капчей - так
+проверяется переход на браузер.
+
+    python fixture_site.py --offers 20 --port 8000
+    python main.py --base-url http://127.0.0.1:8000
+"""
+import argparse
+import sys
+import threading
+from pathlib import Path
+
+# заглушка и синтетические данные - в api_parser/benchmarks корня репозитория
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from api_parser.benchmarks import fixtures  # noqa: E402,F401
+from api_parser.benchmarks.stub_server import StubFskServer  # noqa: E402
+
+
+def serve(offers=20, latency=0.2, recordings=None, port=0, per_page=20):
+    """Заглушка realty.yandex.ru: offers карточек по per_page на странице выдачи, задержка ответа latency с"""
+    return StubFskServer(
+        latency=latency, offers=offers, offers_per_page=per_page, recordings=recordings, compress=True, port=port,
+    )
+
+
+def base_url(server):
+    """Адрес сайта для --base-url и process_page: без завершающего /, как BASE_URL"""
+    return server.url.rstrip("/")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальный realty.yandex.ru")
+    parser.add_argument("--recordings", type=Path, default=None, help="Папка записанных ответов")
+    parser.add_argument("--offers", type=int, default=20, help="Синтетических карточек")
+    parser.add_argument("--latency", type=float, default=0.2, help="Задержка ответа, с")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    with serve(args.offers, args.latency, args.recordings, args.port) as server:
+        print(f"Сайт доступен на {base_url(server)}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
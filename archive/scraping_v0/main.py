@@ -1,9 +1,20 @@
+import argparse
+
 from logger_config import setup_logging
+from page_parser import BASE_URL
 from scraper import scrape_pages
 
 def main():
+    parser = argparse.ArgumentParser(description="Сбор новостроек с realty.yandex.ru")
+    parser.add_argument("--pages", type=int, default=1, help="Сколько страниц выдачи обойти")
+    parser.add_argument("--browsers", type=int, default=4, help="Размер пула браузеров (карточек одновременно)")
+    parser.add_argument("--base-url", default=BASE_URL, help="Адрес сайта (например, локального fixture_site.py)")
+    parser.add_argument("--browser-only", action="store_true", help="Не запрашивать API напрямую, только через браузер")
+    parser.add_argument("--api-workers", type=int, default=8, help="Параллельных запросов к API")
+    args = parser.parse_args()
+
     setup_logging("scraper.log")
-    scrape_pages()
+    scrape_pages(args.pages, args.browsers, args.base_url, direct=not args.browser_only, api_workers=args.api_workers)
 
 if __name__ == "__main__":
     main()
@@ -1,26 +1,32 @@
 # page_parser.py
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from driver import create_driver
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from api_client import process_cards
 from card_parser import process_card
 
-def process_page(page_num):
-    """
-      Создает драйвер и открывает страницу с карточками
-      Собирает ссылки на карточки
-      Для каждой карточки вызывает process_card для получения данных
-      Закрывает драйвер и возвращает список данных с этой страницы
-    """
-    
-    page_url = f"https://realty.yandex.ru/moskva_i_moskovskaya_oblast/kupit/kvartira/novostroyki/?page={page_num}"
-    logging.info(f"Обрабатываем страницу {page_num}: {page_url}")
-    
-    drv = create_driver()
+BASE_URL = "https://realty.yandex.ru"
+LIST_PATH = "/moskva_i_moskovskaya_oblast/kupit/kvartira/novostroyki/?page={page}"
+CARD_SELECTOR = '[data-test="OffersSerpItem"]'
+PAGE_TIMEOUT = 15  # максимальное ожидание появления карточек на странице, с
+
+
+def collect_card_urls(drv, page_url, timeout=PAGE_TIMEOUT):
+    """Открывает страницу выдачи и собирает ссылки на карточки, как только они появились в DOM"""
     drv.get(page_url)
-    time.sleep(2)
-    
-    cards = drv.find_elements(By.CSS_SELECTOR, '[data-test="OffersSerpItem"]')
+    try:
+        cards = WebDriverWait(drv, timeout).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, CARD_SELECTOR))
+        )
+    except TimeoutException:
+        logging.error(f"На странице {page_url} не появились карточки за {timeout} с")
+        return []
+
     card_urls = []
     for c in cards:
         try:
@@ -29,12 +35,32 @@ def process_page(page_num):
             card_urls.append(link)
         except Exception as e:
             logging.error(f"Ошибка получения ссылки карточки: {e}")
-    drv.quit()
-    
-    pages = []
+    return card_urls
+
+
+def process_page(page_num, pool, base_url=BASE_URL, client=None):
+    """
+      Берет браузер из пула и открывает страницу с карточками
+      Собирает ссылки на карточки
+      С client - запрашивает данные карточек напрямую через API,
+      неудавшиеся карточки открывает в браузерах пула;
+      без него - обрабатывает карточки параллельно, по одной на каждый браузер пула
+      Возвращает список данных с этой страницы в порядке карточек
+    """
+
+    page_url = base_url + LIST_PATH.format(page=page_num)
+    logging.info(f"Обрабатываем страницу {page_num}: {page_url}")
+
+    with pool.acquire() as drv:
+        card_urls = collect_card_urls(drv, page_url)
+
+    if client is not None:
+        return [data for data in process_cards(card_urls, client, pool) if data]
+
     total = len(card_urls)
-    for idx, url in enumerate(card_urls, start=1):
-        data = process_card(url, idx, total)
-        if data:
-            pages.append(data)
-    return pages
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        results = executor.map(
+            lambda args: process_card(args[1], args[0], total, pool),
+            enumerate(card_urls, start=1),
+        )
+        return [data for data in results if data]
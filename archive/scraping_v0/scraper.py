@@ -1,18 +1,25 @@
 # scraper.py
 import pandas as pd
 import logging
-from page_parser import process_page
+from api_client import SuggestionsClient
+from driver import BrowserPool
+from page_parser import BASE_URL, process_page
 
-def scrape_pages():
+def scrape_pages(max_pages=1, browsers=4, base_url=BASE_URL, out_csv="flats.csv", direct=True, api_workers=8):
     all_data = []
-    max_pages = 1
-    for p in range(1, max_pages+1):
-        logging.info(f"Начало обработки страницы {p}")
-        page_data = process_page(p)
-        all_data.extend(page_data)
-    
+    client = SuggestionsClient(api_workers) if direct else None
+    try:
+        with BrowserPool(browsers) as pool:
+            for p in range(1, max_pages+1):
+                logging.info(f"Начало обработки страницы {p}")
+                page_data = process_page(p, pool, base_url, client)
+                all_data.extend(page_data)
+    finally:
+        if client is not None:
+            client.close()
+
     df = pd.DataFrame(all_data)
     df.drop_duplicates(subset=["offerId"], inplace=True)
-    out_csv = "flats.csv"
     df.to_csv(out_csv, index=False, encoding="utf-8")
     logging.info(f"Сохранено {len(df)} уникальных записей в {out_csv}")
+    return df
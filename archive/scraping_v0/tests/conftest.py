@@ -0,0 +1,37 @@
+"""
+Общее для тестов архивного скрапера: модули папки импортируются по имени,
+как при запуске python main.py; сайт записей fixture_site.py и пул браузеров
+RecordedDriver (recorded.py), которым не нужен Chrome.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from driver import BrowserPool  # noqa: E402
+from fixture_site import base_url as site_base_url, serve  # noqa: E402
+from recorded import RecordedDriver  # noqa: E402
+
+
+@pytest.fixture
+def site():
+    with serve(offers=12, latency=0) as site:
+        yield site
+
+
+@pytest.fixture
+def base_url(site):
+    return site_base_url(site)
+
+
+@pytest.fixture
+def card_urls(site):
+    return site.offer_urls()
+
+
+@pytest.fixture
+def pool():
+    with BrowserPool(2, factory=RecordedDriver) as pool:
+        yield pool
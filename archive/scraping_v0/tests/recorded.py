@@ -0,0 +1,74 @@
+"""
+Браузер для тестов без Chrome: страницы сайта записей (fixture_site.py)
+открываются через requests, запросы скрипта карточки - как у seleniumwire.
+"""
+import re
+from types import SimpleNamespace
+from urllib.parse import urljoin
+
+import requests
+from selenium.common.exceptions import TimeoutException
+
+
+class RecordedDriver:
+    """
+    Браузер для тестов без Chrome: открывает страницы сайта записей через requests
+    и, как скрипт карточки, выполняет ее fetch(...) с Referer страницы.
+    Запросы страницы доступны, как у seleniumwire: requests, wait_for_request,
+    тело ответа - в том виде, в каком пришло (сжатое).
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.current_url = None
+        self.page_source = ""
+        self._requests = []
+
+    def get(self, url):
+        self.current_url = url
+        self.page_source = "" if url == "about:blank" else self.session.get(url).text
+        for path in re.findall(r'fetch\("([^"]+)"\)', self.page_source):
+            request_url = urljoin(url, path)
+            resp = self.session.get(
+                request_url, headers={"Referer": url, "Accept-Encoding": "gzip"}, stream=True,
+            )
+            response = SimpleNamespace(
+                status_code=resp.status_code, headers=resp.headers, body=resp.raw.read(decode_content=False),
+            )
+            self._requests.append(SimpleNamespace(url=request_url, response=response))
+
+    @property
+    def requests(self):
+        return list(self._requests)
+
+    @requests.deleter
+    def requests(self):
+        self._requests = []
+
+    def wait_for_request(self, pattern, timeout=10):
+        for req in self._requests:
+            if re.search(pattern, req.url):
+                return req
+        raise TimeoutException(f"Нет запроса {pattern}")
+
+    def find_elements(self, by, selector):
+        """Только селекторы вида [data-test="..."]: элементы выдачи со ссылкой внутри"""
+        name = re.fullmatch(r'\[data-test="([^"]+)"\]', selector).group(1)
+        return [
+            RecordedElement(urljoin(self.current_url, href))
+            for href in re.findall(rf'data-test="{name}"><a href="([^"]+)"', self.page_source)
+        ]
+
+    def quit(self):
+        self.session.close()
+
+
+class RecordedElement:
+    def __init__(self, href):
+        self.href = href
+
+    def find_element(self, by, selector):
+        return self
+
+    def get_attribute(self, name):
+        return self.href if name == "href" else None
@@ -0,0 +1,75 @@
+import pytest
+
+from api_client import SuggestionsClient, offer_id, process_cards
+from bench_spec import extract_chained, make_items
+from card_parser import CARD_SPEC, extract_card_data
+
+
+@pytest.fixture
+def client():
+    with SuggestionsClient(workers=4) as client:
+        yield client
+
+
+@pytest.fixture
+def expected(site):
+    return [extract_card_data(item) for item in site.offer_items().values()]
+
+
+def test_no_direct_requests_without_template(client, card_urls):
+    assert client.request_url(card_urls[0]) is None
+    assert process_cards(card_urls, client) == [None] * len(card_urls)
+
+
+def test_template_learned_from_captured_request(client, site, card_urls, pool, expected):
+    assert process_cards(card_urls, client, pool) == expected
+    # шаблон - запрос, который сделал скрипт первой карточки
+    assert client.request_url(card_urls[0]) == site.suggestions_url(offer_id(card_urls[0]))
+    for url in card_urls[1:]:
+        assert client.request_url(url) == site.suggestions_url(offer_id(url))
+
+
+def test_offer_id_substituted_in_path_and_query(client):
+    assert client.learn(
+        "https://realty.example/gate/123/map-nearby-suggestions/?offerId=123&rgid=587795&page=1",
+        "https://realty.example/offer/123/",
+    )
+    assert client.request_url("https://realty.example/offer/4567/") == (
+        "https://realty.example/gate/4567/map-nearby-suggestions/?offerId=4567&rgid=587795&page=1"
+    )
+
+
+def test_template_without_offer_id_is_rejected(client):
+    assert not client.learn("https://realty.example/gate/map-nearby-suggestions/?page=1",
+                            "https://realty.example/offer/123/")
+    assert client.template is None
+    assert client.fetch("https://realty.example/offer/123/") is None
+
+
+def test_failed_requests_fall_back_to_browser(client, site, card_urls, pool, expected):
+    client.learn(site.suggestions_url(offer_id(card_urls[0])), card_urls[0])
+    site.blocked = {offer_id(url) for url in card_urls[::3]}
+
+    results = process_cards(card_urls, client)
+    assert {offer_id(url) for url, data in zip(card_urls, results) if data is None} == site.blocked
+
+    assert process_cards(card_urls, client, pool) == expected
+
+
+def test_card_data_matches_card_spec_on_recorded_responses(client, site, card_urls):
+    client.learn(site.suggestions_url(offer_id(card_urls[0])), card_urls[0])
+    recorded = list(site.offer_items().values())
+    results = client.fetch_many(card_urls)
+    assert results == [extract_chained(item) for item in recorded]
+    assert all(list(data) == list(CARD_SPEC) for data in results)
+
+
+def test_card_spec_defaults_for_missing_fields():
+    items = make_items(60)
+    assert [extract_card_data(item) for item in items] == [extract_chained(item) for item in items]
+
+
+def test_card_parser_shares_path_engine_with_api_parser():
+    import card_parser
+    from api_parser.utils import paths
+    assert card_parser.paths is paths
@@ -0,0 +1,56 @@
+import shutil
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from bench_pool import process_card_legacy
+from card_parser import extract_card_data
+from driver import BrowserPool, create_driver
+from page_parser import LIST_PATH, collect_card_urls, process_page
+from recorded import RecordedDriver
+
+HAS_CHROME = any(shutil.which(name) for name in ("google-chrome", "chromium", "chromium-browser", "chrome"))
+
+# (фабрика браузера, пауза прежней схемы): Chrome проверяется, только если установлен
+DRIVERS = [
+    pytest.param(RecordedDriver, 0, id="recorded"),
+    pytest.param(create_driver, 3, id="chrome",
+                 marks=pytest.mark.skipif(not HAS_CHROME, reason="Chrome не установлен")),
+]
+
+
+@pytest.mark.parametrize("factory, pause", DRIVERS)
+def test_pool_matches_browser_per_card(site, base_url, factory, pause):
+    expected = [extract_card_data(item) for item in site.offer_items().values()]
+    with BrowserPool(1, factory=factory) as pool, pool.acquire() as drv:
+        card_urls = collect_card_urls(drv, base_url + LIST_PATH.format(page=1))
+    assert len(card_urls) == len(expected)
+
+    legacy = [process_card_legacy(url, factory=factory, pause=pause) for url in card_urls]
+    with BrowserPool(3, factory=factory) as pool:
+        pooled = process_page(1, pool, base_url)
+
+    assert pooled == legacy
+    assert sorted(pooled, key=str) == sorted(expected, key=str)
+
+
+def test_crashed_browser_is_replaced(base_url):
+    started = []
+
+    class CrashingDriver(RecordedDriver):
+        def __init__(self):
+            super().__init__()
+            started.append(self)
+
+        def get(self, url):
+            if len(started) == 1 and url != "about:blank":
+                raise WebDriverException("chrome not reachable")
+            super().get(url)
+
+    with BrowserPool(1, factory=CrashingDriver) as pool:
+        with pytest.raises(WebDriverException):
+            with pool.acquire() as drv:
+                drv.get(base_url + LIST_PATH.format(page=1))
+        with pool.acquire() as drv:
+            assert collect_card_urls(drv, base_url + LIST_PATH.format(page=1))
+    assert len(started) == 2
@@ -0,0 +1,88 @@
+"""
+Сверка и бенчмарк бэкендов разбора карточки (extractors.py) с parse_m2_card на BeautifulSoup.
+
+1. Каждый бэкенд должен вернуть тот же словарь, что bs4, на всех страницах;
+   при расхождениях код возврата 1.
+2. Скорость разбора каждым бэкендом, карточек в секунду.
+
+Проверяются настоящие страницы m2.ru из папки --fixtures: HTML, сохранённый
+через parser_1.py --save-html или записанный api_parser/benchmarks/recordings.py.
+Без неё карточки строятся из строк sector_*.csv - такие страницы годятся для
+замера скорости, но разметку для них пишет сам бенчмарк, поэтому совпадение
+с bs4 на них настоящие страницы не заменяет.
+Запуск из папки scraping:
+
+    python bench_extract.py --fixtures html/
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from extractors import BACKENDS, available_backends
+from parser_1 import parse_m2_card
+
+# синтетические карточки - в api_parser/benchmarks корня репозитория
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from api_parser.benchmarks import fixtures  # noqa: E402
+
+
+def card_from_row(idx, row):
+    """HTML карточки m2.ru (fixtures.make_m2_card), из которой parse_m2_card должен получить строку row."""
+    values = {key: value for key, value in row.items() if value != ""}
+    price = values.pop("price", None)
+    return fixtures.make_m2_card(idx, filler=200, info=values, price=price)
+
+
+def load_sector_rows():
+    """Строки sector_*.csv - значения для синтетических карточек."""
+    return [
+        row
+        for path in sorted(Path(".").glob("sector_*.csv"))
+        for row in pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+    ]
+
+
+def load_pages(directory, count):
+    """HTML сохранённых страниц из папки directory или синтетические карточки, если она не задана."""
+    if directory is None:
+        return [card_from_row(idx, row) for idx, row in enumerate(load_sector_rows()[:count])]
+    return [path.read_text(encoding="utf-8") for path in sorted(Path(directory).glob("*.html"))[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сверка и бенчмарк бэкендов разбора карточек")
+    parser.add_argument("--fixtures", type=Path, default=None, help="Папка с сохранёнными HTML-карточками")
+    parser.add_argument("--cards", type=int, default=1000)
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures, args.cards)
+    source = "синтетических" if args.fixtures is None else "сохранённых"
+    print(f"{source} карточек: {len(pages)}")
+    if not pages:
+        sys.exit(f"В {args.fixtures} нет файлов *.html")
+
+    started = time.perf_counter()
+    expected = [parse_m2_card(page) for page in pages]
+    baseline = len(pages) / (time.perf_counter() - started)
+    # страница без цены и параметров (заглушка, капча) совпадёт у всех бэкендов и ничего не проверит
+    empty = sum(not card for card in expected)
+    print(f"bs4: {baseline:.1f} карточек/с, страниц без цены и параметров: {empty}")
+
+    mismatched = 0
+    for name in available_backends():
+        extract = BACKENDS[name]
+        started = time.perf_counter()
+        results = [extract(page) for page in pages]
+        rate = len(pages) / (time.perf_counter() - started)
+        mismatches = sum(result != card for result, card in zip(results, expected))
+        mismatched += mismatches
+        print(f"{name}: {rate:.1f} карточек/с (x{rate / baseline:.2f}), расхождений с bs4: {mismatches}")
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Бенчмарк normalize.py на всех строках sector_*.csv: векторная нормализация
+против построчного разбора строк на Python, как это делают потребители сейчас.
+Проверяется, что результаты совпадают, и сравнивается объём таблиц в памяти.
+Запуск из папки scraping:
+
+    python bench_normalize.py
+"""
+import argparse
+import glob
+import time
+
+import pandas as pd
+
+from normalize import (
+    AREA_RE, COMPLETION_RE, FIELDS, FLAGS, FLOOR_RE, INFRASTRUCTURE, INT_RE, LENGTH_RE, ROOMS_RE, SCHEMA,
+    _is_infrastructure, normalize, read_sectors,
+)
+
+
+def _number(pattern, value, group=1, cast=float):
+    match = pattern.match(value)
+    if match is None or match.group(group) is None:
+        return None
+    return cast(match.group(group).replace(",", "."))
+
+
+def normalize_row(card):
+    """Построчный разбор одной карточки: цикл по полям и регулярные выражения на каждое значение."""
+    row = {}
+    infrastructure = []
+    for title, value in card.items():
+        if not isinstance(value, str):
+            continue
+        value = value.replace("\xa0", " ").strip()
+        if not value:
+            continue
+        if _is_infrastructure(title):
+            infrastructure.append(value)
+            continue
+        if title not in FIELDS:
+            continue
+
+        column, kind = FIELDS[title]
+        if kind == "price":
+            row[column] = int("".join(ch for ch in value if ch.isdigit()))
+        elif kind == "area":
+            row[column] = _number(AREA_RE, value)
+        elif kind == "length":
+            row[column] = _number(LENGTH_RE, value)
+        elif kind == "rooms":
+            row[column] = _number(ROOMS_RE, value, cast=int)
+        elif kind == "floor":
+            row["floor"] = _number(FLOOR_RE, value, 1, int)
+            row["floors_total"] = _number(FLOOR_RE, value, 2, int)
+        elif kind == "completion":
+            row["completion_year"] = _number(COMPLETION_RE, value, 2, int)
+            row["completion_quarter"] = _number(COMPLETION_RE, value, 1, int)
+        elif kind in ("int8", "int16"):
+            row[column] = _number(INT_RE, value, cast=int)
+        elif kind == "flag":
+            row[column] = FLAGS.get(value)
+        elif kind == "present":
+            row[column] = True
+        else:
+            row.setdefault(column, value)
+    if infrastructure:
+        row[INFRASTRUCTURE] = ", ".join(infrastructure)
+    row.setdefault("renovation_program", False)
+    return row
+
+
+def normalize_naive(cards):
+    return pd.DataFrame([normalize_row(card) for card in cards]).reindex(columns=list(SCHEMA)).astype(SCHEMA)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк нормализации карточек")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = read_sectors(sorted(glob.glob("sector_*.csv")))
+    cards = raw.to_dict("records")
+    print(f"строк: {len(raw)}, в памяти сырые строки: {raw.memory_usage(deep=True).sum() / 2 ** 20:.1f} МБ")
+
+    timings = {}
+    for name, run in (("построчно", lambda: normalize_naive(cards)), ("векторно", lambda: normalize(raw))):
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = run()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = (best, result)
+        print(f"{name}: {best:.3f} с, {len(raw) / best:.0f} строк/с")
+
+    naive, vectorized = timings["построчно"][1], timings["векторно"][1]
+    print(f"ускорение: x{timings['построчно'][0] / timings['векторно'][0]:.1f}")
+    print(f"результаты совпадают: {naive.equals(vectorized)}")
+    print(f"нормализованная таблица: {vectorized.memory_usage(deep=True).sum() / 2 ** 20:.2f} МБ")
+
+
+if __name__ == "__main__":
+    main()
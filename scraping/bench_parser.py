@@ -0,0 +1,70 @@
+"""
+Бенчмарк parser_1.py на карточках m2.ru локальной заглушки (api_parser/benchmarks/stub_server.py):
+1. полный обход с задержкой ответа: последовательный режим против конкурентного;
+2. скорость разбора parse_m2_card (карточек в секунду) в зависимости от числа процессов.
+
+Заглушка отдаёт карточки, записанные api_parser/benchmarks/recordings.py в папку
+--recordings, без неё - синтетические fixtures.make_m2_card со структурой страниц m2.ru.
+Запуск из папки scraping:
+
+    python bench_parser.py --recordings ../recordings/
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import requests
+
+from parser_1 import parse_m2_card, scrape_cards
+
+# заглушка и синтетические карточки - в api_parser/benchmarks корня репозитория
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from api_parser.benchmarks.stub_server import StubFskServer  # noqa: E402
+
+
+def bench_parse(pages, workers_list):
+    baseline = None
+    for workers in workers_list:
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_m2_card, pages, chunksize=4))
+        rate = len(results) / (time.perf_counter() - started)
+        baseline = baseline or rate
+        print(f"разбор, процессов {workers}: {rate:.1f} карточек/с (x{rate / baseline:.2f})")
+
+
+def bench_crawl(links, concurrency, workers):
+    """Обходит links последовательно и конкурентно; возвращает HTML карточек."""
+    started = time.perf_counter()
+    pages = [requests.get(url).text for url in links]
+    sequential = [parse_m2_card(page) for page in pages]
+    sequential_rate = len(links) / (time.perf_counter() - started)
+    print(f"обход, последовательно: {sequential_rate:.1f} карточек/с")
+
+    started = time.perf_counter()
+    concurrent = asyncio.run(scrape_cards(links, concurrency=concurrency, delay=0, workers=workers))
+    rate = len(links) / (time.perf_counter() - started)
+    print(f"обход, конкурентно ({concurrency} запросов, {workers} процессов): {rate:.1f} карточек/с "
+          f"(x{rate / sequential_rate:.2f}), результаты совпадают: {concurrent == sequential}")
+    return pages
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Бенчмарк parser_1.py")
+    parser.add_argument("--recordings", type=Path, default=None, help="Папка записанных ответов с карточками m2.ru")
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Задержка ответа сервера, с")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with StubFskServer(cards=args.cards, latency=args.latency, recordings=args.recordings) as server:
+        pages = bench_crawl(server.card_urls()[:args.cards], args.concurrency, cpus)
+    # записанных карточек может быть меньше --cards: для замера разбора они повторяются
+    pages = (pages * (args.cards // max(1, len(pages)) + 1))[:args.cards]
+    workers_list = sorted({1, *(2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus), cpus})
+    bench_parse(pages, workers_list)
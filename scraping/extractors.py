@@ -0,0 +1,298 @@
+"""Быстрые способы разбора карточки m2.ru: тот же словарь, что parser_1.parse_m2_card с BeautifulSoup.
+
+Бэкенды:
+- stream - потоковый разбор стандартным html.parser без построения дерева:
+  собирается только текст цены и блоков infoItem (всегда доступен);
+- lxml - дерево libxml2 и заранее скомпилированные XPath (pip install lxml);
+- selectolax - парсер lexbor и CSS-селекторы (pip install selectolax).
+
+auto выбирает selectolax, затем lxml, затем stream. Совпадение результатов
+с BeautifulSoup проверяется скриптом bench_extract.py; parser_1.py по умолчанию
+использует stream, остальные бэкенды - только явно, после сверки на сохранённых страницах.
+"""
+import re
+from html.parser import HTMLParser
+
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+# Правила построения дерева BeautifulSoup, от которых зависит результат get_text
+EMPTY_ELEMENT_TAGS = frozenset(HTMLParserTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+# Текст внутри script/style/template/rt/rp - строки особых типов: в get_text()
+# обычного элемента они не попадают, а у самого такого элемента - только они
+STRING_CONTAINERS = frozenset(HTMLParserTreeBuilder.DEFAULT_STRING_CONTAINERS)
+
+# Числовые ссылки без точки с запятой: число и следующий за ним обычный текст
+_DECIMAL_REFERENCE = re.compile(r'^([0-9]+)(.*)')
+_HEX_REFERENCE = re.compile(r'^([0-9a-f]+)(.*)')
+# Ссылки &#128;-&#159; страницы пишут в кодировке Windows-1252: &#150; - это тире, а не управляющий символ
+WINDOWS_1252 = {
+    number: bytes([number]).decode('cp1252')
+    for number in range(0x80, 0xa0) if number not in (0x81, 0x8d, 0x8f, 0x90, 0x9d)
+}
+
+
+def dereference_charref(name):
+    """
+    Числовая ссылка &#name; -> (символ, следующий за ссылкой текст), как в
+    BeautifulSoup: недопустимые коды дают U+FFFD, коды 0x80-0x9F читаются
+    как Windows-1252, а у ссылки без точки с запятой html.parser передаёт
+    в name и текст после числа.
+    """
+    base, pattern = 10, _DECIMAL_REFERENCE
+    if name[:1] in ('x', 'X'):
+        name, base, pattern = name[1:], 16, _HEX_REFERENCE
+
+    extra_data = ''
+    try:
+        number = int(name, base)
+    except ValueError:
+        match = pattern.search(name)
+        if match is None:
+            return '', name
+        number, extra_data = int(match.group(1), base), match.group(2)
+
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd', extra_data
+    return WINDOWS_1252.get(number) or chr(number), extra_data
+
+
+class _Element:
+    __slots__ = ('name', 'text', 'item')
+
+    def __init__(self, name):
+        self.name = name
+        self.text = None   # список строк, если текст элемента нужен
+        self.item = None   # [заголовок, значение] для блока infoItem
+
+
+class CardExtractor(HTMLParser):
+    """
+    Потоковый разбор карточки: повторяет построение дерева BeautifulSoup
+    (html.parser) только в той мере, в какой это влияет на цену и блоки infoItem.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []
+        self.open_counts = {}
+        self.closed_empty = []
+        self.containers = []        # открытые script/style/template/rt/rp
+        self.data = []
+        self.collecting = []        # открытые элементы, чей текст собирается
+        self.open_items = []        # открытые блоки infoItem
+        self.price = None           # (content, текст) первой подходящей цены
+        self.items = []             # [заголовок, значение] в порядке документа
+
+    def parse(self, html_code):
+        self.feed(html_code)
+        self.close()
+        self._end_data()
+
+        info_dict = {}
+        if self.price is not None:
+            content, text = self.price
+            info_dict["price"] = content if content else "".join(text)
+        for title, value in self.items:
+            if title is not None and value is not None:
+                info_dict["".join(title)] = "".join(value)
+        return info_dict
+
+    def _end_data(self, cdata=False):
+        if not self.data:
+            return
+        data = "".join(self.data)
+        self.data = []
+        if not self.collecting:
+            return
+        stripped = data.strip()
+        if stripped:
+            # тип строки: None - обычный текст или CDATA, иначе имя ближайшего контейнера
+            kind = None if cdata or not self.containers else self.containers[-1].name
+            for element in self.collecting:
+                if kind == (element.name if element.name in STRING_CONTAINERS else None):
+                    element.text.append(stripped)
+
+    def _push(self, name, attrs):
+        element = _Element(name)
+        self.stack.append(element)
+        self.open_counts[name] = self.open_counts.get(name, 0) + 1
+        if name in STRING_CONTAINERS:
+            self.containers.append(element)
+
+        attrs = dict(attrs)
+        data_test = attrs.get("data-test")
+        if (
+            self.price is None and name == "span"
+            and attrs.get("itemprop") == "price" and data_test == "offer-price"
+        ):
+            element.text = []
+            self.price = (attrs.get("content"), element.text)
+        if data_test == "infoItemTitle" or data_test == "infoItemValue":
+            slot = 0 if data_test == "infoItemTitle" else 1
+            for item in self.open_items:
+                if item.item[slot] is None:
+                    if element.text is None:
+                        element.text = []
+                    item.item[slot] = element.text
+        if data_test == "infoItem":
+            element.item = [None, None]
+            self.items.append(element.item)
+            self.open_items.append(element)
+        if element.text is not None:
+            self.collecting.append(element)
+
+    def _pop_to(self, name):
+        if not self.open_counts.get(name):
+            return
+        while self.stack:
+            element = self.stack.pop()
+            self.open_counts[element.name] -= 1
+            if self.containers and self.containers[-1] is element:
+                self.containers.pop()
+            if element.text is not None:
+                self.collecting.remove(element)
+            if element.item is not None:
+                self.open_items.remove(element)
+            if element.name == name:
+                break
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._end_data()
+        self._push(tag, [(key, "" if value is None else value) for key, value in attrs])
+        if handle_empty_element and tag in EMPTY_ELEMENT_TAGS:
+            self._pop_to(tag)
+            self.closed_empty.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self._end_data()
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_empty:
+            self.closed_empty.remove(tag)
+            return
+        self._end_data()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_charref(self, name):
+        dereferenced, extra_data = dereference_charref(name)
+        self.data.append(dereferenced)
+        self.data.append(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.data.append(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            self.data.append(data[len("CDATA["):])
+            self._end_data(cdata=True)
+
+
+def parse_card_stream(html_code):
+    return CardExtractor().parse(html_code)
+
+
+_LXML = None
+
+
+def _lxml_xpaths():
+    global _LXML
+    if _LXML is None:
+        from lxml import etree, html
+
+        texts = "descendant::text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+        _LXML = (
+            html,
+            etree.XPath('(//span[@itemprop="price" and @data-test="offer-price"])[1]'),
+            etree.XPath('//*[@data-test="infoItem"]'),
+            etree.XPath('(descendant::*[@data-test="infoItemTitle"])[1]'),
+            etree.XPath('(descendant::*[@data-test="infoItemValue"])[1]'),
+            etree.XPath(texts),
+        )
+    return _LXML
+
+
+def parse_card_lxml(html_code):
+    html, price_path, items_path, title_path, value_path, texts_path = _lxml_xpaths()
+    root = html.fromstring(html_code)
+
+    def text(element):
+        return "".join(part.strip() for part in texts_path(element))
+
+    info_dict = {}
+    price_span = price_path(root)
+    if price_span:
+        price = price_span[0].get("content")
+        info_dict["price"] = price if price else text(price_span[0])
+
+    for item in items_path(root):
+        title_div = title_path(item)
+        value_div = value_path(item)
+        if title_div and value_div:
+            info_dict[text(title_div[0])] = text(value_div[0])
+    return info_dict
+
+
+def parse_card_selectolax(html_code):
+    from selectolax.parser import HTMLParser as LexborParser
+
+    tree = LexborParser(html_code)
+    for node in tree.css("script, style, template"):
+        node.decompose()
+
+    info_dict = {}
+    price_span = tree.css_first('span[itemprop="price"][data-test="offer-price"]')
+    if price_span is not None:
+        price = price_span.attributes.get("content")
+        info_dict["price"] = price if price else price_span.text(strip=True)
+
+    for item in tree.css('[data-test="infoItem"]'):
+        title_div = item.css_first('[data-test="infoItemTitle"]')
+        value_div = item.css_first('[data-test="infoItemValue"]')
+        if title_div is not None and value_div is not None:
+            info_dict[title_div.text(strip=True)] = value_div.text(strip=True)
+    return info_dict
+
+
+BACKENDS = {
+    "stream": parse_card_stream,
+    "lxml": parse_card_lxml,
+    "selectolax": parse_card_selectolax,
+}
+
+
+def available_backends():
+    names = ["stream"]
+    for name in ("lxml", "selectolax"):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_extractor(name="stream"):
+    """Функция разбора карточки по имени бэкенда."""
+    if name == "auto":
+        name = available_backends()[-1]
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный бэкенд разбора - {name}") from None
@@ -0,0 +1,222 @@
+"""
+Нормализация полей карточек m2.ru в типизированную схему.
+
+На вход - словари parse_m2_card или строки sector_*.csv (заголовки полей
+на русском, значения - строки вида "38 м²", "2,85 м", "4 из 9").
+На выходе - таблица с фиксированными колонками: площади и высота потолков - float32,
+этажи, комнаты, годы - целые с пропусками, флаги "есть"/"нет" - boolean,
+повторяющиеся строки - category. Разбор векторный (регулярные выражения pandas)
+и только по уникальным значениям каждого поля.
+
+    python normalize.py sector_*.csv -o normalized.parquet
+"""
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+# Заголовок поля на карточке -> (колонка схемы, тип)
+FIELDS = {
+    "price": ("price", "price"),
+    "Тип жилья": ("housing_type", "category"),
+    "Комнатность": ("rooms", "rooms"),
+    "Площадь квартиры": ("area_total", "area"),
+    "Жилая площадь": ("area_living", "area"),
+    "Площадь кухни": ("area_kitchen", "area"),
+    "Этаж": ("floor", "floor"),
+    "Санузел": ("bathroom_type", "category"),
+    "Кол-во санузлов": ("bathrooms", "int8"),
+    "Ремонт": ("repair", "category"),
+    "Отделка": ("finishing", "category"),
+    "Кондиционер": ("has_air_conditioner", "flag"),
+    "Посудомойка": ("has_dishwasher", "flag"),
+    "Холодильник": ("has_fridge", "flag"),
+    "Мебель": ("has_furniture", "flag"),
+    "Кухонная мебель": ("has_kitchen_furniture", "flag"),
+    "Интернет": ("has_internet", "flag"),
+    "Телевизор": ("has_tv", "flag"),
+    "Стиральная машина": ("has_washing_machine", "flag"),
+    "Балкон/лоджия": ("has_balcony", "flag"),
+    "Лифт": ("has_elevator", "flag"),
+    "Консьерж": ("has_concierge", "flag"),
+    "Вид из окон": ("window_view", "category"),
+    "Вид из окна": ("window_view", "category"),
+    "Временная эпоха": ("building_era", "category"),
+    "Высота потолков": ("ceiling_height", "length"),
+    "Материал стен": ("wall_material", "category"),
+    "Серия дома": ("house_series", "category"),
+    "Территория": ("territory", "category"),
+    "Парковка": ("parking", "category"),
+    "Отопление": ("heating", "category"),
+    "Год постройки": ("build_year", "int16"),
+    "Срок сдачи": ("completion", "completion"),
+    "Реновация": ("renovation_program", "present"),
+}
+# Поля без заголовка (инфраструктура рядом: "Хорошая школа", "Фитнес клуб", ...)
+# в CSV превращаются в колонки "Unnamed: N"
+INFRASTRUCTURE = "infrastructure"
+
+# Итоговая схема: колонка -> тип (колонки, которых нет во входе, остаются пустыми этого типа)
+SCHEMA = {
+    "price": "Int64",
+    "rooms": "Int8",
+    "area_total": "float32",
+    "area_living": "float32",
+    "area_kitchen": "float32",
+    "floor": "Int16",
+    "floors_total": "Int16",
+    "ceiling_height": "float32",
+    "build_year": "Int16",
+    "completion_year": "Int16",
+    "completion_quarter": "Int8",
+    "bathrooms": "Int8",
+    "housing_type": "category",
+    "bathroom_type": "category",
+    "repair": "category",
+    "finishing": "category",
+    "window_view": "category",
+    "building_era": "category",
+    "wall_material": "category",
+    "house_series": "category",
+    "territory": "category",
+    "parking": "category",
+    "heating": "category",
+    INFRASTRUCTURE: "category",
+    "has_air_conditioner": "boolean",
+    "has_dishwasher": "boolean",
+    "has_fridge": "boolean",
+    "has_furniture": "boolean",
+    "has_kitchen_furniture": "boolean",
+    "has_internet": "boolean",
+    "has_tv": "boolean",
+    "has_washing_machine": "boolean",
+    "has_balcony": "boolean",
+    "has_elevator": "boolean",
+    "has_concierge": "boolean",
+    "renovation_program": "bool",
+}
+
+NUMBER = r"(\d+(?:[.,]\d+)?)"
+AREA_RE = re.compile(rf"^{NUMBER}\s*м²")
+LENGTH_RE = re.compile(rf"^{NUMBER}\s*м\b")
+ROOMS_RE = re.compile(r"^(\d+)-комнатная")
+FLOOR_RE = re.compile(r"^(-?\d+)(?:\s+из\s+(\d+))?")
+COMPLETION_RE = re.compile(r"^(?:(\d)\s*кв\.\s*)?(\d{4})\s*г\.")
+INT_RE = re.compile(r"^(\d+)")
+FLAGS = {"есть": True, "нет": False}
+
+
+def _is_infrastructure(title):
+    return title == "" or str(title).startswith("Unnamed:")
+
+
+def _to_float(strings, pattern):
+    return pd.to_numeric(strings.str.extract(pattern, expand=False).str.replace(",", ".", regex=False)).astype("float32")
+
+
+def _to_int(strings, pattern, dtype, group=0):
+    extracted = strings.str.extract(pattern, expand=True)[group]
+    return pd.to_numeric(extracted).astype(dtype)
+
+
+def _combine(frame, titles):
+    """Колонка из первого непустого значения нескольких полей (одно поле на карточке может называться по-разному)."""
+    combined = frame[titles[0]]
+    for title in titles[1:]:
+        combined = combined.fillna(frame[title])
+    return combined
+
+
+def _parse(kind, strings):
+    """Разбор очищенных строк поля: {колонка схемы: значения} (колонок две для этажа и срока сдачи)."""
+    if kind == "price":
+        return {"price": pd.to_numeric(strings.str.replace(r"\D", "", regex=True)).astype("Int64")}
+    if kind == "area" or kind == "length":
+        return {None: _to_float(strings, AREA_RE if kind == "area" else LENGTH_RE)}
+    if kind == "rooms":
+        return {None: _to_int(strings, ROOMS_RE, "Int8")}
+    if kind == "floor":
+        return {"floor": _to_int(strings, FLOOR_RE, "Int16", 0), "floors_total": _to_int(strings, FLOOR_RE, "Int16", 1)}
+    if kind == "completion":
+        return {
+            "completion_year": _to_int(strings, COMPLETION_RE, "Int16", 1),
+            "completion_quarter": _to_int(strings, COMPLETION_RE, "Int8", 0),
+        }
+    if kind in ("int8", "int16"):
+        return {None: _to_int(strings, INT_RE, kind.capitalize())}
+    if kind == "flag":
+        return {None: strings.map(FLAGS).astype("boolean")}
+    if kind == "present":
+        return {None: strings.notna()}
+    return {None: strings}
+
+
+def _unique_strings(values):
+    """
+    Коды значений и очищенные уникальные строки. Значения полей сильно повторяются
+    (площадей ~1 тыс. на 8.7 тыс. карточек), поэтому разбирается только уникальное.
+    """
+    codes, uniques = pd.factorize(values)
+    strings = pd.Series(uniques, dtype="string").str.replace("\xa0", " ", regex=False).str.strip()
+    return codes, strings.replace("", pd.NA).astype(object)
+
+
+def _expand(parsed, codes, index):
+    """Значения, разобранные для уникальных строк, - обратно на все карточки."""
+    if parsed.dtype == bool:
+        # у bool нет пропусков: отсутствующее значение - False
+        return pd.Series(np.where(codes >= 0, parsed.to_numpy()[codes], False), index=index)
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=index)
+
+
+def normalize(cards):
+    """
+    Приводит карточки к схеме SCHEMA. cards - список словарей parse_m2_card
+    или DataFrame со строками sector_*.csv. Неизвестные поля отбрасываются.
+    """
+    frame = cards if isinstance(cards, pd.DataFrame) else pd.DataFrame(cards)
+
+    by_column = {}
+    for title in frame.columns:
+        if title in FIELDS:
+            by_column.setdefault(FIELDS[title], []).append(title)
+
+    result = {}
+    for (column, kind), titles in by_column.items():
+        codes, strings = _unique_strings(_combine(frame, titles))
+        for name, parsed in _parse(kind, strings).items():
+            result[name or column] = _expand(parsed, codes, frame.index)
+
+    infrastructure = [title for title in frame.columns if _is_infrastructure(title)]
+    if infrastructure:
+        # несколько безымянных полей на карточку - одна строка в порядке появления
+        joined = None
+        for title in infrastructure:
+            values = _expand(*reversed(_unique_strings(frame[title])), frame.index)
+            joined = values if joined is None else joined.where(values.isna(), (joined + ", " + values).fillna(values))
+        result[INFRASTRUCTURE] = joined
+
+    normalized = pd.DataFrame(result, index=frame.index).reindex(columns=list(SCHEMA))
+    if "renovation_program" not in result:
+        normalized["renovation_program"] = False
+    return normalized.astype(SCHEMA)
+
+
+def read_sectors(paths):
+    """Строки нескольких sector_*.csv как строки (без приведения типов pandas)."""
+    return pd.concat([pd.read_csv(path, dtype=str) for path in paths], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нормализация карточек m2.ru")
+    parser.add_argument("paths", nargs="+", help="Файлы sector_*.csv")
+    parser.add_argument("-o", "--output", default="normalized.parquet", help="Файл результата (.parquet или .csv)")
+    args = parser.parse_args()
+
+    normalized = normalize(read_sectors(args.paths))
+    if args.output.endswith(".parquet"):
+        normalized.to_parquet(args.output, index=False)
+    else:
+        normalized.to_csv(args.output, index=False)
+    print(f"Сохранено {len(normalized)} строк в {args.output}")
@@ -3,11 +3,32 @@ from bs4 import BeautifulSoup
 import pandas as pd
 from tqdm.auto import tqdm
 import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-def parse_m2_card(html_code):
+import aiohttp
+
+from extractors import get_extractor
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/88.0.4324.96 Safari/537.36"
+    )
+}
+
+def parse_m2_card(html_code, backend="bs4"):
     """Парсим HTML одной карточки объявления с m2.ru
        и возвращаем словарь всех основных параметров.
+       backend - способ разбора: bs4 (BeautifulSoup) или один из быстрых
+       бэкендов extractors.py (stream, lxml, selectolax, auto) с тем же результатом.
     """
+    if backend != "bs4":
+        return get_extractor(backend)(html_code)
+
     soup = BeautifulSoup(html_code, "html.parser")
     
     info_dict = {}
@@ -35,37 +56,138 @@ def parse_m2_card(html_code):
     
     return info_dict
 
-def test_parse_m2(url):
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/88.0.4324.96 Safari/537.36"
-        )
-    }
-    
-    resp = requests.get(url, headers=headers)
+def test_parse_m2(url, backend="bs4"):
+    resp = requests.get(url, headers=HEADERS)
     if resp.status_code == 200:
-        card_info = parse_m2_card(resp.text)
+        card_info = parse_m2_card(resp.text, backend)
         return card_info
     else:
         print("Ошибка загрузки:", resp.status_code)
 
+class PoliteDelay:
+    """Не чаще одного начала запроса раз в delay секунд на весь обход."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.delay:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def fetch_card(session, url, semaphore, polite, retries=3, save_html=None):
+    """HTML карточки или None после всех попыток."""
+    for attempt in range(retries):
+        try:
+            async with semaphore:
+                await polite.wait()
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        html = await resp.text()
+                        if save_html is not None:
+                            name = url.rstrip("/").rsplit("/", 1)[-1]
+                            # запись в отдельном потоке, чтобы не останавливать остальные загрузки
+                            await asyncio.to_thread((save_html / f"{name}.html").write_text, html, encoding="utf-8")
+                        return html
+                    print("Ошибка загрузки:", resp.status, url)
+                    if resp.status not in (429, 500, 502, 503, 504):
+                        return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print("Ошибка загрузки:", e, url)
+        if attempt + 1 < retries:
+            await asyncio.sleep(2 ** attempt)
+    return None
+
+
+async def scrape_cards(links, concurrency=8, delay=0.1, workers=None, save_html=None, backend="bs4"):
+    """
+    Загружает карточки конкурентно (не больше concurrency запросов одновременно,
+    между началами запросов не меньше delay секунд) и разбирает HTML
+    в пуле из workers процессов бэкендом backend. Возвращает словари в порядке links
+    (None для карточек, которые не удалось загрузить).
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    polite = PoliteDelay(delay)
+    progress = tqdm(total=len(links))
+
+    async def scrape_one(session, pool, url):
+        html = await fetch_card(session, url, semaphore, polite, save_html=save_html)
+        result = None if html is None else await loop.run_in_executor(pool, parse_m2_card, html, backend)
+        progress.update()
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with aiohttp.ClientSession(
+            headers=HEADERS,
+            connector=aiohttp.TCPConnector(limit=concurrency),
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as session:
+            try:
+                return await asyncio.gather(*(scrape_one(session, pool, url) for url in links))
+            finally:
+                progress.close()
+
+
+def scrape_sectors(df, **options):
+    """Обходит все ссылки df за один запуск и раскладывает результаты по секторам."""
+    results = asyncio.run(scrape_cards(df["link"].tolist(), **options))
+    by_sector = {sector: [] for sector in df["sector"].unique()}
+    for sector, res_d in zip(df["sector"], results):
+        if res_d is not None:
+            by_sector[sector].append(res_d)
+    return by_sector
+
+
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="None")
-    parser.add_argument("--sector", type=str, required=True, help="Название сектора")
+    parser = argparse.ArgumentParser(description="Парсер карточек m2.ru")
+    parser.add_argument("--sector", type=str, nargs="*", help="Названия секторов (по умолчанию все)")
+    parser.add_argument("--sequential", action="store_true", help="Старый последовательный режим")
+    parser.add_argument("--concurrency", type=int, default=8, help="Одновременных запросов")
+    parser.add_argument("--delay", type=float, default=0.1, help="Пауза между началами запросов, с")
+    parser.add_argument("--workers", type=int, default=None, help="Процессов для разбора HTML (по умолчанию - число ядер)")
+    # lxml и selectolax (и auto, который их выбирает) не сверены с bs4 на сохранённых страницах m2.ru:
+    # перед переключением на них - python bench_extract.py --fixtures <папка --save-html>
+    parser.add_argument("--backend", type=str, default="stream",
+                        help="Разбор HTML: stream, bs4, lxml, selectolax или auto (самый быстрый из установленных)")
+    parser.add_argument("--save-html", type=Path, default=None, help="Сохранять загруженный HTML в эту папку")
 
     args = parser.parse_args()
 
     df = pd.read_csv('links.csv')
 
-    df = df[df.sector == args.sector]
-    current_data = []
+    if args.sector:
+        df = df[df.sector.isin(args.sector)]
 
-    for i, row in tqdm(df.iterrows()):
-        res_d = test_parse_m2(row['link'])
-        if res_d is not None:
-            current_data.append(res_d)
+    if args.sequential:
+        by_sector = {}
+        for sector, df_sector in df.groupby("sector", sort=False):
+            current_data = []
+            for i, row in tqdm(df_sector.iterrows()):
+                res_d = test_parse_m2(row['link'], backend=args.backend)
+                if res_d is not None:
+                    current_data.append(res_d)
+            by_sector[sector] = current_data
+    else:
+        if args.save_html is not None:
+            args.save_html.mkdir(parents=True, exist_ok=True)
+        by_sector = scrape_sectors(
+            df,
+            concurrency=args.concurrency,
+            delay=args.delay,
+            workers=args.workers,
+            save_html=args.save_html,
+            backend=args.backend,
+        )
 
-    df_parsed = pd.DataFrame(current_data)
-    df_parsed.to_csv(f"{args.sector}.csv", index=False)
\ No newline at end of file
+    for sector, current_data in by_sector.items():
+        df_parsed = pd.DataFrame(current_data)
+        df_parsed.to_csv(f"{sector}.csv", index=False)